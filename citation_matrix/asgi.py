@@ -3,14 +3,28 @@ ASGI config for citation_matrix project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+The streaming downloads are served by the async application of
+database.async_streaming, without settings.MIDDLEWARE (see there). Django
+2.2 has no ASGI handler for the other views: they are only served here from
+Django 3.0, and must be deployed through wsgi.py before.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "citation_matrix.settings")
 
-application = get_asgi_application()
+
+def get_application():
+    django.setup(set_prefix=False)
+    from database.async_streaming import streaming_application
+
+    try:
+        from django.core.asgi import get_asgi_application
+    except ImportError:  # Django < 3.0
+        return streaming_application()
+    return streaming_application(get_asgi_application())
+
+
+application = get_application()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+import tempfile
 
 from secret_vars import SECRETS
 
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "database.profiling.QueryProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -123,3 +125,57 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.0/howto/static-files/
 
 STATIC_URL = "/static/"
+
+
+# Caches: 'default' for small per-process entries (like formatted
+# bibliography entries), 'derived' for results derived from the citation
+# graph, shared between processes (see database.caching).
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "citation-matrix",
+        "OPTIONS": {"MAX_ENTRIES": 50000},
+    },
+    "derived": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": SECRETS.get(
+            "DERIVED_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "citation-matrix-cache"),
+        ),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
+# Number of derived results kept in memory by each process.
+DERIVED_CACHE_MAX_ENTRIES: int = 128
+
+# Binary snapshot of the citation graph written by the snapshot_graph
+# command. While it is current, processes map it instead of reading the
+# references (see database.snapshot).
+GRAPH_SNAPSHOT_PATH = SECRETS.get("GRAPH_SNAPSHOT_PATH")
+
+
+# SQL query profiling of requests and management command phases
+# (see database.profiling), with the summaries logged as JSON to the
+# 'database.profiling' logger and shown at /debug/queries/.
+
+QUERY_PROFILING: bool = SECRETS.get("QUERY_PROFILING", False)
+
+QUERY_PROFILING_SLOWEST: int = 5
+
+QUERY_PROFILING_HISTORY: int = 50
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "database.profiling": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
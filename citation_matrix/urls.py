@@ -16,6 +16,30 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
+from database import api, streaming
+from database.views import cache_statistics, query_profile
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path(
+        "api/sources/<int:source_id>/references/",
+        api.source_references,
+        name="api_source_references",
+    ),
+    path(
+        "api/sources/<int:source_id>/citations/",
+        api.source_citations,
+        name="api_source_citations",
+    ),
+    path("api/degrees/", api.degree_statistics, name="api_degrees"),
+    path("api/matrix/", api.sub_matrix, name="api_matrix"),
+    path("api/stream/edges/", streaming.stream_edges, name="stream_edges"),
+    path("api/stream/matrix/", streaming.stream_matrix, name="stream_matrix"),
+    path(
+        "api/stream/bibliography/",
+        streaming.stream_bibliography,
+        name="stream_bibliography",
+    ),
+    path("debug/queries/", query_profile, name="query_profile"),
+    path("debug/cache/", cache_statistics, name="cache_statistics"),
 ]
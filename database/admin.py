@@ -1,7 +1,162 @@
+from typing import Optional, Tuple
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.db.models import Q, QuerySet
+from django.utils.translation import ugettext_lazy as _
 
 from database import models as database_models
+from database import search
+
+
+class CitationCountListFilter(admin.SimpleListFilter):
+    """
+    Filters sources on one of their denormalized citation counters, in
+    logarithmic buckets.
+    """
+
+    field_name: str = ""
+    BUCKETS: Tuple[Tuple[str, str, int, Optional[int]], ...] = (
+        ("0", "0", 0, 0),
+        ("1-9", "1 - 9", 1, 9),
+        ("10-99", "10 - 99", 10, 99),
+        ("100-999", "100 - 999", 100, 999),
+        ("1000+", "1000 +", 1000, None),
+    )
+
+    def lookups(self, request, model_admin):
+        return [(key, label) for key, label, low, high in self.BUCKETS]
+
+    def queryset(self, request, queryset: QuerySet) -> QuerySet:
+        for key, label, low, high in self.BUCKETS:
+            if self.value() == key:
+                queryset = queryset.filter(
+                    **{"{}__gte".format(self.field_name): low}
+                )
+                if high is not None:
+                    queryset = queryset.filter(
+                        **{"{}__lte".format(self.field_name): high}
+                    )
+        return queryset
+
+
+class InputListFilter(admin.SimpleListFilter):
+    """
+    Filter with a text input instead of a list of choices, so the sidebar
+    doesn't load every row of the related table. Numeric input matches the
+    related object's ID, other input the start of its name.
+    """
+
+    template = "admin/database/input_filter.html"
+    id_lookup: str = ""
+    name_lookup: str = ""
+
+    def lookups(self, request, model_admin):
+        # Dummy choice, the filter is only rendered when it has lookups.
+        return (("", ""),)
+
+    def choices(self, changelist):
+        all_choice = next(super().choices(changelist))
+        all_choice["query_parts"] = [
+            (key, value)
+            for key, value in changelist.get_filters_params().items()
+            if key != self.parameter_name
+        ]
+        yield all_choice
+
+    def lookup_filter(self, value: str) -> Q:
+        if value.isdigit():
+            return Q(**{self.id_lookup: int(value)})
+        return Q(**{"{}__istartswith".format(self.name_lookup): value})
+
+    def queryset(self, request, queryset: QuerySet) -> QuerySet:
+        value: Optional[str] = self.value()
+        if not value or not value.strip():
+            return queryset
+        return queryset.filter(self.lookup_filter(value.strip()))
+
+
+class AuthorListFilter(InputListFilter):
+    title = _("author (ID or last name)")
+    parameter_name = "author"
+
+    def lookup_filter(self, value: str) -> Q:
+        authorships = database_models.Source.authors.through.objects.filter(
+            Q(author_id=int(value))
+            if value.isdigit()
+            else Q(author__last_name__istartswith=value)
+        )
+        # A subquery instead of a join, so no DISTINCT is needed.
+        return Q(pk__in=authorships.values("source_id"))
+
+
+class SourcePublisherListFilter(InputListFilter):
+    title = _("publisher (ID or name)")
+    parameter_name = "publisher"
+    id_lookup = "source_publisher_id"
+    name_lookup = "source_publisher__name"
+
+
+class SourceJournalListFilter(InputListFilter):
+    title = _("journal (ID or name)")
+    parameter_name = "journal"
+    id_lookup = "source_journal_id"
+    name_lookup = "source_journal__name"
+
+
+class JournalPublisherListFilter(InputListFilter):
+    title = _("publisher (ID or name)")
+    parameter_name = "publisher"
+    id_lookup = "journal_publisher_id"
+    name_lookup = "journal_publisher__name"
+
+
+class CityListFilter(InputListFilter):
+    title = _("city")
+    parameter_name = "city"
+
+    def lookup_filter(self, value: str) -> Q:
+        return Q(city__istartswith=value)
+
+
+class TimesCitedListFilter(CitationCountListFilter):
+    title = _("times cited")
+    parameter_name = "times_cited"
+    field_name = "times_cited"
+
+
+class ReferencesMadeListFilter(CitationCountListFilter):
+    title = _("references made")
+    parameter_name = "references_made"
+    field_name = "references_made"
+
+
+class CitationIndicesAdmin(admin.ModelAdmin):
+    """
+    Lists the stored h-index and g-index of the entities (see
+    database.citation_indices), sortable.
+    """
+
+    list_select_related = ["indices"]
+
+    @staticmethod
+    def _indices(obj) -> Optional[database_models.CitationIndices]:
+        # Missing until the indices are computed after the entity is added.
+        return getattr(obj, "indices", None)
+
+    def h_index(self, obj) -> Optional[int]:
+        indices = self._indices(obj)
+        return indices.h_index if indices else None
+
+    h_index.short_description = _("h-index")
+    h_index.admin_order_field = "indices__h_index"
+
+    def g_index(self, obj) -> Optional[int]:
+        indices = self._indices(obj)
+        return indices.g_index if indices else None
+
+    g_index.short_description = _("g-index")
+    g_index.admin_order_field = "indices__g_index"
 
 
 @admin.register(database_models.User)
@@ -20,23 +175,30 @@ class CustomUserAdmin(UserAdmin):
 
 
 @admin.register(database_models.Author)
-class AuthorAdmin(admin.ModelAdmin):
-    list_display = ["first_name", "middle_name", "last_name"]
+class AuthorAdmin(CitationIndicesAdmin):
+    list_display = [
+        "first_name",
+        "middle_name",
+        "last_name",
+        "h_index",
+        "g_index",
+    ]
     list_filter = ["is_dummy_data"]
     search_fields = ["first_name", "middle_name", "last_name"]
 
 
 @admin.register(database_models.Publisher)
-class PublisherAdmin(admin.ModelAdmin):
-    list_display = ["name", "city"]
-    list_filter = ["is_dummy_data", "city"]
+class PublisherAdmin(CitationIndicesAdmin):
+    list_display = ["name", "city", "h_index", "g_index"]
+    list_filter = ["is_dummy_data", CityListFilter]
     search_fields = ["name"]
 
 
 @admin.register(database_models.Journal)
-class JournalAdmin(admin.ModelAdmin):
-    list_display = ["name", "journal_publisher"]
-    list_filter = ["is_dummy_data", "journal_publisher"]
+class JournalAdmin(CitationIndicesAdmin):
+    list_display = ["name", "journal_publisher", "h_index", "g_index"]
+    list_select_related = ["journal_publisher", "indices"]
+    list_filter = ["is_dummy_data", JournalPublisherListFilter]
     search_fields = ["name"]
     raw_id_fields = ["journal_publisher"]
 
@@ -49,21 +211,43 @@ class SourceAdmin(admin.ModelAdmin):
         "year_of_publication",
         "source_publisher",
         "source_journal",
+        "times_cited",
+        "references_made",
     ]
+    list_select_related = ["source_publisher", "source_journal"]
     list_filter = [
         "is_dummy_data",
         "type",
-        "authors",
-        "source_publisher",
-        "source_journal",
+        TimesCitedListFilter,
+        ReferencesMadeListFilter,
+        AuthorListFilter,
+        SourcePublisherListFilter,
+        SourceJournalListFilter,
     ]
-    search_fields = ["title"]
+    show_full_result_count = False
+    search_fields = ["title", "abstract"]
     raw_id_fields = ["authors", "source_publisher", "source_journal"]
 
+    def get_search_results(
+        self, request, queryset: QuerySet, search_term: str
+    ) -> Tuple[QuerySet, bool]:
+        """ Searches the full-text index instead of LIKE scans. """
+        if not search_term.strip():
+            return queryset, False
+        return queryset.search(search_term), False
+
+    def get_ordering(self, request):
+        """ Orders search results by relevance. """
+        if request.GET.get("q", "").strip() and search.is_supported():
+            return ["search_rank"]
+        return super().get_ordering(request)
+
 
 @admin.register(database_models.Reference)
 class ReferenceAdmin(admin.ModelAdmin):
     list_display = ["referrer", "reference"]
+    list_select_related = ["referrer", "reference"]
+    show_full_result_count = False
     search_fields = ["referrer__title", "reference__title"]
     list_filter = ["is_dummy_data"]
     raw_id_fields = ["referrer", "reference"]
@@ -72,14 +256,30 @@ class ReferenceAdmin(admin.ModelAdmin):
 @admin.register(database_models.Evaluation)
 class EvaluationAdmin(admin.ModelAdmin):
     list_display = ["source", "user", "date", "favorited"]
+    list_select_related = ["source", "user"]
+    show_full_result_count = False
     search_fields = [
         "user__first_name",
         "user__last_name",
         "user__username",
         "user__email",
-        "source__title",
-        "source__author__first_name",
-        "source__author__last_name",
     ]
     list_filter = ["is_dummy_data", "favorited"]
     raw_id_fields = ["source", "user"]
+
+    def get_search_results(
+        self, request, queryset: QuerySet, search_term: str
+    ) -> Tuple[QuerySet, bool]:
+        """
+        Matches the user fields as usual, and the source title, abstract and
+        authors through the full-text index.
+        """
+        if not search_term.strip():
+            return queryset, False
+        by_user, use_distinct = super().get_search_results(
+            request, queryset, search_term
+        )
+        by_source: QuerySet = queryset.filter(
+            source_id__in=search.matching_source_ids(search_term)
+        )
+        return by_user | by_source, use_distinct
@@ -0,0 +1,135 @@
+"""
+Transitive citation queries: the sources a source builds on (ancestors) and
+the sources building on it (descendants).
+
+Both are breadth-first traversals: single queries read each level from the
+Reference table, repeated queries can pass a CitationMatrix, which is
+traversed in memory. Every source is expanded once, at its lowest depth,
+and the traversal stops once enough sources were found. Both return
+(source_id, depth) pairs ordered by depth and ID, where depth is the length
+of the shortest citation path.
+"""
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from database.bulk import MAX_IDS_PER_QUERY, chunked
+from database.matrix import (
+    CitationMatrix,
+    UnknownSourceError,
+    get_cached_matrix,
+)
+from database.models import Reference
+
+ANCESTORS: str = "ancestors"
+DESCENDANTS: str = "descendants"
+
+# Citation paths longer than this are not followed unless asked for.
+DEFAULT_MAX_DEPTH: int = 25
+
+# (source ID, depth)
+Relative = Tuple[int, int]
+
+
+def _columns(direction: str) -> Tuple[str, str]:
+    """ The (current, next) Reference columns to follow a direction. """
+    if direction == ANCESTORS:
+        return "referrer_id", "reference_id"
+    if direction == DESCENDANTS:
+        return "reference_id", "referrer_id"
+    raise ValueError("Unknown direction: {}".format(direction))
+
+
+def query_relatives(
+    source_id: int,
+    direction: str,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    limit: Optional[int] = None,
+) -> List[Relative]:
+    """
+    Returns the ancestors or descendants of a source with a breadth-first
+    traversal of the Reference table, one query per level (and per
+    MAX_IDS_PER_QUERY sources of the level), up to 'max_depth' citations
+    away and at most 'limit' results.
+    """
+    current_column, next_column = _columns(direction)
+    visited: Set[int] = {source_id}
+    frontier: List[int] = [source_id]
+    found: List[Relative] = []
+    depth: int = 0
+    while frontier and depth < max_depth:
+        if limit is not None and len(found) >= limit:
+            break
+        depth += 1
+        neighbours: Set[int] = set()
+        for chunk in chunked(frontier, MAX_IDS_PER_QUERY):
+            neighbours.update(
+                Reference.objects.filter(
+                    **{current_column + "__in": chunk}
+                ).values_list(next_column, flat=True)
+            )
+        frontier = sorted(neighbours - visited)
+        visited.update(frontier)
+        found.extend((relative_id, depth) for relative_id in frontier)
+    return found[:limit]
+
+
+def traverse_relatives(
+    matrix: CitationMatrix,
+    source_id: int,
+    direction: str,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    limit: Optional[int] = None,
+) -> List[Relative]:
+    """
+    Returns the ancestors or descendants of a source with a breadth-first
+    traversal of the in-memory citation matrix, one vectorized step per
+    level. Same arguments and results as query_relatives.
+    """
+    _columns(direction)
+    visited: np.ndarray = np.zeros(matrix.shape[0], dtype=bool)
+    frontier: np.ndarray = matrix.index_of([source_id])
+    visited[frontier] = True
+    found: List[Relative] = []
+    depth: int = 0
+    while len(frontier) and depth < max_depth:
+        if limit is not None and len(found) >= limit:
+            break
+        depth += 1
+        if direction == ANCESTORS:
+            neighbours: np.ndarray = matrix.csr[frontier].indices
+        else:
+            neighbours = matrix.csc[:, frontier].indices
+        frontier = np.unique(neighbours)
+        frontier = frontier[~visited[frontier]]
+        visited[frontier] = True
+        # Indexes follow the ID order, so each level is sorted by ID.
+        found.extend(
+            (relative_id, depth)
+            for relative_id in matrix.ids_of(frontier).tolist()
+        )
+    return found[:limit]
+
+
+def relatives(
+    source_id: int,
+    direction: str,
+    max_depth: Optional[int] = None,
+    limit: Optional[int] = None,
+    cached: bool = False,
+) -> List[Relative]:
+    """
+    Returns the ancestors or descendants of a source, from the process-wide
+    cached matrix when 'cached' is set, and from the database otherwise (or
+    when the source was created after the cached matrix).
+    """
+    if max_depth is None:
+        max_depth = DEFAULT_MAX_DEPTH
+    if cached:
+        try:
+            return traverse_relatives(
+                get_cached_matrix(), source_id, direction, max_depth, limit
+            )
+        except UnknownSourceError:
+            pass
+    return query_relatives(source_id, direction, max_depth, limit)
@@ -0,0 +1,281 @@
+"""
+Read-only JSON API over the citation graph, for dashboards polling it.
+
+Every response carries a strong ETag built from the generation of the
+database and the versions of the Source and Reference tables (see
+database.versions), which are read with a single query. Requests whose If-None-Match matches get a 304 response before any
+source or reference is read. Larger responses are gzip compressed for
+clients that accept it; the compressed representation has its own ETag, so
+both can be strong.
+
+The degree and sub-matrix endpoints share a CitationMatrix that is rebuilt
+only when the versions change.
+"""
+import gzip
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.db.models import QuerySet
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseNotModified,
+    JsonResponse,
+    QueryDict,
+)
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+
+from database import snapshot
+from database.matrix import CitationMatrix, read_source_ids
+from database.models import Reference, Source
+
+# Responses shorter than this aren't worth compressing.
+MIN_COMPRESSED_LENGTH: int = 200
+
+# Maximum number of sources in a sub-matrix.
+MAX_SUBMATRIX_SOURCES: int = 10000
+
+# Number of sources listed by the degree statistics, by default and at most.
+DEFAULT_TOP: int = 10
+MAX_TOP: int = 1000
+
+Versions = Tuple[int, ...]
+
+_matrix: Optional[Tuple[Versions, CitationMatrix]] = None
+
+
+def current_versions() -> Versions:
+    """
+    The generation of the database and the versions of the Source and
+    Reference tables, which tag the responses (see database.snapshot).
+    """
+    return snapshot.current_versions()
+
+
+def current_matrix(versions: Versions) -> CitationMatrix:
+    """
+    The matrix of all sources, rebuilt when the versions changed: from the
+    graph snapshot when it is current (see database.snapshot), from the
+    database otherwise.
+    """
+    global _matrix
+    if _matrix is None or _matrix[0] != versions:
+        _matrix = (
+            versions,
+            snapshot.current_matrix(versions)
+            or CitationMatrix.from_database(),
+        )
+    return _matrix[1]
+
+
+def clear_matrix() -> None:
+    global _matrix
+    _matrix = None
+
+
+def _accepts_gzip(request: HttpRequest) -> bool:
+    return "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+
+
+def versioned(
+    view: Callable[..., HttpResponse]
+) -> Callable[..., HttpResponse]:
+    """
+    Adds the ETag and compression handling to an API view. The view gets
+    the current table versions as 'versions' keyword argument.
+    """
+
+    @require_safe
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args: Any, **kwargs: Any):
+        versions: Versions = current_versions()
+        compress: bool = _accepts_gzip(request)
+        tag: str = "-".join(map(str, versions))
+        etags: List[str] = ['"{}"'.format(tag), '"{}-gzip"'.format(tag)]
+        requested: List[str] = parse_etags(
+            request.META.get("HTTP_IF_NONE_MATCH", "")
+        )
+        # Small responses aren't compressed, so both tags are current.
+        matched: List[str] = [etag for etag in etags if etag in requested]
+        if matched or "*" in requested:
+            response: HttpResponse = HttpResponseNotModified()
+            response["ETag"] = matched[0] if matched else etags[compress]
+        else:
+            response = view(request, *args, versions=versions, **kwargs)
+            if response.status_code != 200:
+                return response
+            if compress and len(response.content) >= MIN_COMPRESSED_LENGTH:
+                response.content = gzip.compress(response.content)
+                response["Content-Encoding"] = "gzip"
+                response["Content-Length"] = str(len(response.content))
+            else:
+                compress = False
+            response["ETag"] = etags[compress]
+        patch_vary_headers(response, ("Accept-Encoding",))
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    return wrapper
+
+
+def _error(message: str) -> JsonResponse:
+    return JsonResponse({"error": message}, status=400)
+
+
+@versioned
+def source_references(
+    request: HttpRequest, source_id: int, versions: Versions
+) -> HttpResponse:
+    """ The IDs of the sources cited by a source. """
+    source: Source = get_object_or_404(Source.objects.only("pk"), pk=source_id)
+    return JsonResponse(
+        {
+            "source": source.pk,
+            "references": sorted(
+                set(
+                    Reference.objects.filter(
+                        referrer_id=source.pk
+                    ).values_list("reference_id", flat=True)
+                )
+            ),
+        }
+    )
+
+
+@versioned
+def source_citations(
+    request: HttpRequest, source_id: int, versions: Versions
+) -> HttpResponse:
+    """ The IDs of the sources citing a source. """
+    source: Source = get_object_or_404(Source.objects.only("pk"), pk=source_id)
+    return JsonResponse(
+        {
+            "source": source.pk,
+            "citations": sorted(
+                set(
+                    Reference.objects.filter(
+                        reference_id=source.pk
+                    ).values_list("referrer_id", flat=True)
+                )
+            ),
+        }
+    )
+
+
+def _degree_summary(
+    matrix: CitationMatrix, degrees: np.ndarray, top: int
+) -> Dict[str, Any]:
+    """ Summary of the in- or out-degrees, with the 'top' highest ones. """
+    if not len(degrees):
+        return {"mean": 0.0, "max": 0, "zero": 0, "top": []}
+    order: np.ndarray = np.argsort(-degrees, kind="stable")[:top]
+    return {
+        "mean": float(degrees.mean()),
+        "max": int(degrees.max()),
+        "zero": int((degrees == 0).sum()),
+        "top": [
+            [source_id, degree]
+            for source_id, degree in zip(
+                matrix.ids_of(order).tolist(), degrees[order].tolist()
+            )
+        ],
+    }
+
+
+@versioned
+def degree_statistics(
+    request: HttpRequest, versions: Versions
+) -> HttpResponse:
+    """
+    Number of sources and citations, and a summary of the in-degrees
+    (citations) and out-degrees (references) of the sources. 'top' sets the
+    number of listed sources with the highest degrees.
+    """
+    try:
+        top: int = int(request.GET.get("top", DEFAULT_TOP))
+    except ValueError:
+        return _error("'top' must be an integer")
+    if not 0 <= top <= MAX_TOP:
+        return _error("'top' must be between 0 and {}".format(MAX_TOP))
+    matrix: CitationMatrix = current_matrix(versions)
+    return JsonResponse(
+        {
+            "sources": matrix.shape[0],
+            "pairs": matrix.nnz,
+            "in_degree": _degree_summary(matrix, matrix.in_degree(), top),
+            "out_degree": _degree_summary(matrix, matrix.out_degree(), top),
+        }
+    )
+
+
+# Sub-matrix filters: query parameter -> Source lookup.
+SUBMATRIX_FILTERS: Dict[str, str] = {
+    "journal": "source_journal_id",
+    "publisher": "source_publisher_id",
+    "year_from": "year_of_publication__gte",
+    "year_to": "year_of_publication__lte",
+}
+
+
+def filter_sources(params: QueryDict) -> QuerySet:
+    """
+    The sources matching the filters of a query string: the parameters of
+    SUBMATRIX_FILTERS, 'type' and 'ids' (a comma-separated list of Source
+    IDs). Raises ValueError for filters that must be integers but aren't.
+    """
+    sources: QuerySet = Source.objects.all()
+    for parameter, lookup in SUBMATRIX_FILTERS.items():
+        if parameter in params:
+            sources = sources.filter(**{lookup: int(params[parameter])})
+    if "ids" in params:
+        sources = sources.filter(
+            pk__in=[
+                int(value)
+                for value in params["ids"].split(",")
+                if value.strip()
+            ]
+        )
+    if "type" in params:
+        sources = sources.filter(type=params["type"])
+    return sources
+
+
+@versioned
+def sub_matrix(request: HttpRequest, versions: Versions) -> HttpResponse:
+    """
+    The citations between the sources matching the filters of the query
+    string (journal, publisher, year_from, year_to, type and 'ids', a
+    comma-separated list of Source IDs), as a CSR matrix: row i cites
+    column indices[indptr[i]:indptr[i + 1]], where rows and columns are
+    positions in 'source_ids'.
+    """
+    if not request.GET:
+        return _error("At least one filter is required")
+    try:
+        sources: QuerySet = filter_sources(request.GET)
+    except ValueError:
+        return _error("Filters must be integers")
+    source_ids: np.ndarray = read_source_ids(sources)
+    if len(source_ids) > MAX_SUBMATRIX_SOURCES:
+        return _error(
+            "The filters match {} sources, at most {} are allowed".format(
+                len(source_ids), MAX_SUBMATRIX_SOURCES
+            )
+        )
+    matrix: CitationMatrix = current_matrix(versions)
+    # Sources created since the matrix was built have no citations in it.
+    source_ids = source_ids[np.isin(source_ids, matrix.source_ids)]
+    indexes: np.ndarray = matrix.index_of(source_ids)
+    csr = matrix.csr[indexes][:, indexes]
+    return JsonResponse(
+        {
+            "source_ids": source_ids.tolist(),
+            "indptr": csr.indptr.tolist(),
+            "indices": csr.indices.tolist(),
+            "data": csr.data.tolist(),
+        }
+    )
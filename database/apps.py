@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class DatabaseConfig(AppConfig):
     name = "database"
+
+    def ready(self) -> None:
+        from database import signals  # noqa: F401
@@ -0,0 +1,202 @@
+"""
+ASGI application streaming the exports of database.streaming without
+holding a thread for the whole download.
+
+Each page of an export is read by a short query in a thread pool (Django's
+ORM is synchronous), and the event loop awaits the client between pages:
+'send' only returns once the server accepted the chunk, so a slow client
+pauses the reads. A disconnect ('http.disconnect') stops the stream before
+the next page is read.
+
+Django 2.2 has no ASGI handler, so requests for other paths are passed to
+'fallback' when one is given (the handler of Django 3.0+), and answered
+with 404 otherwise; see citation_matrix/asgi.py.
+
+The export routes don't go through settings.MIDDLEWARE, whose middleware
+are synchronous. This application is therefore restricted to the public,
+read-only exports, which need no session, user or CSRF check, and does the
+one check of the middleware that matters for them itself: the Host header
+is validated against settings.ALLOWED_HOSTS, as HttpRequest.get_host()
+does. Headers added by middleware (SecurityMiddleware,
+XFrameOptionsMiddleware) are not sent on these responses.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import QueryDict
+from django.http.request import split_domain_port, validate_host
+from django.urls import Resolver404, resolve
+
+from database.streaming import (
+    CHUNK_BYTES,
+    EXPORTS,
+    Export,
+    ExportError,
+    encode_chunks,
+    log_cancelled,
+)
+
+# Threads reading pages, shared by all streams.
+MAX_THREADS: int = 8
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+Application = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_THREADS, thread_name_prefix="streaming"
+)
+
+
+def _in_thread(function: Callable[..., Any], *args: Any) -> Any:
+    """ Runs a function using the database in a pool thread. """
+    close_old_connections()
+    try:
+        return function(*args)
+    finally:
+        close_old_connections()
+
+
+async def run_in_pool(function: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.get_event_loop().run_in_executor(
+        _executor, _in_thread, function, *args
+    )
+
+
+async def _respond(
+    send: Send, status: int, body: bytes, content_type: bytes
+) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type)],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def stream_export(
+    export: Export, receive: Receive, send: Send, head: bool = False
+) -> int:
+    """
+    Sends an export as a chunked response. Returns the number of sent
+    bytes, or -1 when the client disconnected before the end.
+    """
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", export.content_type.encode()),
+                (
+                    b"content-disposition",
+                    'attachment; filename="{}"'.format(export.name).encode(),
+                ),
+            ],
+        }
+    )
+    if head:
+        await send({"type": "http.response.body", "body": b""})
+        return 0
+
+    disconnected = asyncio.Event()
+
+    async def watch() -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        disconnected.set()
+
+    watcher = asyncio.ensure_future(watch())
+    sent: int = 0
+    pending: List[str] = list(export.header)
+    after: Optional[int] = 0
+    try:
+        while after is not None and not disconnected.is_set():
+            page: Tuple[List[str], Optional[int]] = await run_in_pool(
+                export.page, after
+            )
+            lines, after = page
+            pending.extend(lines)
+            if after is not None and sum(map(len, pending)) < CHUNK_BYTES:
+                continue
+            for chunk in encode_chunks(pending, CHUNK_BYTES):
+                if disconnected.is_set():
+                    break
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": True,
+                    }
+                )
+                sent += len(chunk)
+            pending = []
+        if disconnected.is_set():
+            log_cancelled(export, sent)
+            return -1
+        await send({"type": "http.response.body", "body": b""})
+        return sent
+    finally:
+        watcher.cancel()
+
+
+def _export_of(scope: Scope) -> Optional[Callable[[QueryDict], Export]]:
+    try:
+        return EXPORTS.get(resolve(scope["path"]).url_name)
+    except Resolver404:
+        return None
+
+
+def _allowed_host(scope: Scope) -> bool:
+    """ Whether the Host of the request is in settings.ALLOWED_HOSTS. """
+    host: str = ""
+    for name, value in scope.get("headers", []):
+        if name == b"host":
+            host = value.decode("latin-1")
+            break
+    else:
+        if scope.get("server"):
+            host = "{}:{}".format(*scope["server"])
+    allowed_hosts: List[str] = settings.ALLOWED_HOSTS
+    if settings.DEBUG and not allowed_hosts:
+        allowed_hosts = [".localhost", "127.0.0.1", "[::1]"]
+    domain, port = split_domain_port(host)
+    return bool(domain) and validate_host(domain, allowed_hosts)
+
+
+def streaming_application(fallback: Optional[Application] = None):
+    """
+    The ASGI application serving the streaming URLs, and passing other
+    requests to 'fallback'.
+    """
+
+    async def application(scope: Scope, receive: Receive, send: Send):
+        export = _export_of(scope) if scope["type"] == "http" else None
+        if export is None:
+            if fallback is not None:
+                return await fallback(scope, receive, send)
+            if scope["type"] == "http":
+                await _respond(send, 404, b"Not found", b"text/plain")
+            return
+        if not _allowed_host(scope):
+            await _respond(send, 400, b"Bad Request", b"text/plain")
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await _respond(send, 405, b"", b"text/plain")
+            return
+        params = QueryDict(scope.get("query_string", b"").decode("latin-1"))
+        try:
+            built: Export = await run_in_pool(export, params)
+        except ExportError as error:
+            await _respond(
+                send, 400, str(error).encode(), b"text/plain; charset=utf-8"
+            )
+            return
+        await stream_export(built, receive, send, scope["method"] == "HEAD")
+
+    return application
@@ -0,0 +1,154 @@
+"""
+Author-level views of the citation graph.
+
+With B the source × author incidence matrix (from the Source.authors
+through-table) and A the citation matrix, BᵀB is the co-authorship graph
+(weighted by the number of joint sources) and BᵀAB holds the author to author
+citation flows (the number of references from sources of one author to
+sources of the other).
+"""
+from itertools import chain
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.db import transaction
+from scipy import sparse
+
+from database.matrix import FETCH_CHUNK_SIZE, CitationMatrix, positions_of
+from database.models import Author, Source
+
+# (author ID, weight)
+WeightedAuthor = Tuple[int, int]
+
+
+class UnknownAuthorError(KeyError):
+    pass
+
+
+def read_authorships() -> np.ndarray:
+    """
+    Reads the (source_id, author_id) pairs of the Source.authors
+    through-table into an (n, 2) array, with a single values_list scan.
+    """
+    pairs = Source.authors.through.objects.values_list(
+        "source_id", "author_id"
+    )
+    flat: np.ndarray = np.fromiter(
+        chain.from_iterable(pairs.iterator(chunk_size=FETCH_CHUNK_SIZE)),
+        dtype=np.int64,
+    )
+    return flat.reshape(-1, 2)
+
+
+def _top(
+    row: sparse.csr_matrix, ids: np.ndarray, limit: int, exclude: int
+) -> List[WeightedAuthor]:
+    """
+    The 'limit' heaviest entries of a single matrix row as (id, weight)
+    pairs, heaviest first, leaving out the ID 'exclude'.
+    """
+    keep: np.ndarray = ids[row.indices] != exclude
+    indices, weights = row.indices[keep], row.data[keep]
+    order: np.ndarray = np.lexsort((ids[indices], -weights))[:limit]
+    return list(zip(ids[indices[order]].tolist(), weights[order].tolist()))
+
+
+class AuthorGraph:
+    """
+    Co-authorship and citation flow matrices over all authors. Both axes use
+    the position of the author ID in the sorted array of Author IDs.
+    """
+
+    def __init__(
+        self,
+        matrix: CitationMatrix,
+        author_ids: np.ndarray,
+        authorships: np.ndarray,
+    ) -> None:
+        self.matrix: CitationMatrix = matrix
+        self.author_ids: np.ndarray = np.asarray(author_ids, dtype=np.int64)
+        self.incidence: sparse.csr_matrix = sparse.csr_matrix(
+            (
+                np.ones(len(authorships), dtype=np.int32),
+                (
+                    matrix.index_of(authorships[:, 0]),
+                    self.index_of(authorships[:, 1]),
+                ),
+            ),
+            shape=(matrix.shape[0], len(self.author_ids)),
+        )
+        transposed: sparse.csr_matrix = self.incidence.T.tocsr()
+        joint_sources: sparse.csr_matrix = transposed @ self.incidence
+        self.coauthorship: sparse.csr_matrix = sparse.csr_matrix(
+            joint_sources
+            - sparse.diags(joint_sources.diagonal(), dtype=np.int32)
+        )
+        self.coauthorship.eliminate_zeros()
+        # Rows cite, columns are cited.
+        self.citation_flow: sparse.csr_matrix = (
+            transposed @ matrix.csr @ self.incidence
+        ).tocsr()
+        self.cited_flow: sparse.csr_matrix = self.citation_flow.T.tocsr()
+
+    @classmethod
+    def from_database(
+        cls, matrix: Optional[CitationMatrix] = None
+    ) -> "AuthorGraph":
+        """
+        Builds the graph from the database, over the given citation matrix
+        or one read along. Authorships of sources or authors that are not
+        part of the reads (created in between, or after the given matrix)
+        are left out.
+        """
+        with transaction.atomic():
+            if matrix is None:
+                matrix = CitationMatrix.from_database()
+            author_ids: np.ndarray = np.fromiter(
+                Author.objects.order_by("pk")
+                .values_list("pk", flat=True)
+                .iterator(chunk_size=FETCH_CHUNK_SIZE),
+                dtype=np.int64,
+            )
+            authorships: np.ndarray = read_authorships()
+        authorships = authorships[
+            np.isin(authorships[:, 0], matrix.source_ids)
+            & np.isin(authorships[:, 1], author_ids)
+        ]
+        return cls(matrix, author_ids, authorships)
+
+    def index_of(self, author_ids: Iterable[int]) -> np.ndarray:
+        """ Maps Author IDs to matrix indexes. """
+        return positions_of(
+            self.author_ids, author_ids, UnknownAuthorError, "author"
+        )
+
+    def top_collaborators(
+        self, author_id: int, limit: int = 10
+    ) -> List[WeightedAuthor]:
+        """ The authors with the most joint sources with the given author. """
+        index: int = int(self.index_of([author_id])[0])
+        return _top(
+            self.coauthorship[index], self.author_ids, limit, author_id
+        )
+
+    def most_cited_by(
+        self, author_id: int, limit: int = 10
+    ) -> List[WeightedAuthor]:
+        """
+        The authors whose sources cite the sources of the given author most
+        often, leaving out self-citations.
+        """
+        index: int = int(self.index_of([author_id])[0])
+        return _top(self.cited_flow[index], self.author_ids, limit, author_id)
+
+    def most_cited(
+        self, author_id: int, limit: int = 10
+    ) -> List[WeightedAuthor]:
+        """
+        The authors whose sources are cited most often by the sources of the
+        given author, leaving out self-citations.
+        """
+        index: int = int(self.index_of([author_id])[0])
+        return _top(
+            self.citation_flow[index], self.author_ids, limit, author_id
+        )
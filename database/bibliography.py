@@ -0,0 +1,272 @@
+"""
+Streaming parsers for bibliography files (BibTeX, RIS and CSV).
+
+Each parser reads its file line by line and yields one Record per entry, so
+memory use doesn't depend on the size of the file. Cited works are given by
+their citation key:
+
+- BibTeX: a comma-separated 'cites' field.
+- RIS: one 'CR' tag per cited work, the record key is the 'ID' tag.
+- CSV: a semicolon-separated 'cites' column. The other columns are 'key',
+  'title', 'year', 'authors' (semicolon-separated), 'journal', 'publisher',
+  'city', 'pages' and 'abstract'.
+"""
+import csv
+import hashlib
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+BIBTEX: str = "bibtex"
+RIS: str = "ris"
+CSV: str = "csv"
+
+FORMAT_EXTENSIONS: Dict[str, str] = {
+    ".bib": BIBTEX,
+    ".bibtex": BIBTEX,
+    ".ris": RIS,
+    ".csv": CSV,
+}
+
+# (first name, middle name(s), last name)
+Name = Tuple[Optional[str], Optional[str], str]
+
+
+class Record(NamedTuple):
+    key: str
+    title: str
+    year: Optional[int]
+    authors: List[Name]
+    journal: Optional[str] = None
+    publisher: Optional[str] = None
+    city: Optional[str] = None
+    pages: Tuple[Optional[int], Optional[int]] = (None, None)
+    abstract: Optional[str] = None
+    cites: List[str] = []
+
+
+def parse_name(name: str) -> Optional[Name]:
+    """
+    Splits 'Last, First Middle' or 'First Middle Last' into its parts.
+    Returns None for an empty name.
+    """
+    if "," in name:
+        last, given = (part.strip() for part in name.split(",", 1))
+        given_names: List[str] = given.split()
+    else:
+        parts: List[str] = name.split()
+        if not parts:
+            return None
+        last, given_names = parts[-1], parts[:-1]
+    if not last:
+        return None
+    first: Optional[str] = given_names[0] if given_names else None
+    middle: Optional[str] = " ".join(given_names[1:]) or None
+    return first, middle, last
+
+
+def parse_names(names: str, separator: str) -> List[Name]:
+    parsed = (parse_name(name) for name in re.split(separator, names))
+    return [name for name in parsed if name is not None]
+
+
+def parse_year(value: Optional[str]) -> Optional[int]:
+    match = re.search(r"\d{4}", value or "")
+    return int(match.group()) if match else None
+
+
+def parse_pages(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """ Parses '12-34' (or '12--34', or '12') into a page range. """
+    numbers: List[int] = [int(n) for n in re.findall(r"\d+", value or "")]
+    if not numbers:
+        return None, None
+    return numbers[0], numbers[-1] if len(numbers) > 1 else None
+
+
+def record_key(title: str, year: Optional[int], authors: List[Name]) -> str:
+    """ A stable key for records that don't have one. """
+    text: str = "|".join(
+        [title.casefold(), str(year)]
+        + [name[2].casefold() for name in authors]
+    )
+    return "sha1:" + hashlib.sha1(text.encode()).hexdigest()
+
+
+def make_record(
+    fields: Dict[str, Optional[str]], authors: List[Name], cites: List[str]
+) -> Record:
+    """ Builds a Record from the common fields of all formats. """
+    title: str = " ".join((fields.get("title") or "").split())
+    year: Optional[int] = parse_year(fields.get("year"))
+    return Record(
+        key=fields.get("key") or record_key(title, year, authors),
+        title=title,
+        year=year,
+        authors=authors,
+        journal=fields.get("journal") or None,
+        publisher=fields.get("publisher") or None,
+        city=fields.get("city") or None,
+        pages=parse_pages(fields.get("pages")),
+        abstract=fields.get("abstract") or None,
+        cites=[key for key in cites if key],
+    )
+
+
+_BIBTEX_ENTRY = re.compile(r"@\s*(\w+)\s*{\s*([^,\s]*)\s*,", re.DOTALL)
+_BIBTEX_FIELD = re.compile(r"\s*,?\s*([\w-]+)\s*=\s*", re.DOTALL)
+
+
+def _bibtex_value(text: str, start: int) -> Tuple[str, int]:
+    """
+    Reads the (braced, quoted or bare) field value at 'start' of an entry,
+    and returns it with the position after it.
+    """
+    inner: int = start + 1
+    if text[start] == "{":
+        depth, position = 0, start
+        while position < len(text):
+            if text[position] == "{":
+                depth += 1
+            elif text[position] == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[inner:position], position + 1
+            position += 1
+        return text[inner:], len(text)
+    if text[start] == '"':
+        end: int = text.find('"', inner)
+        end = len(text) if end == -1 else end
+        return text[inner:end], end + 1
+    match = re.match(r"[^,}\s]*", text[start:])
+    return match.group(), start + match.end()
+
+
+def _clean_bibtex(value: str) -> str:
+    """ Removes the braces and extra whitespace of a BibTeX value. """
+    return " ".join(value.replace("{", "").replace("}", "").split())
+
+
+def _bibtex_entries(file: TextIO) -> Iterator[str]:
+    """ Yields the text of each '@type{...}' entry, one at a time. """
+    lines: List[str] = []
+    depth: int = 0
+    opened: bool = False
+    for line in file:
+        if not lines:
+            at: int = line.find("@")
+            if at == -1:
+                continue
+            line = line[at:]
+        lines.append(line)
+        opened = opened or "{" in line
+        depth += line.count("{") - line.count("}")
+        if opened and depth <= 0:
+            yield "".join(lines)
+            lines, depth, opened = [], 0, False
+    if lines:
+        yield "".join(lines)
+
+
+def parse_bibtex(file: TextIO) -> Iterator[Record]:
+    for entry in _bibtex_entries(file):
+        match = _BIBTEX_ENTRY.match(entry)
+        if not match or match.group(1).lower() in (
+            "comment",
+            "preamble",
+            "string",
+        ):
+            continue
+        raw: Dict[str, str] = {}
+        position: int = match.end()
+        while True:
+            field = _BIBTEX_FIELD.match(entry, position)
+            if not field or field.end() >= len(entry):
+                break
+            value, position = _bibtex_value(entry, field.end())
+            raw[field.group(1).lower()] = _clean_bibtex(value)
+        yield make_record(
+            {
+                "key": match.group(2),
+                "title": raw.get("title"),
+                "year": raw.get("year"),
+                "journal": raw.get("journal"),
+                "publisher": raw.get("publisher"),
+                "city": raw.get("address"),
+                "pages": raw.get("pages"),
+                "abstract": raw.get("abstract"),
+            },
+            parse_names(raw.get("author", ""), r"\s+and\s+"),
+            [key.strip() for key in raw.get("cites", "").split(",")],
+        )
+
+
+_RIS_LINE = re.compile(r"^([A-Z][A-Z0-9])  -\s?(.*)$")
+
+_RIS_FIELDS: Dict[str, str] = {
+    "ID": "key",
+    "TI": "title",
+    "T1": "title",
+    "PY": "year",
+    "Y1": "year",
+    "DA": "year",
+    "JO": "journal",
+    "JF": "journal",
+    "T2": "journal",
+    "PB": "publisher",
+    "CY": "city",
+    "AB": "abstract",
+    "N2": "abstract",
+}
+
+
+def parse_ris(file: TextIO) -> Iterator[Record]:
+    fields: Dict[str, str] = {}
+    authors: List[str] = []
+    cites: List[str] = []
+    for line in file:
+        match = _RIS_LINE.match(line.rstrip("\r\n"))
+        if not match:
+            continue
+        tag, value = match.group(1), match.group(2).strip()
+        if tag == "TY":
+            fields, authors, cites = {}, [], []
+        elif tag == "ER":
+            yield make_record(
+                {
+                    **fields,
+                    "pages": "{}-{}".format(
+                        fields.get("SP", ""), fields.get("EP", "")
+                    ),
+                },
+                parse_names("\n".join(authors), "\n"),
+                cites,
+            )
+        elif tag in ("AU", "A1"):
+            authors.append(value)
+        elif tag == "CR":
+            cites.append(value)
+        elif tag in ("SP", "EP"):
+            fields[tag] = value
+        elif tag in _RIS_FIELDS:
+            fields.setdefault(_RIS_FIELDS[tag], value)
+
+
+def parse_csv(file: TextIO) -> Iterator[Record]:
+    for row in csv.DictReader(file):
+        row = {key.strip().lower(): value for key, value in row.items() if key}
+        yield make_record(
+            row,
+            parse_names(row.get("authors") or "", ";"),
+            [key.strip() for key in (row.get("cites") or "").split(";")],
+        )
+
+
+PARSERS = {BIBTEX: parse_bibtex, RIS: parse_ris, CSV: parse_csv}
+
+
+def parse(file: TextIO, format: str) -> Iterator[Record]:
+    """ Yields the records of a bibliography file in the given format. """
+    try:
+        parser = PARSERS[format]
+    except KeyError:
+        raise ValueError("Unknown bibliography format: {}".format(format))
+    return parser(file)
@@ -0,0 +1,74 @@
+"""
+Helpers for high-volume inserts that bypass the one-INSERT-per-row ORM path.
+"""
+from itertools import islice
+from typing import Iterable, Iterator, List, Type, TypeVar
+
+from django.db import connection, models, transaction
+from django.dispatch import Signal
+
+DEFAULT_BATCH_SIZE: int = 10000
+
+# Maximum number of values in a single 'IN (...)' clause (SQLite limit).
+MAX_IDS_PER_QUERY: int = 500
+
+# Sent by bulk_insert after a batch of rows has been inserted with
+# bulk_create, which does not send post_save. Receivers live in
+# database.signals.
+post_bulk_create = Signal(providing_args=["instances"])
+
+T = TypeVar("T")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """ Yields lists of at most 'size' items from the given iterable. """
+    iterator: Iterator[T] = iter(iterable)
+    while True:
+        chunk: List[T] = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_insert(
+    model: Type[models.Model],
+    objects: List[models.Model],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[int]:
+    """
+    Inserts the given (unsaved) instances with bulk_create in a single
+    transaction, and returns their primary keys in insertion order.
+    Sends the post_bulk_create signal for the inserted instances. Models
+    with a 'validate_batch' classmethod (Source) get the batch checked first.
+
+    Backends that cannot return IDs from a bulk insert (SQLite) get the
+    freshly allocated keys read back from the table, which assumes no other
+    process is inserting into the same table at the same time.
+    """
+    if not objects:
+        return []
+    validate_batch = getattr(model, "validate_batch", None)
+    if validate_batch is not None:
+        validate_batch(objects)
+    # Never exceed the backend's limit on query parameters per statement.
+    max_batch_size: int = connection.ops.bulk_batch_size(
+        model._meta.concrete_fields, objects
+    )
+    with transaction.atomic():
+        last_pk: int = (
+            model.objects.order_by("-pk").values_list("pk", flat=True).first()
+            or 0
+        )
+        model.objects.bulk_create(
+            objects, batch_size=min(batch_size, max_batch_size)
+        )
+        if objects[0].pk is None:
+            pks: List[int] = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[: len(objects)]
+            )
+            for instance, pk in zip(objects, pks):
+                instance.pk = pk
+        post_bulk_create.send(sender=model, instances=objects)
+    return [instance.pk for instance in objects]
@@ -0,0 +1,134 @@
+"""
+Cache of derived results (degree vectors, top-cited lists, neighbour lists,
+see database.derived) keyed by the versions of the tables they are computed
+from, and the name and generation of the database (see database.versions).
+
+Entries never have to be deleted: a change to a table bumps its version,
+and lookups with the new version miss. Values are kept in two levels:
+
+- a bounded in-process LRU of the most recently used results, without any
+  serialization;
+- the 'derived' cache of CACHES (file-based by default), shared between
+  processes and bounded by its MAX_ENTRIES.
+
+Hits and misses of both levels are counted per process, see statistics()
+and the /debug/cache/ view.
+"""
+import threading
+from collections import Counter, OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Tuple, Type
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, models
+
+from database.versions import get_generation_and_versions
+
+DERIVED_CACHE: str = "derived"
+
+_MISSING = object()
+
+
+class VersionedCache:
+    """
+    Two-level cache of values that depend on tables. Each key holds a single
+    (versions, value) entry locally, which is replaced when the versions
+    change.
+    """
+
+    def __init__(self, alias: str = DERIVED_CACHE, max_entries: int = 128):
+        self.alias: str = alias
+        self.max_entries: int = max_entries
+        self.entries: "OrderedDict[str, Tuple[str, Any]]" = (OrderedDict())
+        self.counts: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def get_or_compute(
+        self,
+        key: str,
+        depends_on: Tuple[Type[models.Model], ...],
+        compute: Callable[[], Any],
+    ) -> Any:
+        """
+        The value of the key for the current versions of the given models,
+        computed (and stored) when neither level has it.
+        """
+        generation, table_versions = get_generation_and_versions(*depends_on)
+        versions: str = "{}#{}:{}".format(
+            connection.settings_dict["NAME"],
+            generation,
+            ",".join(
+                "{}={}".format(model._meta.db_table, version)
+                for model, version in zip(depends_on, table_versions)
+            ),
+        )
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self.entries.move_to_end(key)
+                self.counts["hits"] += 1
+                return entry[1]
+        shared_key: str = "{}@{}".format(key, versions)
+        value: Any = caches[self.alias].get(shared_key, _MISSING)
+        found: bool = value is not _MISSING
+        if not found:
+            value = compute()
+            caches[self.alias].set(shared_key, value)
+        with self.lock:
+            self.counts["shared_hits" if found else "misses"] += 1
+            self.entries[key] = (versions, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counts["evictions"] += 1
+        return value
+
+    def statistics(self) -> Dict[str, Any]:
+        lookups: int = sum(
+            self.counts[name] for name in ("hits", "shared_hits", "misses")
+        )
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.counts["hits"],
+            "shared_hits": self.counts["shared_hits"],
+            "misses": self.counts["misses"],
+            "evictions": self.counts["evictions"],
+            "hit_rate": (
+                (lookups - self.counts["misses"]) / lookups if lookups else 0.0
+            ),
+        }
+
+    def clear(self) -> None:
+        """ Empties both levels and resets the counters. """
+        with self.lock:
+            self.entries.clear()
+            self.counts.clear()
+        caches[self.alias].clear()
+
+
+derived_cache = VersionedCache(max_entries=settings.DERIVED_CACHE_MAX_ENTRIES)
+
+
+def versioned_cache(
+    *depends_on: Type[models.Model],
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Caches the results of a function of hashable arguments in the derived
+    cache, until one of the given models changes.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(func)
+        def wrapper(*args: Hashable) -> Any:
+            key: str = "{}.{}({})".format(
+                func.__module__, func.__name__, ",".join(map(repr, args))
+            )
+            return derived_cache.get_or_compute(
+                key, depends_on, lambda: func(*args)
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,91 @@
+"""
+Maintenance of the denormalized Source.times_cited and
+Source.references_made counters.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+
+from database import versions
+from database.bulk import MAX_IDS_PER_QUERY, chunked
+from database.models import Reference, Source
+
+
+def _apply_deltas(field: str, source_ids: Iterable[int], sign: int) -> None:
+    """
+    Adds 'sign' to the counter 'field' for every occurrence of a source ID,
+    with one UPDATE per distinct delta (and per chunk of IDs).
+    """
+    ids_per_delta: Dict[int, List[int]] = {}
+    for source_id, occurrences in Counter(source_ids).items():
+        ids_per_delta.setdefault(occurrences * sign, []).append(source_id)
+    for delta, ids in ids_per_delta.items():
+        for chunk in chunked(ids, MAX_IDS_PER_QUERY):
+            Source.objects.filter(pk__in=chunk).update(
+                **{field: F(field) + delta}
+            )
+
+
+def add_references(
+    referrer_ids: Iterable[int], reference_ids: Iterable[int]
+) -> None:
+    """ Updates the counters for newly created references. """
+    _apply_deltas("references_made", referrer_ids, 1)
+    _apply_deltas("times_cited", reference_ids, 1)
+
+
+def remove_references(
+    referrer_ids: Iterable[int], reference_ids: Iterable[int]
+) -> None:
+    """ Updates the counters for deleted references. """
+    _apply_deltas("references_made", referrer_ids, -1)
+    _apply_deltas("times_cited", reference_ids, -1)
+
+
+def _count_subquery(field: str) -> Coalesce:
+    """ Number of references with 'field' pointing to the outer source. """
+    references: QuerySet[Reference] = (
+        Reference.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(references), 0)
+
+
+def recompute_citation_counts(
+    queryset: Optional["QuerySet[Source]"] = None,
+) -> int:
+    """
+    Rebuilds the counters of the given sources (all sources by default) from
+    the Reference table, in a single set-based UPDATE. Returns the number of
+    updated sources.
+    """
+    if queryset is None:
+        queryset = Source.objects.all()
+    updated: int = _recount(queryset)
+    versions.bump(Source)
+    return updated
+
+
+def _recount(queryset: "QuerySet[Source]") -> int:
+    return queryset.update(
+        times_cited=_count_subquery("reference"),
+        references_made=_count_subquery("referrer"),
+    )
+
+
+def references_deleted(source_ids: Iterable[int]) -> None:
+    """
+    Rebuilds the counters of the sources connected by deleted references,
+    with one UPDATE per chunk of IDs. Deletes of references don't send
+    signals, so that deleting sources can delete their references in a
+    single query.
+    """
+    for chunk in chunked(sorted(set(source_ids)), MAX_IDS_PER_QUERY):
+        _recount(Source.objects.filter(pk__in=chunk))
+    versions.bump(Source)
+    versions.bump(Reference)
@@ -0,0 +1,187 @@
+"""
+h-index and g-index of the sources of every author, journal and publisher.
+
+The indices of all entities of a kind are computed in a single vectorized
+pass over the (entity, source) pairs, mapped to the times_cited counter of
+their source and sorted by entity and decreasing citations. The rank of a
+source within its entity then gives both indices:
+
+- the h-index is the number of sources cited at least as many times as their
+  rank;
+- the g-index is the highest rank at which the cumulated citations reach the
+  square of the rank (so it is at most the number of sources).
+
+Entities without sources are stored with zero indices. All rows are replaced
+on each run.
+"""
+from collections import Counter
+from itertools import chain
+from typing import Iterator, NamedTuple, Type
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Model, QuerySet, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from database.bulk import DEFAULT_BATCH_SIZE, chunked
+from database.matrix import FETCH_CHUNK_SIZE
+from database.models import (
+    Author,
+    AuthorIndices,
+    CitationIndices,
+    Journal,
+    JournalIndices,
+    Publisher,
+    PublisherIndices,
+    Source,
+)
+
+# Journal or publisher of the sources that have none.
+MISSING: int = -1
+
+
+class Indices(NamedTuple):
+    """ The indices of each entity, aligned with its sorted IDs. """
+
+    entity_ids: np.ndarray
+    h_index: np.ndarray
+    g_index: np.ndarray
+    sources: np.ndarray
+    citations: np.ndarray
+
+
+def _read(queryset: QuerySet, columns: int) -> np.ndarray:
+    """ Reads the rows of a values_list queryset into an int64 array. """
+    flat: np.ndarray = np.fromiter(
+        chain.from_iterable(queryset.iterator(chunk_size=FETCH_CHUNK_SIZE)),
+        dtype=np.int64,
+    )
+    return flat.reshape(-1, columns)
+
+
+def _read_ids(model: Type[Model]) -> np.ndarray:
+    return _read(
+        model.objects.order_by("pk").values_list("pk"), columns=1
+    ).ravel()
+
+
+def compute_indices(
+    entity_ids: np.ndarray, entities: np.ndarray, citations: np.ndarray
+) -> Indices:
+    """
+    The indices of the given sorted entity IDs, from the entity and the
+    number of citations of each (entity, source) pair.
+    """
+    order: np.ndarray = np.lexsort((-citations, entities))
+    citations = citations[order]
+    groups: np.ndarray = np.searchsorted(entity_ids, entities[order])
+    sources: np.ndarray = np.bincount(groups, minlength=len(entity_ids))
+    starts: np.ndarray = np.cumsum(sources) - sources
+    ranks: np.ndarray = np.arange(1, len(groups) + 1) - starts[groups]
+    totals: np.ndarray = np.cumsum(citations)
+    cumulated: np.ndarray = (
+        totals - np.concatenate([[0], totals])[starts][groups]
+    )
+    g_index: np.ndarray = np.zeros(len(entity_ids), dtype=np.int64)
+    np.maximum.at(
+        g_index, groups, np.where(cumulated >= ranks * ranks, ranks, 0)
+    )
+    return Indices(
+        entity_ids=entity_ids,
+        h_index=np.bincount(
+            groups, weights=citations >= ranks, minlength=len(entity_ids)
+        ).astype(np.int64),
+        g_index=g_index,
+        sources=sources,
+        citations=np.bincount(
+            groups, weights=citations, minlength=len(entity_ids)
+        ).astype(np.int64),
+    )
+
+
+def _objects(
+    model: Type[CitationIndices], field: str, indices: Indices
+) -> Iterator[CitationIndices]:
+    computed_at = timezone.now()
+    for entity_id, h_index, g_index, sources, citations in zip(
+        *(values.tolist() for values in indices)
+    ):
+        yield model(
+            h_index=h_index,
+            g_index=g_index,
+            sources=sources,
+            citations=citations,
+            computed_at=computed_at,
+            **{field: entity_id}
+        )
+
+
+def store_indices(
+    model: Type[CitationIndices], field: str, indices: Indices
+) -> int:
+    """ Replaces all stored indices of a kind of entity. """
+    with transaction.atomic():
+        model.objects.all().delete()
+        for batch in chunked(
+            _objects(model, field, indices), DEFAULT_BATCH_SIZE
+        ):
+            model.objects.bulk_create(batch)
+    return len(indices.entity_ids)
+
+
+def compute_citation_indices() -> Counter:
+    """
+    Computes and stores the indices of all authors, journals and
+    publishers. Returns the number of stored rows per kind of entity.
+    """
+    with transaction.atomic():
+        sources: np.ndarray = _read(
+            Source.objects.order_by("pk").values_list(
+                "pk",
+                "times_cited",
+                Coalesce("source_journal_id", Value(MISSING)),
+                Coalesce("source_publisher_id", Value(MISSING)),
+            ),
+            columns=4,
+        )
+        authorships: np.ndarray = _read(
+            Source.authors.through.objects.values_list(
+                "author_id", "source_id"
+            ),
+            columns=2,
+        )
+        author_ids: np.ndarray = _read_ids(Author)
+        journal_ids: np.ndarray = _read_ids(Journal)
+        publisher_ids: np.ndarray = _read_ids(Publisher)
+    source_ids, times_cited = sources[:, 0], sources[:, 1]
+    # Skips the rows pointing to entities that didn't exist when they were
+    # read, where the database doesn't isolate the reads.
+    authorships = authorships[
+        np.isin(authorships[:, 1], source_ids)
+        & np.isin(authorships[:, 0], author_ids)
+    ]
+
+    stats: Counter = Counter()
+    stats["authors"] = store_indices(
+        AuthorIndices,
+        "author_id",
+        compute_indices(
+            author_ids,
+            authorships[:, 0],
+            times_cited[np.searchsorted(source_ids, authorships[:, 1])],
+        ),
+    )
+    for key, model, field, entity_ids, column in (
+        ("journals", JournalIndices, "journal_id", journal_ids, 2),
+        ("publishers", PublisherIndices, "publisher_id", publisher_ids, 3),
+    ):
+        published: np.ndarray = np.isin(sources[:, column], entity_ids)
+        stats[key] = store_indices(
+            model,
+            field,
+            compute_indices(
+                entity_ids, sources[published, column], times_cited[published],
+            ),
+        )
+    return stats
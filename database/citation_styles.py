@@ -0,0 +1,310 @@
+"""
+Formatted bibliography entries of sources in the APA, MLA and Chicago
+(notes and bibliography) styles, as plain text.
+
+render() formats all sources of a queryset at once: the data of the sources,
+their journals, publishers and authors is read with two values_list queries
+per chunk of 500 sources, whatever the number of relations. Formatted
+entries are stored in the default cache, keyed on the style, the Source ID
+and the bibliography_stamp of the source. The signal receivers in
+database.signals replace the stamps of the sources whose data, authors,
+journal or publisher change (see invalidate()), so the entries cached by
+every process for these sources, and only these, are no longer read.
+Changes made with QuerySet.update() don't send signals; call invalidate()
+after them.
+"""
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+
+from database.bibliography import Name
+from database.bulk import MAX_IDS_PER_QUERY, chunked
+from database.models import Source, random_stamp
+
+APA: str = "apa"
+MLA: str = "mla"
+CHICAGO: str = "chicago"
+
+CACHE_KEY: str = "citation:{}:{}:{}"
+
+# Time entries are kept in the cache for, in seconds. Entries of previous
+# stamps are never read again, and expire.
+CACHE_TIMEOUT: int = 24 * 60 * 60
+
+
+class Entry(NamedTuple):
+    """ The data of a source needed to format its entry. """
+
+    title: str
+    type: str
+    year: int
+    authors: List[Name]
+    journal: Optional[str] = None
+    publisher: Optional[str] = None
+    city: Optional[str] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+
+def _sentence(text: str) -> str:
+    """ Ends the text with a period, unless it already ends a sentence. """
+    text = text.strip()
+    return text if text.endswith((".", "?", "!")) else text + "."
+
+
+def _quoted(title: str) -> str:
+    """ A quoted title, with the closing period inside the quotes. """
+    return '"{}"'.format(_sentence(title))
+
+
+def _given_names(name: Name) -> List[str]:
+    return " ".join(part for part in name[:2] if part).split()
+
+
+def _initials(name: Name) -> str:
+    """ 'J. P.' for John Paul, 'J.-P.' for Jean-Paul. """
+    return " ".join(
+        "-".join(part[0].upper() + "." for part in given.split("-") if part)
+        for given in _given_names(name)
+    )
+
+
+def _inverted(name: Name) -> str:
+    """ 'Smith, John Paul' """
+    given: str = " ".join(_given_names(name))
+    return "{}, {}".format(name[2], given) if given else name[2]
+
+
+def _natural(name: Name) -> str:
+    """ 'John Paul Smith' """
+    return " ".join(_given_names(name) + [name[2]])
+
+
+def _pages(entry: Entry, separator: str = "–") -> str:
+    if entry.page_start is None:
+        return ""
+    if entry.page_end is None or entry.page_end == entry.page_start:
+        return str(entry.page_start)
+    return "{}{}{}".format(entry.page_start, separator, entry.page_end)
+
+
+def _join(parts: List[str], conjunction: str) -> str:
+    """ 'A, B, and C' (the serial comma is also used for two names). """
+    if len(parts) == 1:
+        return parts[0]
+    return "{}, {} {}".format(", ".join(parts[:-1]), conjunction, parts[-1])
+
+
+def format_apa(entry: Entry) -> str:
+    """
+    Smith, J. P., & Doe, A. (2020). Title. Journal, 10–20.
+    Smith, J. P. (2020). Title. Publisher.
+    """
+    names: List[str] = [
+        "{}, {}".format(name[2], _initials(name))
+        if _initials(name)
+        else name[2]
+        for name in entry.authors
+    ]
+    if len(names) > 20:
+        names = names[:19] + ["... " + names[-1]]
+        authors: str = ", ".join(names)
+    else:
+        authors = _join(names, "&") if names else ""
+    title: str = _sentence(entry.title)
+    year: str = "({}).".format(entry.year)
+    parts: List[str] = (
+        [_sentence(authors), year, title] if authors else [title, year]
+    )
+    if entry.type == "AR":
+        pages: str = _pages(entry)
+        parts.append(
+            _sentence(
+                "{}, {}".format(entry.journal, pages)
+                if pages
+                else entry.journal or ""
+            )
+        )
+    elif entry.publisher:
+        parts.append(_sentence(entry.publisher))
+    return " ".join(parts)
+
+
+def format_mla(entry: Entry) -> str:
+    """
+    Smith, John Paul, and Jane Doe. "Title." Journal, 2020, pp. 10-20.
+    Smith, John Paul, et al. Title. Publisher, 2020.
+    """
+    authors: str = ""
+    if len(entry.authors) > 2:
+        authors = "{}, et al.".format(_inverted(entry.authors[0]))
+    elif entry.authors:
+        authors = _join(
+            [_inverted(entry.authors[0])]
+            + [_natural(name) for name in entry.authors[1:]],
+            "and",
+        )
+    parts: List[str] = [_sentence(authors)] if authors else []
+    if entry.type == "AR":
+        parts.append(_quoted(entry.title))
+        details: List[str] = [entry.journal or "", str(entry.year)]
+        if _pages(entry):
+            details.append("pp. " + _pages(entry, "-"))
+        parts.append(_sentence(", ".join(details)))
+    else:
+        parts.append(_sentence(entry.title))
+        parts.append(
+            _sentence(
+                ", ".join(
+                    [
+                        part
+                        for part in (entry.publisher, str(entry.year))
+                        if part
+                    ]
+                )
+            )
+        )
+    return " ".join(parts)
+
+
+def format_chicago(entry: Entry) -> str:
+    """
+    Smith, John Paul, and Jane Doe. "Title." Journal (2020): 10–20.
+    Smith, John Paul. Title. City: Publisher, 2020.
+    """
+    names: List[str] = [_inverted(name) for name in entry.authors[:1]] + [
+        _natural(name) for name in entry.authors[1:]
+    ]
+    if len(names) > 10:
+        authors: str = ", ".join(names[:7]) + ", et al."
+    else:
+        authors = _join(names, "and") if names else ""
+    parts: List[str] = [_sentence(authors)] if authors else []
+    if entry.type == "AR":
+        parts.append(_quoted(entry.title))
+        pages: str = _pages(entry)
+        parts.append(
+            _sentence(
+                "{} ({}){}".format(
+                    entry.journal, entry.year, ": " + pages if pages else ""
+                )
+            )
+        )
+    else:
+        parts.append(_sentence(entry.title))
+        publisher: str = ": ".join(
+            part for part in (entry.city, entry.publisher) if part
+        )
+        parts.append(
+            _sentence(
+                "{}, {}".format(publisher, entry.year)
+                if publisher
+                else str(entry.year)
+            )
+        )
+    return " ".join(parts)
+
+
+STYLES: Dict[str, Callable[[Entry], str]] = {
+    APA: format_apa,
+    MLA: format_mla,
+    CHICAGO: format_chicago,
+}
+
+
+def load_entries(source_ids: List[int]) -> Dict[int, Entry]:
+    """
+    Reads the entries of the given sources, with their authors in the order
+    they were added.
+    """
+    through = Source.authors.through
+    entries: Dict[int, Entry] = {}
+    for chunk in chunked(source_ids, MAX_IDS_PER_QUERY):
+        authors: Dict[int, List[Name]] = defaultdict(list)
+        for source_id, first, middle, last in (
+            through.objects.filter(source_id__in=chunk)
+            .order_by("pk")
+            .values_list(
+                "source_id",
+                "author__first_name",
+                "author__middle_name",
+                "author__last_name",
+            )
+        ):
+            authors[source_id].append((first, middle, last))
+        for row in Source.objects.filter(pk__in=chunk).values_list(
+            "pk",
+            "title",
+            "type",
+            "year_of_publication",
+            "journal_page_range_start",
+            "journal_page_range_end",
+            "source_journal__name",
+            "source_journal__journal_publisher__name",
+            "source_journal__journal_publisher__city",
+            "source_publisher__name",
+            "source_publisher__city",
+        ):
+            pk, title, type, year, start, end, journal = row[:7]
+            publisher, city = row[9:11] if row[9] else row[7:9]
+            entries[pk] = Entry(
+                title=title,
+                type=type,
+                year=year,
+                authors=authors[pk],
+                journal=journal,
+                publisher=publisher,
+                city=city,
+                page_start=start,
+                page_end=end,
+            )
+    return entries
+
+
+def render(sources: QuerySet, style: str = APA) -> Dict[int, str]:
+    """
+    The formatted entries of the sources by Source ID, in the order of the
+    queryset. Raises KeyError for unknown styles.
+    """
+    formatter: Callable[[Entry], str] = STYLES[style]
+    keys: Dict[int, str] = {
+        source_id: CACHE_KEY.format(style, source_id, stamp)
+        for source_id, stamp in sources.values_list("pk", "bibliography_stamp")
+    }
+    cached: Dict[str, str] = cache.get_many(keys.values())
+    missing: List[int] = [
+        source_id for source_id, key in keys.items() if key not in cached
+    ]
+    for source_id, entry in load_entries(missing).items():
+        cached[keys[source_id]] = formatter(entry)
+    cache.set_many(
+        {
+            keys[source_id]: cached[keys[source_id]]
+            for source_id in missing
+            if keys[source_id] in cached
+        },
+        timeout=CACHE_TIMEOUT,
+    )
+    return {
+        source_id: cached[key]
+        for source_id, key in keys.items()
+        if key in cached
+    }
+
+
+def invalidate(source_ids: Union[QuerySet, Iterable[int]]) -> None:
+    """
+    Replaces the stamps of the given sources (IDs, or a values_list queryset
+    of IDs, which is used as a subquery), so their cached entries are no
+    longer read, in all styles and processes.
+    """
+    stamp: int = random_stamp()
+    if isinstance(source_ids, QuerySet):
+        Source.objects.filter(pk__in=source_ids).update(
+            bibliography_stamp=stamp
+        )
+        return
+    for chunk in chunked(source_ids, MAX_IDS_PER_QUERY):
+        Source.objects.filter(pk__in=chunk).update(bibliography_stamp=stamp)
@@ -0,0 +1,192 @@
+"""
+De-duplication of authors that were created several times with different
+spellings ('J. P. Smith', 'John Smith', 'Jóhn P. Smith').
+
+Authors are grouped into blocks by their blocking key: the transliterated
+last name plus the first initial, stored in the indexed Author.blocking_key
+column. Only the spelling variants within one block are compared, so the
+work grows with the block sizes instead of quadratically with the number of
+authors. Two variants match when their given names agree token by token,
+where an initial matches any name starting with it and one of them may have
+fewer given names. A variant that matches more than one group (like 'J.
+Smith' with both 'John Smith' and 'James Smith') is left alone.
+"""
+import re
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from django.db import connection, transaction
+from text_unidecode import unidecode
+
+from database.bulk import MAX_IDS_PER_QUERY, bulk_insert, chunked
+from database.models import Author, AuthorIndices, Source
+from database.signals import sources_changed
+
+# (author ID, given name tokens)
+Variant = Tuple[int, Tuple[str, ...]]
+
+
+def _tokens(name: Optional[str]) -> List[str]:
+    """ Lowercase ASCII words of a name ('J.-P.' gives ['j', 'p']). """
+    return re.findall(r"[a-z0-9]+", unidecode(name or "").lower())
+
+
+def given_names(
+    first_name: Optional[str], middle_name: Optional[str]
+) -> Tuple[str, ...]:
+    return tuple(_tokens(first_name) + _tokens(middle_name))
+
+
+def blocking_key(
+    first_name: Optional[str],
+    middle_name: Optional[str],
+    last_name: Optional[str],
+) -> str:
+    """ The transliterated last name and the first initial: 'smith:j'. """
+    names: Tuple[str, ...] = given_names(first_name, middle_name)
+    return "{}:{}".format(
+        "".join(_tokens(last_name))[:200], names[0][0] if names else ""
+    )
+
+
+def compatible(first: Tuple[str, ...], second: Tuple[str, ...]) -> bool:
+    """
+    Whether two sequences of given names can belong to the same person:
+    full names must be equal, initials must match the first letter.
+    """
+    for one, other in zip(first, second):
+        if len(one) > 1 and len(other) > 1:
+            if one != other:
+                return False
+        elif one[0] != other[0]:
+            return False
+    return True
+
+
+def _specificity(variant: Variant) -> Tuple[int, int, int]:
+    """ Sort key putting the most complete spelling (then lowest ID) first. """
+    author_id, names = variant
+    return -len(names), -sum(len(name) for name in names), author_id
+
+
+def cluster_block(variants: List[Variant]) -> List[List[int]]:
+    """
+    Groups the authors of one block into clusters of duplicates. The first
+    ID of each cluster is the most complete spelling, which is kept when
+    merging.
+    """
+    clusters: List[List[Variant]] = []
+    for variant in sorted(variants, key=_specificity):
+        matches: List[List[Variant]] = [
+            cluster
+            for cluster in clusters
+            if all(compatible(variant[1], member[1]) for member in cluster)
+        ]
+        if len(matches) == 1:
+            matches[0].append(variant)
+        elif not matches:
+            clusters.append([variant])
+    return [
+        [author_id for author_id, names in cluster]
+        for cluster in clusters
+        if len(cluster) > 1
+    ]
+
+
+def update_blocking_keys(only_missing: bool = True) -> int:
+    """
+    Computes the blocking keys of the authors that were inserted without
+    save() (or of all authors), in bulk. Returns the number of updates.
+    """
+    authors = Author.objects.order_by("pk").only(
+        "first_name", "middle_name", "last_name"
+    )
+    if only_missing:
+        authors = authors.filter(blocking_key="")
+    updated: int = 0
+    last_pk: int = 0
+    while True:
+        chunk: List[Author] = list(
+            authors.filter(pk__gt=last_pk)[:MAX_IDS_PER_QUERY]
+        )
+        if not chunk:
+            return updated
+        for author in chunk:
+            author.blocking_key = blocking_key(
+                author.first_name, author.middle_name, author.last_name
+            )
+        Author.objects.bulk_update(chunk, ["blocking_key"])
+        updated += len(chunk)
+        last_pk = chunk[-1].pk
+
+
+def find_duplicates() -> Iterator[List[int]]:
+    """
+    Yields the clusters of duplicated authors (see cluster_block), reading
+    the authors block by block in blocking key order.
+    """
+    update_blocking_keys()
+    rows = (
+        Author.objects.exclude(blocking_key__endswith=":")
+        .order_by("blocking_key", "pk")
+        .values_list("blocking_key", "pk", "first_name", "middle_name")
+        .iterator()
+    )
+    for key, block in groupby(rows, key=lambda row: row[0]):
+        variants: List[Variant] = [
+            (row[1], given_names(row[2], row[3])) for row in block
+        ]
+        if len(variants) > 1:
+            yield from cluster_block(variants)
+
+
+def merge_clusters(clusters: List[List[int]]) -> int:
+    """
+    Merges each cluster into its first author: the Source.authors links of
+    the duplicates are re-pointed and the duplicates deleted, in bulk.
+    Returns the number of deleted authors.
+    """
+    keep: Dict[int, int] = {
+        duplicate: cluster[0]
+        for cluster in clusters
+        for duplicate in cluster[1:]
+    }
+    through = Source.authors.through
+    with transaction.atomic():
+        links: Set[Tuple[int, int]] = set()
+        for chunk in chunked(keep, MAX_IDS_PER_QUERY):
+            links.update(
+                (source_id, keep[author_id])
+                for source_id, author_id in through.objects.filter(
+                    author_id__in=chunk
+                ).values_list("source_id", "author_id")
+            )
+            through.objects.filter(author_id__in=chunk).delete()
+        existing: Set[Tuple[int, int]] = set()
+        for chunk in chunked(set(keep.values()), MAX_IDS_PER_QUERY):
+            existing.update(
+                through.objects.filter(author_id__in=chunk).values_list(
+                    "source_id", "author_id"
+                )
+            )
+        bulk_insert(
+            through,
+            [
+                through(source_id=source_id, author_id=author_id)
+                for source_id, author_id in sorted(links - existing)
+            ],
+        )
+        # The duplicates have no links left, so the Author delete receivers
+        # would have nothing to reindex: delete them with one query per
+        # chunk instead of collecting and signalling each of them.
+        with connection.cursor() as cursor:
+            for chunk in chunked(keep, MAX_IDS_PER_QUERY):
+                AuthorIndices.objects.filter(author_id__in=chunk).delete()
+                cursor.execute(
+                    "DELETE FROM {} WHERE id IN ({})".format(
+                        Author._meta.db_table, ", ".join(["%s"] * len(chunk))
+                    ),
+                    chunk,
+                )
+        sources_changed(source_id for source_id, author_id in links)
+    return len(keep)
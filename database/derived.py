@@ -0,0 +1,63 @@
+"""
+Results derived from the citation graph that are cheap to keep but costly
+to recompute on every request, cached until the tables they are computed
+from change (see database.caching).
+"""
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+from django.db.models import Count, Q
+
+from database.caching import versioned_cache
+from database.matrix import CitationMatrix
+from database.models import Evaluation, Reference, Source
+
+
+@versioned_cache(Source, Reference)
+def degree_vectors() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The sorted Source IDs with the number of distinct sources citing them
+    (in-degree) and cited by them (out-degree), as aligned arrays.
+    """
+    matrix: CitationMatrix = CitationMatrix.from_database()
+    return matrix.source_ids, matrix.in_degree(), matrix.out_degree()
+
+
+@versioned_cache(Source, Reference)
+def top_cited(limit: int = 10) -> List[Tuple[int, int]]:
+    """ (source ID, times cited) of the most cited sources. """
+    return list(
+        Source.objects.order_by("-times_cited", "pk").values_list(
+            "pk", "times_cited"
+        )[:limit]
+    )
+
+
+@versioned_cache(Reference)
+def neighbours(source_id: int) -> Dict[str, List[int]]:
+    """ The IDs of the sources cited by and citing a source. """
+    edges = Reference.objects.filter(
+        Q(referrer_id=source_id) | Q(reference_id=source_id)
+    )
+    references: Set[int] = set()
+    citations: Set[int] = set()
+    for referrer_id, reference_id in edges.values_list(
+        "referrer_id", "reference_id"
+    ):
+        if referrer_id == source_id:
+            references.add(reference_id)
+        if reference_id == source_id:
+            citations.add(referrer_id)
+    return {"references": sorted(references), "citations": sorted(citations)}
+
+
+@versioned_cache(Evaluation)
+def most_favorited(limit: int = 10) -> List[Tuple[int, int]]:
+    """ (source ID, number of favorites) of the most favorited sources. """
+    return list(
+        Evaluation.objects.filter(favorited=True)
+        .values("source_id")
+        .annotate(favorites=Count("pk"))
+        .order_by("-favorites", "source_id")
+        .values_list("source_id", "favorites")[:limit]
+    )
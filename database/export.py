@@ -0,0 +1,207 @@
+"""
+Streaming exports of the citation matrix for analysis outside Django.
+
+All exports read raw values with chunked values_list iterators, without
+instantiating model objects:
+
+- NPZ: a compressed NumPy archive that scipy.sparse.load_npz() reads as the
+  CSR citation matrix, with the extra 'source_ids' array mapping matrix
+  indexes to Source IDs.
+- Matrix Market: a coordinate file (1-based indexes), written chunk by
+  chunk.
+- Columnar: a directory of .npy files, one per column, filled chunk by chunk
+  through memory maps. 'referrer.npy' and 'reference.npy' hold the Source
+  IDs of the edges; 'source_id.npy', 'year_of_publication.npy', 'type.npy'
+  and 'journal_id.npy' (-1 for books) hold the source attributes.
+
+Each export is accompanied by a CSV index of the sources (matrix index,
+ID, title, year, type and journal).
+"""
+import csv
+import os
+from typing import Iterator, List, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import QuerySet, Value
+from django.db.models.functions import Coalesce
+
+from database.bulk import chunked
+from database.matrix import (
+    FETCH_CHUNK_SIZE,
+    CitationMatrix,
+    read_edges,
+    read_source_ids,
+)
+from database.models import Reference, Source
+
+NPZ: str = "npz"
+MATRIX_MARKET: str = "mtx"
+COLUMNAR: str = "columnar"
+
+# Name of the source index written next to (or into) an export.
+SOURCE_INDEX_SUFFIX: str = ".sources.csv"
+
+
+def _chunks(
+    queryset: QuerySet, chunk_size: int = FETCH_CHUNK_SIZE
+) -> Iterator[List[Tuple]]:
+    """ Streams the rows of a values_list queryset in lists. """
+    return chunked(queryset.iterator(chunk_size=chunk_size), chunk_size)
+
+
+def _edge_pairs() -> QuerySet:
+    return Reference.objects.order_by().values_list(
+        "referrer_id", "reference_id"
+    )
+
+
+def export_source_index(path: str) -> int:
+    """
+    Writes the CSV index of all sources, in matrix index order. Returns the
+    number of sources.
+    """
+    rows = Source.objects.order_by("pk").values_list(
+        "pk", "title", "year_of_publication", "type", "source_journal__name"
+    )
+    count: int = 0
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            ["index", "source_id", "title", "year", "type", "journal"]
+        )
+        for chunk in _chunks(rows):
+            writer.writerows(
+                (index, *row) for index, row in enumerate(chunk, count)
+            )
+            count += len(chunk)
+    return count
+
+
+def npz_path(path: str) -> str:
+    """
+    The path of the NPZ archive written for 'path': NumPy adds the '.npz'
+    extension when it is missing.
+    """
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+def export_npz(path: str) -> int:
+    """
+    Writes the CSR citation matrix as a compressed NPZ archive (see
+    npz_path()). Returns the number of stored (referrer, reference) pairs.
+    """
+    path = npz_path(path)
+    with transaction.atomic():
+        matrix = CitationMatrix(read_source_ids(), read_edges())
+        export_source_index(path + SOURCE_INDEX_SUFFIX)
+    np.savez_compressed(
+        path,
+        format=np.array(b"csr"),
+        shape=np.array(matrix.shape),
+        data=matrix.csr.data,
+        indices=matrix.csr.indices,
+        indptr=matrix.csr.indptr,
+        source_ids=matrix.source_ids,
+    )
+    return matrix.nnz
+
+
+def export_matrix_market(path: str) -> int:
+    """
+    Writes the references as a Matrix Market coordinate file, one entry per
+    Reference row. Returns the number of written entries.
+    """
+    count: int = 0
+    with transaction.atomic():
+        source_ids: np.ndarray = read_source_ids()
+        size: int = len(source_ids)
+        with open(path, "w") as file:
+            file.write("%%MatrixMarket matrix coordinate integer general\n")
+            file.write("% Rows cite columns, see the source index for IDs.\n")
+            file.write(
+                "{} {} {}\n".format(size, size, Reference.objects.count())
+            )
+            for chunk in _chunks(_edge_pairs()):
+                edges: np.ndarray = np.array(chunk, dtype=np.int64)
+                entries: np.ndarray = np.column_stack(
+                    [
+                        np.searchsorted(source_ids, edges[:, 0]) + 1,
+                        np.searchsorted(source_ids, edges[:, 1]) + 1,
+                        np.ones(len(edges), dtype=np.int64),
+                    ]
+                )
+                np.savetxt(file, entries, fmt="%d")
+                count += len(edges)
+        export_source_index(path + SOURCE_INDEX_SUFFIX)
+    return count
+
+
+def _write_columns(
+    directory: str,
+    columns: List[Tuple[str, np.dtype]],
+    length: int,
+    chunks: Iterator[List[Tuple]],
+) -> None:
+    """
+    Writes the values of each row position to its own .npy column file,
+    chunk by chunk.
+    """
+    arrays: List[np.ndarray] = [
+        np.lib.format.open_memmap(
+            os.path.join(directory, name + ".npy"),
+            mode="w+",
+            dtype=dtype,
+            shape=(length,),
+        )
+        for name, dtype in columns
+    ]
+    start: int = 0
+    for chunk in chunks:
+        end: int = min(start + len(chunk), length)
+        for array, values in zip(arrays, zip(*chunk)):
+            array[start:end] = values[: end - start]
+        start = end
+    for array in arrays:
+        array.flush()
+
+
+def export_columnar(directory: str) -> int:
+    """
+    Writes the edges and source attributes as .npy columns into the given
+    directory. Returns the number of written edges.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with transaction.atomic():
+        edge_count: int = Reference.objects.count()
+        _write_columns(
+            directory,
+            [("referrer", np.int64), ("reference", np.int64)],
+            edge_count,
+            _chunks(_edge_pairs()),
+        )
+        sources = (
+            Source.objects.order_by("pk")
+            .annotate(journal=Coalesce("source_journal_id", Value(-1)))
+            .values_list("pk", "year_of_publication", "type", "journal")
+        )
+        _write_columns(
+            directory,
+            [
+                ("source_id", np.int64),
+                ("year_of_publication", np.int32),
+                ("type", np.dtype("S2")),
+                ("journal_id", np.int64),
+            ],
+            Source.objects.count(),
+            _chunks(sources),
+        )
+        export_source_index(os.path.join(directory, "sources.csv"))
+    return edge_count
+
+
+EXPORTERS = {
+    NPZ: export_npz,
+    MATRIX_MARKET: export_matrix_market,
+    COLUMNAR: export_columnar,
+}
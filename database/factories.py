@@ -6,6 +6,7 @@ import factory
 from django.utils import timezone
 from faker import Faker
 
+from database import deduplication
 from database import models as database_models
 
 fake = Faker()
@@ -26,6 +27,13 @@ class AuthorFactory(factory.DjangoModelFactory):
             return fake.first_name()
         return None
 
+    @factory.lazy_attribute
+    def blocking_key(self) -> str:
+        """ Set on built authors too, which bulk inserts don't save() """
+        return deduplication.blocking_key(
+            self.first_name, self.middle_name, self.last_name
+        )
+
 
 class PublisherFactory(factory.DjangoModelFactory):
     class Meta:
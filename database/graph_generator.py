@@ -0,0 +1,68 @@
+"""
+Synthetic citation graph generation for dummy and benchmark data sets.
+"""
+from typing import Sequence
+
+import numpy as np
+
+
+def _append(pool: np.ndarray, size: int, values: np.ndarray) -> int:
+    """ Writes 'values' after the first 'size' pool items, returns new size """
+    new_size: int = size + len(values)
+    pool[size:new_size] = values
+    return new_size
+
+
+def generate_citation_edges(
+    source_ids: Sequence[int],
+    years: Sequence[int],
+    n_references: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Generates roughly 'n_references' distinct (referrer_id, reference_id)
+    pairs between the given sources, and returns them as an (n, 2) array.
+
+    Sources only cite sources published in an earlier year, and pick them
+    through preferential attachment: the chance of being cited is
+    proportional to the number of citations received so far (plus one), which
+    gives the power-law in-degree distribution of real citation networks.
+    The result only depends on the inputs and the state of 'rng'.
+    """
+    ids: np.ndarray = np.asarray(source_ids, dtype=np.int64)
+    if len(ids) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    order: np.ndarray = np.argsort(np.asarray(years), kind="stable")
+    ids = ids[order]
+    sorted_years: np.ndarray = np.asarray(years)[order]
+    out_degree: np.ndarray = rng.poisson(n_references / len(ids), len(ids))
+
+    # Every source is in the pool once, plus once for every citation it
+    # received, so sampling uniformly from the pool is preferential.
+    pool: np.ndarray = np.empty(len(ids) + out_degree.sum(), dtype=np.int64)
+    pool_size: int = 0
+    referrers = []
+    references = []
+    boundaries: np.ndarray = np.flatnonzero(np.diff(sorted_years)) + 1
+    for start, end in zip(
+        np.concatenate([[0], boundaries]),
+        np.concatenate([boundaries, [len(ids)]]),
+    ):
+        if pool_size:
+            citing: np.ndarray = np.repeat(
+                ids[start:end], out_degree[start:end]
+            )
+            cited: np.ndarray = pool[rng.integers(0, pool_size, len(citing))]
+            referrers.append(citing)
+            references.append(cited)
+            pool_size = _append(pool, pool_size, cited)
+        pool_size = _append(pool, pool_size, ids[start:end])
+
+    if not referrers:
+        return np.empty((0, 2), dtype=np.int64)
+    # Drop sources citing the same source more than once.
+    base: int = int(ids.max()) + 1
+    keys: np.ndarray = np.unique(
+        np.concatenate(referrers) * base + np.concatenate(references)
+    )
+    return np.stack([keys // base, keys % base], axis=1)
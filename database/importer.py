@@ -0,0 +1,300 @@
+"""
+Bulk import of bibliography records (see database.bibliography).
+
+Records are imported in batches, each in its own transaction. Publishers,
+journals and authors are resolved against in-memory lookup tables that are
+loaded once, and only the new ones are inserted (in bulk). References to
+citation keys that haven't been imported yet are stored as
+PendingReference rows and resolved once the cited key exists, so the order
+of the records and files doesn't matter.
+
+Imported sources keep their citation key, which makes an interrupted import
+resumable: running it again skips the records that were already imported.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from database import versions
+from database.bibliography import Name, Record
+from database.bulk import MAX_IDS_PER_QUERY, bulk_insert, chunked
+from database.citation_counts import recompute_citation_counts
+from database.deduplication import blocking_key
+from database.models import (
+    Author,
+    Journal,
+    PendingReference,
+    Publisher,
+    Reference,
+    Source,
+)
+
+DEFAULT_IMPORT_BATCH_SIZE: int = 5000
+
+# Publisher of imported journals and books that don't name one.
+UNKNOWN_PUBLISHER: str = "Unknown publisher"
+
+NameKey = Tuple[str, str, str]
+
+# Length of the stored citation keys (Source.citation_key and
+# PendingReference.reference_key).
+CITATION_KEY_LENGTH: int = 200
+
+# Skips self-citations and references that already exist, which break the
+# constraints of Reference.
+_RESOLVE_SQL: str = """
+INSERT INTO {reference_table} (is_dummy_data, referrer_id, reference_id)
+SELECT DISTINCT %s, pending.referrer_id, source.id
+FROM {pending_table} pending
+JOIN {source_table} source ON source.citation_key = pending.reference_key
+WHERE pending.referrer_id <> source.id
+AND NOT EXISTS (
+    SELECT 1 FROM {reference_table} reference
+    WHERE reference.referrer_id = pending.referrer_id
+    AND reference.reference_id = source.id
+)
+"""
+
+
+def _key(value: Optional[str]) -> str:
+    """ Lookup key of a name: case and whitespace insensitive. """
+    return " ".join((value or "").split()).casefold()
+
+
+def _name_key(name: Name) -> NameKey:
+    return _key(name[0]), _key(name[1]), _key(name[2])
+
+
+def _truncate(value: Optional[str], length: int = 200) -> Optional[str]:
+    return value[:length] if value else value
+
+
+def _citation_key(key: str) -> str:
+    """ A citation key as it is stored. """
+    return key[:CITATION_KEY_LENGTH]
+
+
+class BibliographyImporter:
+    """
+    Imports records into the database. One importer can import several
+    files, sharing its lookup tables.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_IMPORT_BATCH_SIZE) -> None:
+        self.batch_size: int = batch_size
+        self.stats: Counter = Counter()
+        self.publishers: Dict[str, int] = {
+            _key(name): pk
+            for pk, name in Publisher.objects.values_list(
+                "pk", "name"
+            ).iterator()
+        }
+        self.journals: Dict[str, int] = {
+            _key(name): pk
+            for pk, name in Journal.objects.values_list(
+                "pk", "name"
+            ).iterator()
+        }
+        self.authors: Dict[NameKey, int] = {
+            _name_key((first, middle, last)): pk
+            for pk, first, middle, last in Author.objects.values_list(
+                "pk", "first_name", "middle_name", "last_name"
+            ).iterator()
+        }
+
+    def import_records(self, records: Iterable[Record]) -> Counter:
+        """
+        Imports the records batch by batch, then resolves the references
+        between them. Returns the statistics of the importer.
+        """
+        for batch in chunked(records, self.batch_size):
+            with transaction.atomic():
+                self.import_batch(batch)
+        self.resolve_pending_references()
+        return self.stats
+
+    def new_records(self, records: List[Record]) -> List[Record]:
+        """
+        The records that are valid and not imported yet (by citation key).
+        """
+        keys: List[str] = [_citation_key(record.key) for record in records]
+        existing: Set[str] = set()
+        for chunk in chunked(keys, MAX_IDS_PER_QUERY):
+            existing.update(
+                Source.objects.filter(citation_key__in=chunk).values_list(
+                    "citation_key", flat=True
+                )
+            )
+        new: List[Record] = []
+        for record, key in zip(records, keys):
+            if key in existing:
+                self.stats["existing"] += 1
+            elif not record.title or record.year is None:
+                self.stats["skipped"] += 1
+            else:
+                existing.add(key)
+                new.append(record)
+        return new
+
+    def import_batch(self, records: List[Record]) -> None:
+        records = self.new_records(records)
+        self.add_publishers(records)
+        self.add_journals(records)
+        self.add_authors(records)
+        source_ids: List[int] = bulk_insert(
+            Source, [self.build_source(record) for record in records]
+        )
+        through = Source.authors.through
+        bulk_insert(
+            through,
+            [
+                through(source_id=source_id, author_id=author_id)
+                for source_id, record in zip(source_ids, records)
+                for author_id in dict.fromkeys(
+                    self.authors[_name_key(name)] for name in record.authors
+                )
+            ],
+        )
+        # Staged with a plain executemany: these rows need no model
+        # instances or signals, and outnumber the sources.
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO {} (referrer_id, reference_key) "
+                "VALUES (%s, %s)".format(PendingReference._meta.db_table),
+                [
+                    (source_id, key)
+                    for source_id, record in zip(source_ids, records)
+                    for key in dict.fromkeys(map(_citation_key, record.cites))
+                    if key != _citation_key(record.key)
+                ],
+            )
+        self.stats["sources"] += len(records)
+
+    def _publisher_name(self, record: Record) -> Optional[str]:
+        """
+        The name of the publisher to look up for a record, if it needs one:
+        books, and articles in journals that don't exist yet.
+        """
+        if record.journal and _key(record.journal) in self.journals:
+            return None
+        return record.publisher or UNKNOWN_PUBLISHER
+
+    def add_publishers(self, records: List[Record]) -> None:
+        new: Dict[str, Publisher] = {}
+        for record in records:
+            name: Optional[str] = self._publisher_name(record)
+            if name is not None and _key(name) not in self.publishers:
+                new.setdefault(
+                    _key(name),
+                    Publisher(
+                        name=_truncate(name), city=_truncate(record.city)
+                    ),
+                )
+        self.publishers.update(
+            zip(new, bulk_insert(Publisher, list(new.values())))
+        )
+        self.stats["publishers"] += len(new)
+
+    def add_journals(self, records: List[Record]) -> None:
+        new: Dict[str, Journal] = {}
+        for record in records:
+            if record.journal and _key(record.journal) not in self.journals:
+                new.setdefault(
+                    _key(record.journal),
+                    Journal(
+                        name=_truncate(record.journal),
+                        journal_publisher_id=self.publishers[
+                            _key(record.publisher or UNKNOWN_PUBLISHER)
+                        ],
+                    ),
+                )
+        self.journals.update(
+            zip(new, bulk_insert(Journal, list(new.values())))
+        )
+        self.stats["journals"] += len(new)
+
+    def add_authors(self, records: List[Record]) -> None:
+        new: Dict[NameKey, Author] = {}
+        for record in records:
+            for first, middle, last in record.authors:
+                key: NameKey = _name_key((first, middle, last))
+                if key not in self.authors and key not in new:
+                    first_name = _truncate(first)
+                    middle_name = _truncate(middle)
+                    last_name = _truncate(last)
+                    new[key] = Author(
+                        first_name=first_name,
+                        middle_name=middle_name,
+                        last_name=last_name,
+                        blocking_key=blocking_key(
+                            first_name, middle_name, last_name
+                        ),
+                    )
+        self.authors.update(zip(new, bulk_insert(Author, list(new.values()))))
+        self.stats["authors"] += len(new)
+
+    def build_source(self, record: Record) -> Source:
+        """
+        An article when the record names a journal, a book otherwise. Page
+        ranges that end before they start are dropped.
+        """
+        start, end = record.pages
+        if start is not None and end is not None and start > end:
+            start, end = None, None
+        source = Source(
+            citation_key=_citation_key(record.key),
+            title=record.title[:400],
+            year_of_publication=record.year,
+            journal_page_range_start=start,
+            journal_page_range_end=end,
+            abstract=record.abstract,
+        )
+        if record.journal:
+            source.type = "AR"
+            source.source_journal_id = self.journals[_key(record.journal)]
+        else:
+            source.type = "BK"
+            source.source_publisher_id = self.publishers[
+                _key(record.publisher or UNKNOWN_PUBLISHER)
+            ]
+        return source
+
+    def resolve_pending_references(self) -> None:
+        """
+        Turns the pending references to imported citation keys into
+        References with a single INSERT ... SELECT, and updates the citation
+        counters of the sources involved.
+        """
+        with transaction.atomic():
+            last_pk: int = (
+                Reference.objects.order_by("-pk")
+                .values_list("pk", flat=True)
+                .first()
+                or 0
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    _RESOLVE_SQL.format(
+                        reference_table=Reference._meta.db_table,
+                        pending_table=PendingReference._meta.db_table,
+                        source_table=Source._meta.db_table,
+                    ),
+                    [False],
+                )
+            versions.bump(Reference)
+            new_references = Reference.objects.filter(pk__gt=last_pk)
+            self.stats["references"] += new_references.count()
+            recompute_citation_counts(
+                Source.objects.filter(
+                    Q(pk__in=new_references.values("referrer_id"))
+                    | Q(pk__in=new_references.values("reference_id"))
+                )
+            )
+            PendingReference.objects.filter(
+                reference_key__in=Source.objects.filter(
+                    citation_key__isnull=False
+                ).values("citation_key")
+            ).delete()
+        self.stats["pending"] = PendingReference.objects.count()
@@ -0,0 +1,263 @@
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from io import StringIO
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import django
+from django.conf import settings
+from django.contrib import admin
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import RequestFactory
+from django.urls import reverse
+
+from database.bulk import bulk_insert
+from database.citation_counts import recompute_citation_counts
+from database.matrix import CitationMatrix
+from database.models import Journal, Reference, Source, User
+from database.profiling import QueryProfile
+
+# Number of sources generate_dummy_data creates per unit of --scale.
+SOURCES_PER_SCALE: int = 110
+
+# Fraction of the journals deleted by the cascade delete benchmark.
+DELETED_JOURNAL_FRACTION: float = 0.1
+
+
+def git_commit() -> Optional[str]:
+    """ The commit of the working tree, if it is a git checkout. """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func: Callable[[], Optional[int]]) -> Dict[str, Any]:
+    """
+    Runs 'func' and returns its duration and number of queries. 'func' may
+    return the number of items it processed, to report the throughput.
+    """
+    profile = QueryProfile(func.__name__)
+    with connection.execute_wrapper(profile):
+        start: float = time.perf_counter()
+        items: Optional[int] = func()
+        seconds: float = time.perf_counter() - start
+    timing: Dict[str, Any] = {"seconds": seconds, "queries": profile.count}
+    if items is not None:
+        timing["items"] = items
+        timing["items_per_second"] = items / seconds if seconds else None
+    return timing
+
+
+def sample_new_pairs(
+    source_ids: List[int], existing: Set[Tuple[int, int]], amount: int
+) -> List[Tuple[int, int]]:
+    """
+    Samples up to 'amount' distinct (referrer, reference) pairs of different
+    sources that are not in 'existing', so inserting them as references
+    satisfies the Reference constraints.
+    """
+    available: int = (len(source_ids) * (len(source_ids) - 1) - len(existing))
+    # A dict keeps the pairs in the (random) order they were drawn in.
+    pairs: Dict[Tuple[int, int], None] = {}
+    while len(pairs) < min(amount, available):
+        pair: Tuple[int, int] = (
+            random.choice(source_ids),
+            random.choice(source_ids),
+        )
+        if pair[0] != pair[1] and pair not in existing:
+            pairs[pair] = None
+    return list(pairs)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the core data paths at several dataset sizes and writes the "
+        "results as JSON, to compare runs across commits."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000],
+            help="Approximate numbers of sources to benchmark with.",
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=1000,
+            help="Number of saved sources and inserted references per size.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed for the generated data.",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="File to write the JSON results to, instead of stdout.",
+        )
+        parser.add_argument(
+            "--in-place",
+            action="store_true",
+            help=(
+                "Benchmark on the configured database, inside a transaction "
+                "that is rolled back, instead of on a new test database."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        old_name: Optional[str] = None
+        if not options["in_place"]:
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True
+            )
+        try:
+            results: List[Dict[str, Any]] = [
+                self.benchmark(size, options["samples"], options["seed"])
+                for size in options["sizes"]
+            ]
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        report: Dict[str, Any] = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "results": results,
+        }
+        output: str = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def benchmark(self, size: int, samples: int, seed: int) -> Dict[str, Any]:
+        """
+        Generates about 'size' sources and times the data paths on them. All
+        changes are rolled back afterwards.
+        """
+        random.seed(seed)
+        scale: int = max(1, math.ceil(size / SOURCES_PER_SCALE))
+        timings: Dict[str, Dict[str, Any]] = {}
+        with transaction.atomic():
+
+            def generate() -> int:
+                call_command(
+                    "generate_dummy_data",
+                    scale=scale,
+                    seed=seed,
+                    stdout=StringIO(),
+                )
+                return Source.objects.count()
+
+            timings["generate"] = measure(generate)
+            source_ids: List[int] = list(
+                Source.objects.values_list("pk", flat=True)
+            )
+            counts: Dict[str, int] = {
+                "sources": len(source_ids),
+                "references": Reference.objects.count(),
+            }
+
+            sources: List[Source] = list(
+                Source.objects.filter(
+                    pk__in=random.sample(
+                        source_ids, min(samples, len(source_ids))
+                    )
+                )
+            )
+
+            def save_sources() -> int:
+                for source in sources:
+                    source.save()
+                return len(sources)
+
+            timings["source_save"] = measure(save_sources)
+
+            pairs: List[Tuple[int, int]] = sample_new_pairs(
+                source_ids,
+                set(Reference.objects.values_list("referrer", "reference")),
+                samples,
+            )
+
+            def insert_references() -> int:
+                references: List[Reference] = [
+                    Reference(referrer_id=referrer, reference_id=reference)
+                    for referrer, reference in pairs
+                ]
+                return len(bulk_insert(Reference, references))
+
+            timings["reference_bulk_insert"] = measure(insert_references)
+
+            def aggregate_degrees() -> int:
+                return len(
+                    Reference.objects.order_by()
+                    .values("reference_id")
+                    .annotate(citations=Count("pk"))
+                )
+
+            timings["degree_aggregation"] = measure(aggregate_degrees)
+            timings["degree_counters"] = measure(recompute_citation_counts)
+
+            def matrix_degrees() -> int:
+                return len(CitationMatrix.from_database().in_degree())
+
+            timings["degree_matrix"] = measure(matrix_degrees)
+            timings.update(self.benchmark_changelists())
+
+            journal_ids: List[int] = list(
+                Journal.objects.values_list("pk", flat=True)
+            )
+            deleted_journal_ids: List[int] = random.sample(
+                journal_ids,
+                max(1, int(len(journal_ids) * DELETED_JOURNAL_FRACTION)),
+            )
+
+            def cascade_delete() -> int:
+                return Journal.objects.filter(
+                    pk__in=deleted_journal_ids
+                ).delete()[0]
+
+            timings["cascade_delete"] = measure(cascade_delete)
+            transaction.set_rollback(True)
+        return {"size": size, "counts": counts, "timings": timings}
+
+    def benchmark_changelists(self) -> Dict[str, Dict[str, Any]]:
+        """ Times the rendering of the changelist of each admin model. """
+        superuser: User = User.objects.filter(is_superuser=True).first()
+        request_factory = RequestFactory()
+        timings: Dict[str, Dict[str, Any]] = {}
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label != "database":
+                continue
+            url: str = reverse(
+                "admin:{}_{}_changelist".format(
+                    model._meta.app_label, model._meta.model_name
+                )
+            )
+
+            def render_changelist() -> None:
+                request = request_factory.get(url)
+                request.user = superuser
+                model_admin.changelist_view(request).render()
+
+            timings["admin_changelist:" + model._meta.model_name] = measure(
+                render_changelist
+            )
+        return timings
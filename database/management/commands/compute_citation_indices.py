@@ -0,0 +1,21 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from database.citation_indices import compute_citation_indices
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes the h-index and g-index of all authors, journals and "
+        "publishers."
+    )
+
+    def handle(self, *args, **options):
+        stats: Counter = compute_citation_indices()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Computed the indices of {} authors, {} journals and {} "
+                "publishers"
+            ).format(stats["authors"], stats["journals"], stats["publishers"])
+        )
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from database.centrality import (
+    DEFAULT_DAMPING,
+    DEFAULT_MAX_ITERATIONS,
+    DEFAULT_TOLERANCE,
+    Scores,
+    compute_influence,
+)
+
+
+class Command(BaseCommand):
+    help = "Computes the PageRank and HITS scores of all sources."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--damping",
+            type=float,
+            default=DEFAULT_DAMPING,
+            help="PageRank damping factor.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=DEFAULT_TOLERANCE,
+            help="Stop iterating when the scores change less than this.",
+        )
+        parser.add_argument(
+            "--max-iterations",
+            type=int,
+            default=DEFAULT_MAX_ITERATIONS,
+            help="Maximum number of power iterations.",
+        )
+        parser.add_argument(
+            "--cold-start",
+            action="store_true",
+            help="Start from uniform scores instead of the stored scores.",
+        )
+
+    def handle(self, *args, **options):
+        scores: Scores = compute_influence(
+            damping=options["damping"],
+            tolerance=options["tolerance"],
+            max_iterations=options["max_iterations"],
+            warm_start=not options["cold_start"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Computed influence of {} sources "
+                "(PageRank: {} iterations, HITS: {} iterations)"
+            ).format(
+                len(scores.pagerank),
+                scores.pagerank_iterations,
+                scores.hits_iterations,
+            )
+        )
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from database import parallel
+from database.similarity import (
+    BIBLIOGRAPHIC_COUPLING,
+    CO_CITATION,
+    DEFAULT_TOP_K,
+    compute_similarities,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes the co-citation and bibliographic coupling strengths "
+        "between sources, and stores the strongest neighbours of each source."
+    )
+
+    KINDS = {
+        "cocitation": CO_CITATION,
+        "coupling": BIBLIOGRAPHIC_COUPLING,
+    }
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--kind",
+            choices=sorted(self.KINDS) + ["all"],
+            default="all",
+            help="The similarity to compute.",
+        )
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=DEFAULT_TOP_K,
+            help="Number of neighbours to keep per source.",
+        )
+        parser.add_argument(
+            "--max-shared-degree",
+            type=int,
+            default=None,
+            help=(
+                "Ignore citing sources (co-citation) or cited sources "
+                "(coupling) with more than this many references, which "
+                "carry little information and dominate the computation time."
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Number of processes computing blocks of sources in "
+                "parallel."
+            ),
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help=(
+                "Recompute all sources, instead of only those touched by "
+                "new references."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] > 1 and not parallel.is_supported():
+            raise CommandError("--workers needs Python 3.8 or newer")
+        names = (
+            sorted(self.KINDS)
+            if options["kind"] == "all"
+            else [options["kind"]]
+        )
+        for name in names:
+            stored: int = compute_similarities(
+                self.KINDS[name],
+                k=options["top_k"],
+                full=options["full"],
+                max_shared_degree=options["max_shared_degree"],
+                workers=options["workers"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS("Stored {} {} neighbours").format(
+                    stored, name
+                )
+            )
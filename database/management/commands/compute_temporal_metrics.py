@@ -0,0 +1,36 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from database.temporal import compute_temporal_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes the year x year citation flows, the citations per source "
+        "and year, and the impact factors and half-lives of journals."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help=(
+                "Recompute all years, instead of only those touched by new "
+                "references and sources."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        stats: Counter = compute_temporal_metrics(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Recomputed {} years: stored {} year flows, {} source years "
+                "and {} journal years"
+            ).format(
+                stats["years"],
+                stats["flows"],
+                stats["sources"],
+                stats["journals"],
+            )
+        )
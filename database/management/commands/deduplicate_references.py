@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from database.reference_cleanup import (
+    InvalidReferences,
+    find_invalid_references,
+    remove_invalid_references,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Removes duplicated references (keeping the oldest of each pair) "
+        "and self-citations, and updates the citation counters."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the invalid references, without removing them.",
+        )
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            invalid: InvalidReferences = find_invalid_references()
+            verb: str = "Found"
+        else:
+            invalid = remove_invalid_references()
+            verb = "Removed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{} {} duplicated references and {} self-citations "
+                "({} sources involved)."
+            ).format(
+                verb,
+                invalid.duplicates,
+                invalid.self_citations,
+                len(invalid.source_ids),
+            )
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from database.export import EXPORTERS, NPZ, npz_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports the citation matrix and an index of the sources to disk, "
+        "as NPZ, Matrix Market or .npy columns."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "path", help="Output file (or directory for 'columnar')."
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(EXPORTERS),
+            default=NPZ,
+            help="Export format.",
+        )
+
+    def handle(self, *args, **options):
+        exported: int = EXPORTERS[options["format"]](options["path"])
+        path: str = options["path"]
+        if options["format"] == NPZ:
+            path = npz_path(path)
+        self.stdout.write(
+            self.style.SUCCESS("Exported {} references to {}").format(
+                exported, path
+            )
+        )
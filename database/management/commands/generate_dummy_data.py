@@ -1,8 +1,15 @@
-from typing import Optional
+import bisect
+import itertools
+import random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+import factory
+import factory.random
+import numpy as np
 from django.core.management.base import BaseCommand
-from django.db.models import QuerySet
+from django.db.models import Model, QuerySet
 
+from database.bulk import DEFAULT_BATCH_SIZE, bulk_insert, chunked
 from database.factories import (
     AuthorFactory,
     EvaluationFactory,
@@ -12,6 +19,7 @@ from database.factories import (
     SourceFactory,
     UserFactory,
 )
+from database.graph_generator import generate_citation_edges
 from database.models import (
     Author,
     Evaluation,
@@ -21,11 +29,35 @@ from database.models import (
     Source,
     User,
 )
+from database.profiling import profile_phase
 
 
 class Command(BaseCommand):
     help = "Generates dummy data for the application database."
 
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=None,
+            help=(
+                "Multiply the default amount of generated data by this "
+                "factor, and insert it in bulk instead of row by row."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows per bulk insert (and transaction).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=None,
+            help="Seed for the random generators, for reproducible data.",
+        )
+
     def generate_users(self) -> None:
         """ Generates 5 users """
         for x in range(5):
@@ -61,12 +93,10 @@ class Command(BaseCommand):
 
     def generate_books(self) -> None:
         """ Have each author write 2 books """
+        publishers: List[Publisher] = list(Publisher.objects.all())
         for author in Author.objects.all():
             for x in range(2):
-                selected_publisher: Optional[
-                    Publisher
-                ] = Publisher.objects.all().order_by("?").first()
-                assert selected_publisher
+                selected_publisher: Publisher = random.choice(publishers)
                 book: Source = SourceFactory(
                     book=True,
                     source_publisher=selected_publisher,
@@ -78,12 +108,10 @@ class Command(BaseCommand):
 
     def generate_articles_single_author(self) -> None:
         """ Have each author write 3 articles """
+        journals: List[Journal] = list(Journal.objects.all())
         for author in Author.objects.all():
             for x in range(3):
-                selected_journal: Optional[
-                    Journal
-                ] = Journal.objects.all().order_by("?").first()
-                assert selected_journal
+                selected_journal: Journal = random.choice(journals)
                 article: Source = SourceFactory(
                     article=True,
                     source_journal=selected_journal,
@@ -99,13 +127,11 @@ class Command(BaseCommand):
         """
         Have each author team up with another and write two articles together
         """
+        journals: List[Journal] = list(Journal.objects.all())
         queryset: QuerySet[Author] = Author.objects.all()
         author_iterator = iter(queryset)
         for author_1 in author_iterator:
-            selected_journal: Optional[
-                Journal
-            ] = Journal.objects.all().order_by("?").first()
-            assert selected_journal
+            selected_journal: Journal = random.choice(journals)
             article: Source = SourceFactory(
                 article=True,
                 source_journal=selected_journal,
@@ -140,16 +166,30 @@ class Command(BaseCommand):
         )
 
     def generate_references(self) -> None:
-        """ Generates 400 references """
-        for x in range(400):
-            randomized_sources: QuerySet[
-                Source
-            ] = Source.objects.all().order_by("?")
-            referrer: Optional[Source] = randomized_sources.first()
-            reference: Optional[Source] = randomized_sources.last()
-            assert referrer, reference
+        """
+        Generates 400 distinct references, each pointing from a source to
+        an older source (fewer if there aren't enough pairs of sources from
+        different years).
+        """
+        sources: List[Source] = sorted(
+            Source.objects.all(), key=lambda source: source.year_of_publication
+        )
+        years: List[int] = [source.year_of_publication for source in sources]
+        # Number of sources published before each source, which it may cite.
+        older: List[int] = [bisect.bisect_left(years, year) for year in years]
+        cumulative: List[int] = list(itertools.accumulate(older))
+        # Picking the referrer weighted by its number of older sources, then
+        # one of them, samples the pairs uniformly.
+        count: int = min(400, sum(older))
+        pairs: Dict[Tuple[int, int], None] = {}
+        while len(pairs) < count:
+            referrer: int = random.choices(
+                range(len(sources)), cum_weights=cumulative
+            )[0]
+            pairs[referrer, random.randrange(older[referrer])] = None
+        for referrer, reference in pairs:
             reference_object: Reference = ReferenceFactory(
-                referrer=referrer, reference=reference
+                referrer=sources[referrer], reference=sources[reference]
             )
             self.stdout.write(
                 self.style.SUCCESS("Created reference: {}").format(
@@ -159,12 +199,10 @@ class Command(BaseCommand):
 
     def generate_evaluations(self) -> None:
         """ Generates 8 evaluations for random sources for each user """
+        sources: List[Source] = list(Source.objects.all())
         for user in User.objects.all():
             for x in range(8):
-                selected_source: Optional[
-                    Source
-                ] = Source.objects.all().order_by("?").first()
-                assert selected_source
+                selected_source: Source = random.choice(sources)
                 evaluation: Evaluation = EvaluationFactory(
                     user=user, source=selected_source
                 )
@@ -172,16 +210,191 @@ class Command(BaseCommand):
                     self.style.SUCCESS("Created {}").format(evaluation)
                 )
 
+    @staticmethod
+    def build_linked(
+        model_factory: factory.Factory, links: Dict[str, int], **kwargs: Any
+    ) -> Model:
+        """
+        Builds an unsaved instance that points to existing rows by ID, without
+        building the related objects of the factory's SubFactories.
+        """
+        instance: Model = model_factory.build(
+            **{name: None for name in links}, **kwargs
+        )
+        for name, pk in links.items():
+            setattr(instance, "{}_id".format(name), pk)
+        return instance
+
+    def bulk_create_objects(
+        self,
+        label: str,
+        build: Callable[[], Iterator[Model]],
+        batch_size: int,
+    ) -> List[int]:
+        """
+        Inserts the instances yielded by 'build' in batches, and returns the
+        primary keys of the created rows.
+        """
+        pks: List[int] = []
+        with profile_phase("generate_dummy_data: " + label):
+            for batch in chunked(build(), batch_size):
+                pks.extend(bulk_insert(type(batch[0]), batch, batch_size))
+        self.stdout.write(
+            self.style.SUCCESS("Created {} {}").format(len(pks), label)
+        )
+        return pks
+
+    def bulk_generate_sources(
+        self,
+        author_ids: List[int],
+        publisher_ids: List[int],
+        journal_ids: List[int],
+        batch_size: int,
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Bulk version of the generate_books / generate_articles_* methods:
+        every author writes 2 books and 3 articles, and each pair of authors
+        writes an article together. Returns the IDs and publication years of
+        the created sources.
+        """
+        source_authors: List[List[int]] = []
+        source_years: List[int] = []
+
+        def build() -> Iterator[Source]:
+            for source in build_sources():
+                source_years.append(source.year_of_publication)
+                yield source
+
+        def build_sources() -> Iterator[Source]:
+            for author_id in author_ids:
+                for x in range(2):
+                    source_authors.append([author_id])
+                    yield self.build_linked(
+                        SourceFactory,
+                        {"source_publisher": random.choice(publisher_ids)},
+                        book=True,
+                    )
+                for x in range(3):
+                    source_authors.append([author_id])
+                    yield self.build_linked(
+                        SourceFactory,
+                        {"source_journal": random.choice(journal_ids)},
+                        article=True,
+                    )
+            for pair in zip(author_ids[::2], author_ids[1::2]):
+                source_authors.append(list(pair))
+                yield self.build_linked(
+                    SourceFactory,
+                    {"source_journal": random.choice(journal_ids)},
+                    article=True,
+                )
+
+        source_ids: List[int] = self.bulk_create_objects(
+            "sources", build, batch_size
+        )
+        through = Source.authors.through
+        self.bulk_create_objects(
+            "source authors",
+            lambda: (
+                through(source_id=source_id, author_id=author_id)
+                for source_id, authors in zip(source_ids, source_authors)
+                for author_id in authors
+            ),
+            batch_size,
+        )
+        return source_ids, source_years
+
+    def bulk_generate(
+        self, scale: int, batch_size: int, seed: Optional[int]
+    ) -> None:
+        """
+        Generates 'scale' times the default amount of dummy data, building
+        the instances in memory and inserting them with bulk_create.
+
+        References form a realistic citation graph: sources only cite older
+        sources, and popular sources attract more citations.
+        """
+        user_ids: List[int] = self.bulk_create_objects(
+            "users",
+            lambda: (UserFactory.build() for x in range(5 * scale)),
+            batch_size,
+        )
+        publisher_ids: List[int] = self.bulk_create_objects(
+            "publishers",
+            lambda: (PublisherFactory.build() for x in range(5 * scale)),
+            batch_size,
+        )
+        journal_ids: List[int] = self.bulk_create_objects(
+            "journals",
+            lambda: (
+                self.build_linked(
+                    JournalFactory, {"journal_publisher": publisher_id}
+                )
+                for publisher_id in publisher_ids
+                for x in range(3)
+            ),
+            batch_size,
+        )
+        author_ids: List[int] = self.bulk_create_objects(
+            "authors",
+            lambda: (AuthorFactory.build() for x in range(20 * scale)),
+            batch_size,
+        )
+        source_ids, source_years = self.bulk_generate_sources(
+            author_ids, publisher_ids, journal_ids, batch_size
+        )
+        edges: np.ndarray = generate_citation_edges(
+            source_ids, source_years, 400 * scale, np.random.default_rng(seed)
+        )
+        self.bulk_create_objects(
+            "references",
+            lambda: (
+                Reference(
+                    referrer_id=referrer_id,
+                    reference_id=reference_id,
+                    is_dummy_data=True,
+                )
+                for referrer_id, reference_id in edges.tolist()
+            ),
+            batch_size,
+        )
+        self.generate_super_user()
+        self.bulk_create_objects(
+            "evaluations",
+            lambda: (
+                self.build_linked(
+                    EvaluationFactory,
+                    {"user": user_id, "source": random.choice(source_ids)},
+                )
+                for user_id in user_ids
+                for x in range(8)
+            ),
+            batch_size,
+        )
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS("Generating dummy data!"))
-        self.generate_users()
-        self.generate_publishers()
-        self.generate_journals()
-        self.generate_authors()
-        self.generate_books()
-        self.generate_articles_single_author()
-        self.generate_articles_two_authors()
-        self.generate_references()
-        self.generate_super_user()
-        self.generate_evaluations()
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+            factory.random.reseed_random(options["seed"])
+        if options["scale"]:
+            self.bulk_generate(
+                options["scale"], options["batch_size"], options["seed"]
+            )
+            self.stdout.write(self.style.SUCCESS("Done"))
+            return
+        for phase in [
+            self.generate_users,
+            self.generate_publishers,
+            self.generate_journals,
+            self.generate_authors,
+            self.generate_books,
+            self.generate_articles_single_author,
+            self.generate_articles_two_authors,
+            self.generate_references,
+            self.generate_super_user,
+            self.generate_evaluations,
+        ]:
+            with profile_phase("generate_dummy_data: " + phase.__name__):
+                phase()
         self.stdout.write(self.style.SUCCESS("Done"))
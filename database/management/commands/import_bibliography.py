@@ -0,0 +1,60 @@
+import os
+from collections import Counter
+from typing import Optional
+
+from django.core.management.base import BaseCommand, CommandError
+
+from database.bibliography import FORMAT_EXTENSIONS, PARSERS, parse
+from database.importer import DEFAULT_IMPORT_BATCH_SIZE, BibliographyImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports BibTeX, RIS or CSV bibliographies. Interrupted imports can "
+        "be resumed by running the command again."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("paths", nargs="+", help="Files to import.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(PARSERS),
+            default=None,
+            help="Format of the files (by default based on the extension).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_IMPORT_BATCH_SIZE,
+            help="Number of records per bulk insert (and transaction).",
+        )
+
+    def handle(self, *args, **options):
+        importer = BibliographyImporter(options["batch_size"])
+        for path in options["paths"]:
+            format: Optional[str] = options["format"] or FORMAT_EXTENSIONS.get(
+                os.path.splitext(path)[1].lower()
+            )
+            if format is None:
+                raise CommandError(
+                    "Unknown format of {}, use --format".format(path)
+                )
+            with open(path, encoding="utf-8-sig", newline="") as file:
+                stats: Counter = importer.import_records(parse(file, format))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Imported {}: {} sources, {} authors, {} journals, "
+                    "{} publishers, {} references ({} pending). Skipped {} "
+                    "existing and {} invalid records."
+                ).format(
+                    path,
+                    stats["sources"],
+                    stats["authors"],
+                    stats["journals"],
+                    stats["publishers"],
+                    stats["references"],
+                    stats["pending"],
+                    stats["existing"],
+                    stats["skipped"],
+                )
+            )
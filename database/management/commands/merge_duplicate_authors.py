@@ -0,0 +1,53 @@
+from typing import List
+
+from django.core.management.base import BaseCommand
+
+from database.bulk import chunked
+from database.deduplication import find_duplicates, merge_clusters
+
+DEFAULT_MERGE_BATCH_SIZE: int = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Finds authors that were created several times with different "
+        "spellings and merges them into the most complete spelling."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the duplicates, without merging them.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_MERGE_BATCH_SIZE,
+            help="Number of clusters merged per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        # Collected first: merging deletes rows of the blocks being read.
+        clusters: List[List[int]] = list(find_duplicates())
+        if options["dry_run"]:
+            for cluster in clusters:
+                self.stdout.write(
+                    "Keep {}, merge {}".format(
+                        cluster[0], ", ".join(map(str, cluster[1:]))
+                    )
+                )
+            self.stdout.write(
+                self.style.SUCCESS("Found {} clusters of duplicates.").format(
+                    len(clusters)
+                )
+            )
+            return
+        merged: int = 0
+        for batch in chunked(clusters, options["batch_size"]):
+            merged += merge_clusters(batch)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Merged {} duplicated authors in {} clusters."
+            ).format(merged, len(clusters))
+        )
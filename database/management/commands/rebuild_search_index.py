@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from database.search import is_supported, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index of the sources."
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            self.stdout.write(
+                self.style.WARNING(
+                    "The database backend has no full-text search index."
+                )
+            )
+            return
+        indexed: int = rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS("Indexed {} sources").format(indexed)
+        )
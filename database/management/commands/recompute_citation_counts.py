@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from database.citation_counts import recompute_citation_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the times_cited and references_made counters of all "
+        "sources from the Reference table."
+    )
+
+    def handle(self, *args, **options):
+        updated: int = recompute_citation_counts()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Recomputed citation counts of {} sources"
+            ).format(updated)
+        )
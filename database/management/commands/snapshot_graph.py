@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from database.snapshot import write_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the citation graph and the year, type and journal of the "
+        "sources to a binary snapshot, to be memory-mapped by other "
+        "processes."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=settings.GRAPH_SNAPSHOT_PATH,
+            help="Output file (GRAPH_SNAPSHOT_PATH by default).",
+        )
+
+    def handle(self, *args, **options):
+        if not options["path"]:
+            raise CommandError("No path given and no GRAPH_SNAPSHOT_PATH set")
+        header = write_snapshot(options["path"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Wrote {} sources and {} citations to {}"
+            ).format(header["sources"], header["citations"], options["path"])
+        )
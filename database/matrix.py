@@ -0,0 +1,205 @@
+"""
+Sparse adjacency representation of the citation graph.
+
+The matrix is built from the raw ``(referrer_id, reference_id)`` pairs of the
+Reference table, without instantiating any model objects. Rows are the
+citing sources ('FROM'), columns are the cited sources ('TO'). Both axes use
+the same index space: the position of the source ID in the sorted array of
+all Source IDs.
+"""
+import time
+from itertools import chain
+from typing import Iterable, Optional, Tuple, Type
+
+import numpy as np
+from django.db import transaction
+from django.db.models import QuerySet
+from scipy import sparse
+
+from database.models import Reference, Source
+
+# Number of rows fetched from the database cursor per round trip.
+FETCH_CHUNK_SIZE: int = 50000
+
+# Seconds a cached matrix may be reused by get_cached_matrix().
+DEFAULT_MAX_AGE: float = 300.0
+
+
+class UnknownSourceError(KeyError):
+    pass
+
+
+def positions_of(
+    sorted_ids: np.ndarray,
+    ids: Iterable[int],
+    error: Type[KeyError],
+    name: str,
+) -> np.ndarray:
+    """
+    The positions of IDs in a sorted array of IDs. Raises 'error' for IDs
+    that are not part of it.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    positions: np.ndarray = np.searchsorted(sorted_ids, ids)
+    known: np.ndarray = positions < len(sorted_ids)
+    known[known] = sorted_ids[positions[known]] == ids[known]
+    if not known.all():
+        raise error(
+            "Unknown {} id(s): {}".format(name, ids[~known][:10].tolist())
+        )
+    return positions
+
+
+def read_edges(
+    queryset: Optional["QuerySet[Reference]"] = None,
+    chunk_size: int = FETCH_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Reads the (referrer_id, reference_id) pairs of the given Reference
+    queryset (all references by default) into an (n, 2) int64 array, using a
+    single streamed values_list scan.
+    """
+    if queryset is None:
+        queryset = Reference.objects.all()
+    pairs = queryset.order_by().values_list("referrer_id", "reference_id")
+    flat: np.ndarray = np.fromiter(
+        chain.from_iterable(pairs.iterator(chunk_size=chunk_size)),
+        dtype=np.int64,
+    )
+    return flat.reshape(-1, 2)
+
+
+def read_source_ids(
+    queryset: Optional["QuerySet[Source]"] = None,
+    chunk_size: int = FETCH_CHUNK_SIZE,
+) -> np.ndarray:
+    """ Reads the sorted primary keys of the given Source queryset. """
+    if queryset is None:
+        queryset = Source.objects.all()
+    ids = queryset.order_by("pk").values_list("pk", flat=True)
+    return np.fromiter(ids.iterator(chunk_size=chunk_size), dtype=np.int64)
+
+
+class CitationMatrix:
+    """
+    Compressed sparse citation matrix over all sources.
+
+    ``csr`` gives fast row slices (what does X cite), ``csc`` gives fast
+    column slices (who cites X). Cell values count the number of Reference
+    rows between two sources, so duplicated references are kept visible.
+    """
+
+    def __init__(self, source_ids: np.ndarray, edges: np.ndarray) -> None:
+        self.source_ids: np.ndarray = np.asarray(source_ids, dtype=np.int64)
+        size: int = len(self.source_ids)
+        rows: np.ndarray = self.index_of(edges[:, 0])
+        cols: np.ndarray = self.index_of(edges[:, 1])
+        data: np.ndarray = np.ones(len(rows), dtype=np.int32)
+        self.csr: sparse.csr_matrix = sparse.csr_matrix(
+            (data, (rows, cols)), shape=(size, size)
+        )
+        self.csr.sum_duplicates()
+        self.csc: sparse.csc_matrix = self.csr.tocsc()
+
+    @classmethod
+    def from_database(
+        cls,
+        sources: Optional["QuerySet[Source]"] = None,
+        references: Optional["QuerySet[Reference]"] = None,
+    ) -> "CitationMatrix":
+        """
+        Builds the matrix from the database. Only references between the
+        read sources are kept: those of 'sources' when given, and those
+        that weren't created between the reads otherwise.
+        """
+        with transaction.atomic():
+            source_ids: np.ndarray = read_source_ids(sources)
+            edges: np.ndarray = read_edges(references)
+        edges = edges[
+            np.isin(edges[:, 0], source_ids) & np.isin(edges[:, 1], source_ids)
+        ]
+        return cls(source_ids, edges)
+
+    @classmethod
+    def from_compressed(
+        cls,
+        source_ids: np.ndarray,
+        csr: sparse.csr_matrix,
+        csc: sparse.csc_matrix,
+    ) -> "CitationMatrix":
+        """
+        Wraps the CSR and CSC forms of a citation matrix over the given
+        sorted Source IDs, without copying them.
+        """
+        matrix: "CitationMatrix" = cls.__new__(cls)
+        matrix.source_ids = np.asarray(source_ids, dtype=np.int64)
+        matrix.csr = csr
+        matrix.csc = csc
+        return matrix
+
+    @property
+    def shape(self):
+        return self.csr.shape
+
+    @property
+    def nnz(self) -> int:
+        """ Number of distinct (referrer, reference) pairs. """
+        return self.csr.nnz
+
+    def index_of(self, source_ids: Iterable[int]) -> np.ndarray:
+        """
+        Maps Source IDs to matrix indexes. Raises UnknownSourceError for IDs
+        that are not part of the matrix.
+        """
+        return positions_of(
+            self.source_ids, source_ids, UnknownSourceError, "source"
+        )
+
+    def ids_of(self, indexes: Iterable[int]) -> np.ndarray:
+        """ Maps matrix indexes back to Source IDs. """
+        return self.source_ids[np.asarray(indexes, dtype=np.int64)]
+
+    def cites(self, source_id: int) -> np.ndarray:
+        """ Returns the IDs of the sources cited by the given source. """
+        index: int = int(self.index_of([source_id])[0])
+        start, end = self.csr.indptr[index], self.csr.indptr[index + 1]
+        return self.source_ids[self.csr.indices[start:end]]
+
+    def cited_by(self, source_id: int) -> np.ndarray:
+        """ Returns the IDs of the sources citing the given source. """
+        index: int = int(self.index_of([source_id])[0])
+        start, end = self.csc.indptr[index], self.csc.indptr[index + 1]
+        return self.source_ids[self.csc.indices[start:end]]
+
+    def out_degree(self) -> np.ndarray:
+        """
+        Number of distinct sources cited by each source, in index order.
+        """
+        return np.diff(self.csr.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        """
+        Number of distinct sources citing each source, in index order.
+        """
+        return np.diff(self.csc.indptr)
+
+
+_cached_matrix: Optional[Tuple[float, CitationMatrix]] = None
+
+
+def get_cached_matrix(max_age: float = DEFAULT_MAX_AGE) -> CitationMatrix:
+    """
+    Returns a process-wide matrix of all sources and references, rebuilt when
+    it is older than 'max_age' seconds. Meant for repeated read queries that
+    can tolerate slightly outdated data.
+    """
+    global _cached_matrix
+    now: float = time.monotonic()
+    if _cached_matrix is None or now - _cached_matrix[0] > max_age:
+        _cached_matrix = (now, CitationMatrix.from_database())
+    return _cached_matrix[1]
+
+
+def clear_cached_matrix() -> None:
+    global _cached_matrix
+    _cached_matrix = None
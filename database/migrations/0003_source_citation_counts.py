@@ -0,0 +1,58 @@
+# Generated by Django 2.2.9 on 2026-10-17 17:16
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_citations(apps, schema_editor):
+    Source = apps.get_model("database", "Source")
+    Reference = apps.get_model("database", "Reference")
+
+    def count_subquery(field):
+        return Coalesce(
+            Subquery(
+                Reference.objects.filter(**{field: OuterRef("pk")})
+                .order_by()
+                .values(field)
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+
+    Source.objects.update(
+        times_cited=count_subquery("reference"),
+        references_made=count_subquery("referrer"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0002_auto_20200119_0027"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="source",
+            name="references_made",
+            field=models.PositiveIntegerField(
+                db_index=True,
+                default=0,
+                editable=False,
+                verbose_name="Number of references made by the source",
+            ),
+        ),
+        migrations.AddField(
+            model_name="source",
+            name="times_cited",
+            field=models.PositiveIntegerField(
+                db_index=True,
+                default=0,
+                editable=False,
+                verbose_name="Number of references to the source",
+            ),
+        ),
+        migrations.RunPython(count_citations, migrations.RunPython.noop),
+    ]
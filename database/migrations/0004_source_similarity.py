@@ -0,0 +1,125 @@
+# Generated by Django 2.2.9 on 2026-10-17 17:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0003_source_citation_counts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimilarityComputation",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("CC", "Co-citation"),
+                            ("BC", "Bibliographic coupling"),
+                        ],
+                        max_length=2,
+                        unique=True,
+                        verbose_name="Kind of similarity",
+                    ),
+                ),
+                (
+                    "top_k",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of neighbours stored per source"
+                    ),
+                ),
+                (
+                    "max_shared_degree",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Degree above which shared sources were ignored",
+                    ),
+                ),
+                (
+                    "last_reference_id",
+                    models.PositiveIntegerField(
+                        default=0,
+                        verbose_name="Highest Reference ID included in the computation",
+                    ),
+                ),
+                (
+                    "computed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Date of the computation",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SourceSimilarity",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("CC", "Co-citation"),
+                            ("BC", "Bibliographic coupling"),
+                        ],
+                        max_length=2,
+                        verbose_name="Kind of similarity",
+                    ),
+                ),
+                (
+                    "strength",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of sources citing both sources (co-citation) or cited by both sources (bibliographic coupling)"
+                    ),
+                ),
+                (
+                    "neighbour",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="database.Source",
+                        verbose_name="The related source",
+                    ),
+                ),
+                (
+                    "source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similarities",
+                        to="database.Source",
+                        verbose_name="The source",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="sourcesimilarity",
+            index=models.Index(
+                fields=["kind", "source", "-strength"],
+                name="database_so_kind_9eaa82_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.9 on 2026-10-17 17:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0004_source_similarity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SourceInfluence",
+            fields=[
+                (
+                    "source",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="influence",
+                        serialize=False,
+                        to="database.Source",
+                        verbose_name="The source",
+                    ),
+                ),
+                (
+                    "pagerank",
+                    models.FloatField(
+                        db_index=True, verbose_name="PageRank of the source"
+                    ),
+                ),
+                (
+                    "hub_score",
+                    models.FloatField(
+                        db_index=True,
+                        verbose_name="HITS hub score of the source",
+                    ),
+                ),
+                (
+                    "authority_score",
+                    models.FloatField(
+                        db_index=True,
+                        verbose_name="HITS authority score of the source",
+                    ),
+                ),
+                (
+                    "computed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Date of the computation",
+                    ),
+                ),
+            ],
+        ),
+    ]
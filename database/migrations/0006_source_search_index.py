@@ -0,0 +1,63 @@
+from django.db import migrations
+
+SEARCH_TABLE = "database_source_search"
+
+# Frozen copy of database.search._INDEX_SQL as of this migration. It is not
+# imported, so that later changes to the index don't change the history;
+# 'rebuild_search_index' fills the index with the current statement.
+INDEX_SQL = """
+INSERT INTO {search_table}(rowid, title, abstract, authors)
+SELECT
+    source.id,
+    source.title,
+    COALESCE(source.abstract, ''),
+    COALESCE(
+        (
+            SELECT group_concat(
+                COALESCE(author.first_name, '') || ' ' ||
+                COALESCE(author.middle_name, '') || ' ' ||
+                author.last_name,
+                ' '
+            )
+            FROM {authors_table} authorship
+            JOIN {author_table} author ON author.id = authorship.author_id
+            WHERE authorship.source_id = source.id
+        ),
+        ''
+    )
+FROM {source_table} source
+"""
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {} "
+        "USING fts5(title, abstract, authors)".format(SEARCH_TABLE)
+    )
+    schema_editor.execute(
+        INDEX_SQL.format(
+            search_table=SEARCH_TABLE,
+            authors_table="database_source_authors",
+            author_table="database_author",
+            source_table="database_source",
+        )
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS {}".format(SEARCH_TABLE))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0005_source_influence"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.9 on 2026-10-17 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0006_source_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="source",
+            name="citation_key",
+            field=models.CharField(
+                blank=True,
+                max_length=200,
+                null=True,
+                unique=True,
+                verbose_name="Key of the source in imported bibliographies",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PendingReference",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "reference_key",
+                    models.CharField(
+                        db_index=True,
+                        max_length=200,
+                        verbose_name="Citation key of the source being referred to",
+                    ),
+                ),
+                (
+                    "referrer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_references",
+                        to="database.Source",
+                        verbose_name="The source making the reference ('FROM')",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 2.2.9 on 2026-10-17 17:47
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+# (description, Q matching the violating sources)
+VIOLATIONS = [
+    (
+        "page range starts after its end",
+        models.Q(
+            journal_page_range_start__gt=django.db.models.expressions.F(
+                "journal_page_range_end"
+            )
+        ),
+    ),
+    (
+        "book linked to a journal or without publisher",
+        models.Q(type="BK")
+        & (
+            models.Q(source_journal__isnull=False)
+            | models.Q(source_publisher__isnull=True)
+        ),
+    ),
+    (
+        "article with a publisher or without journal",
+        models.Q(type="AR")
+        & (
+            models.Q(source_journal__isnull=True)
+            | models.Q(source_publisher__isnull=False)
+        ),
+    ),
+]
+
+
+def report_violations(apps, schema_editor):
+    """
+    Lists the existing sources that break the new constraints, instead of
+    failing on the first one with an IntegrityError.
+    """
+    Source = apps.get_model("database", "Source")
+    report = []
+    for description, violating in VIOLATIONS:
+        ids = list(
+            Source.objects.filter(violating)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        if ids:
+            report.append(
+                "{} sources with {} (IDs: {}{})".format(
+                    len(ids),
+                    description,
+                    ", ".join(map(str, ids[:20])),
+                    ", ..." if len(ids) > 20 else "",
+                )
+            )
+    if report:
+        raise ValueError(
+            "Fix these sources before adding the Source constraints:\n"
+            + "\n".join(report)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0007_source_citation_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(report_violations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="source",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    ("journal_page_range_start__isnull", True),
+                    ("journal_page_range_end__isnull", True),
+                    (
+                        "journal_page_range_start__lte",
+                        django.db.models.expressions.F(
+                            "journal_page_range_end"
+                        ),
+                    ),
+                    _connector="OR",
+                ),
+                name="source_page_range_order",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="source",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(_negated=True, type="BK"),
+                    models.Q(
+                        ("source_journal__isnull", True),
+                        ("source_publisher__isnull", False),
+                    ),
+                    _connector="OR",
+                ),
+                name="source_book_links",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="source",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(_negated=True, type="AR"),
+                    models.Q(
+                        ("source_journal__isnull", False),
+                        ("source_publisher__isnull", True),
+                    ),
+                    _connector="OR",
+                ),
+                name="source_article_links",
+            ),
+        ),
+    ]
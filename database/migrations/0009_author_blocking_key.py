@@ -0,0 +1,52 @@
+# Generated by Django 2.2.9 on 2026-10-17 17:49
+
+import re
+
+from django.db import migrations, models
+from text_unidecode import unidecode
+
+
+def tokens(name):
+    return re.findall(r"[a-z0-9]+", unidecode(name or "").lower())
+
+
+def compute_blocking_keys(apps, schema_editor):
+    """ Same keys as database.deduplication.blocking_key(). """
+    Author = apps.get_model("database", "Author")
+    last_pk = 0
+    while True:
+        authors = list(
+            Author.objects.filter(pk__gt=last_pk).order_by("pk")[:500]
+        )
+        if not authors:
+            return
+        for author in authors:
+            names = tokens(author.first_name) + tokens(author.middle_name)
+            author.blocking_key = "{}:{}".format(
+                "".join(tokens(author.last_name))[:200],
+                names[0][0] if names else "",
+            )
+        Author.objects.bulk_update(authors, ["blocking_key"])
+        last_pk = authors[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0008_source_constraints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="author",
+            name="blocking_key",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=210,
+                verbose_name="De-duplication key of the author",
+            ),
+        ),
+        migrations.RunPython(compute_blocking_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.9 on 2026-10-17 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0009_author_blocking_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TableVersion",
+            fields=[
+                (
+                    "table",
+                    models.CharField(
+                        max_length=100,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Name of the table",
+                    ),
+                ),
+                (
+                    "version",
+                    models.BigIntegerField(
+                        default=0,
+                        verbose_name="Number of changes made to the table",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 2.2.9 on 2026-10-17 17:58
+
+import django.db.models.deletion
+import django.db.models.expressions
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+INVALID_PAIRS_SQL = """
+SELECT referrer_id, reference_id
+FROM database_reference
+GROUP BY referrer_id, reference_id
+HAVING COUNT(*) > 1 OR referrer_id = reference_id
+"""
+
+DELETE_SQL = """
+DELETE FROM database_reference
+WHERE referrer_id = reference_id
+OR id NOT IN (
+    SELECT id FROM (
+        SELECT MIN(id) AS id
+        FROM database_reference
+        GROUP BY referrer_id, reference_id
+    ) AS kept
+)
+"""
+
+
+def remove_invalid_references(apps, schema_editor):
+    """
+    Deletes duplicated references (keeping the lowest ID of each pair) and
+    self-citations before the constraints are added, and recomputes the
+    citation counters of the sources involved. The same as the
+    'deduplicate_references' command.
+    """
+    Source = apps.get_model("database", "Source")
+    Reference = apps.get_model("database", "Reference")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(INVALID_PAIRS_SQL)
+        source_ids = sorted({pk for pair in cursor.fetchall() for pk in pair})
+        if not source_ids:
+            return
+        cursor.execute(DELETE_SQL)
+    for start in range(0, len(source_ids), 500):
+        Source.objects.filter(pk__in=source_ids[start : start + 500]).update(
+            times_cited=Coalesce(
+                Subquery(
+                    Reference.objects.filter(reference=OuterRef("pk"))
+                    .order_by()
+                    .values("reference")
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            ),
+            references_made=Coalesce(
+                Subquery(
+                    Reference.objects.filter(referrer=OuterRef("pk"))
+                    .order_by()
+                    .values("referrer")
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0010_table_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_invalid_references, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="reference",
+            constraint=models.UniqueConstraint(
+                fields=("referrer", "reference"), name="reference_unique_pair"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="reference",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    _negated=True,
+                    referrer=django.db.models.expressions.F("reference"),
+                ),
+                name="reference_no_self_citation",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="evaluation",
+            index=models.Index(
+                fields=["user", "source"], name="evaluation_user_source"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reference",
+            index=models.Index(
+                fields=["reference", "referrer"],
+                name="reference_reference_referrer",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="source",
+            index=models.Index(
+                fields=["type", "year_of_publication"], name="source_type_year"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="evaluation",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="User making the evaluation",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="reference",
+            name="reference",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="cited",
+                to="database.Source",
+                verbose_name="The source being referred to ('TO')",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="reference",
+            name="referrer",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="citations",
+                to="database.Source",
+                verbose_name="The source making the reference ('FROM')",
+            ),
+        ),
+    ]
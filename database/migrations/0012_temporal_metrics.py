@@ -0,0 +1,206 @@
+# Generated by Django 2.2.9 on 2026-10-17 18:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0011_reference_constraints_and_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JournalYearMetrics",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "year",
+                    models.IntegerField(
+                        db_index=True, verbose_name="The year"
+                    ),
+                ),
+                (
+                    "citable_items",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of sources published in the two prior years"
+                    ),
+                ),
+                (
+                    "impact_citations",
+                    models.PositiveIntegerField(
+                        verbose_name="Citations made in the year to sources of the two prior years"
+                    ),
+                ),
+                (
+                    "impact_factor",
+                    models.FloatField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Two-year impact factor",
+                    ),
+                ),
+                (
+                    "cited_half_life",
+                    models.FloatField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Median age of its sources cited in the year",
+                    ),
+                ),
+                (
+                    "citing_half_life",
+                    models.FloatField(
+                        blank=True,
+                        null=True,
+                        verbose_name="Median age of the sources cited by its sources of the year",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SourceYearCitations",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "year",
+                    models.IntegerField(
+                        db_index=True,
+                        verbose_name="Year of publication of the citing sources",
+                    ),
+                ),
+                (
+                    "citations",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of citations"
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TemporalComputation",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_reference_id",
+                    models.PositiveIntegerField(
+                        default=0,
+                        verbose_name="Highest Reference ID included in the computation",
+                    ),
+                ),
+                (
+                    "last_source_id",
+                    models.PositiveIntegerField(
+                        default=0,
+                        verbose_name="Highest Source ID included in the computation",
+                    ),
+                ),
+                (
+                    "computed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Date of the computation",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="YearCitationFlow",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "citing_year",
+                    models.IntegerField(
+                        verbose_name="Year of publication of the citing sources"
+                    ),
+                ),
+                (
+                    "cited_year",
+                    models.IntegerField(
+                        verbose_name="Year of publication of the cited sources"
+                    ),
+                ),
+                (
+                    "citations",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of citations"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="yearcitationflow",
+            constraint=models.UniqueConstraint(
+                fields=("citing_year", "cited_year"),
+                name="year_citation_flow_unique_years",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sourceyearcitations",
+            name="source",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="citations_per_year",
+                to="database.Source",
+                verbose_name="The cited source",
+            ),
+        ),
+        migrations.AddField(
+            model_name="journalyearmetrics",
+            name="journal",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="yearly_metrics",
+                to="database.Journal",
+                verbose_name="The journal",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sourceyearcitations",
+            constraint=models.UniqueConstraint(
+                fields=("source", "year"),
+                name="source_year_citations_unique_year",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="journalyearmetrics",
+            constraint=models.UniqueConstraint(
+                fields=("journal", "year"),
+                name="journal_year_metrics_unique_year",
+            ),
+        ),
+    ]
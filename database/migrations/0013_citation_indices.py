@@ -0,0 +1,165 @@
+# Generated by Django 2.2.9 on 2026-10-17 18:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0012_temporal_metrics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorIndices",
+            fields=[
+                (
+                    "h_index",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        verbose_name="Largest h such that h sources are cited h times",
+                    ),
+                ),
+                (
+                    "g_index",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        verbose_name="Largest g such that the g most cited sources are cited g² times",
+                    ),
+                ),
+                (
+                    "sources",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of sources"
+                    ),
+                ),
+                (
+                    "citations",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of citations of the sources"
+                    ),
+                ),
+                (
+                    "computed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Date of the computation",
+                    ),
+                ),
+                (
+                    "author",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="indices",
+                        serialize=False,
+                        to="database.Author",
+                        verbose_name="The author",
+                    ),
+                ),
+            ],
+            options={"abstract": False,},
+        ),
+        migrations.CreateModel(
+            name="JournalIndices",
+            fields=[
+                (
+                    "h_index",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        verbose_name="Largest h such that h sources are cited h times",
+                    ),
+                ),
+                (
+                    "g_index",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        verbose_name="Largest g such that the g most cited sources are cited g² times",
+                    ),
+                ),
+                (
+                    "sources",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of sources"
+                    ),
+                ),
+                (
+                    "citations",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of citations of the sources"
+                    ),
+                ),
+                (
+                    "computed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Date of the computation",
+                    ),
+                ),
+                (
+                    "journal",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="indices",
+                        serialize=False,
+                        to="database.Journal",
+                        verbose_name="The journal",
+                    ),
+                ),
+            ],
+            options={"abstract": False,},
+        ),
+        migrations.CreateModel(
+            name="PublisherIndices",
+            fields=[
+                (
+                    "h_index",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        verbose_name="Largest h such that h sources are cited h times",
+                    ),
+                ),
+                (
+                    "g_index",
+                    models.PositiveIntegerField(
+                        db_index=True,
+                        verbose_name="Largest g such that the g most cited sources are cited g² times",
+                    ),
+                ),
+                (
+                    "sources",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of sources"
+                    ),
+                ),
+                (
+                    "citations",
+                    models.PositiveIntegerField(
+                        verbose_name="Number of citations of the sources"
+                    ),
+                ),
+                (
+                    "computed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Date of the computation",
+                    ),
+                ),
+                (
+                    "publisher",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="indices",
+                        serialize=False,
+                        to="database.Publisher",
+                        verbose_name="The publisher",
+                    ),
+                ),
+            ],
+            options={"abstract": False,},
+        ),
+    ]
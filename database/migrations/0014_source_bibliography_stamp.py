@@ -0,0 +1,24 @@
+# Generated by Django 2.2.9 on 2026-10-17 18:34
+
+from django.db import migrations, models
+
+import database.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("database", "0013_citation_indices"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="source",
+            name="bibliography_stamp",
+            field=models.BigIntegerField(
+                default=database.models.random_stamp,
+                editable=False,
+                verbose_name="Stamp of the bibliography entry of the source",
+            ),
+        ),
+    ]
@@ -1,11 +1,18 @@
-from typing import Tuple
+import random
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
 
+def random_stamp() -> int:
+    """ A random positive 63-bit number, telling apart states of data. """
+    return random.randint(1, 2 ** 62)
+
+
 class User(AbstractUser):
     pass
 
@@ -35,6 +42,15 @@ class Author(CMBaseModel):
     last_name = models.CharField(
         max_length=200, verbose_name=_("Last name of the author")
     )
+    # Transliterated last name and first initial, to find duplicated authors
+    # (see database.deduplication).
+    blocking_key = models.CharField(
+        max_length=210,
+        default="",
+        editable=False,
+        db_index=True,
+        verbose_name=_("De-duplication key of the author"),
+    )
 
     def __str__(self) -> str:
         return "{} {} {}".format(
@@ -47,13 +63,24 @@ class Author(CMBaseModel):
         Returns the Initials of the author.
         (based on the values of the 'first_name' and 'middle_name' fields
         """
-        initials_of_first_names: str = " ".join(
-            [name[0].upper() for name in self.first_name.split()]
+        names: str = " ".join(
+            name for name in (self.first_name, self.middle_name) if name
         )
-        initials_of_middle_names: str = " ".join(
-            [name[0].upper() for name in self.middle_name.split()]
+        return " ".join([name[0].upper() for name in names.split()])
+
+    def save(self, *args, **kwargs):
+        """ Keeps the blocking key (see database.deduplication) up to date. """
+        from database.deduplication import blocking_key
+
+        self.blocking_key = blocking_key(
+            self.first_name, self.middle_name, self.last_name
         )
-        return initials_of_first_names + " " + initials_of_middle_names
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {
+                *kwargs["update_fields"],
+                "blocking_key",
+            }
+        super(Author, self).save(*args, **kwargs)
 
 
 class Publisher(CMBaseModel):
@@ -86,6 +113,26 @@ class Journal(CMBaseModel):
         return "{}".format(self.name)
 
 
+class SourceQuerySet(models.QuerySet):
+    def search(self, terms: str) -> "SourceQuerySet":
+        """
+        Full-text search over the title, abstract and authors of the
+        sources, ordered by relevance (see database.search).
+        """
+        from database.search import search
+
+        return search(self, terms)
+
+    def bibliography(self, style: str = "apa") -> List[str]:
+        """
+        The formatted entries of the sources in the given style ('apa',
+        'mla' or 'chicago'), see database.citation_styles.
+        """
+        from database.citation_styles import render
+
+        return list(render(self, style).values())
+
+
 class Source(CMBaseModel):
     TYPE_CHOICES: Tuple[Tuple[str, str], ...] = (
         ("AR", "Article"),
@@ -135,10 +182,112 @@ class Source(CMBaseModel):
     abstract = models.TextField(
         blank=True, null=True, verbose_name=_("The abstract of the source.")
     )
+    citation_key = models.CharField(
+        max_length=200,
+        unique=True,
+        blank=True,
+        null=True,
+        verbose_name=_("Key of the source in imported bibliographies"),
+    )
+    # Denormalized citation counts, maintained by the signal handlers in
+    # database.signals. Rebuild with the 'recompute_citation_counts' command.
+    times_cited = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name=_("Number of references to the source"),
+    )
+    references_made = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name=_("Number of references made by the source"),
+    )
+
+    # Replaced whenever the data of the formatted bibliography entry of the
+    # source changes, to key its cached entries (see
+    # database.citation_styles).
+    bibliography_stamp = models.BigIntegerField(
+        default=random_stamp,
+        editable=False,
+        verbose_name=_("Stamp of the bibliography entry of the source"),
+    )
+
+    COUNTER_FIELDS: Tuple[str, ...] = ("times_cited", "references_made")
+
+    objects = SourceQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(journal_page_range_start__isnull=True)
+                | models.Q(journal_page_range_end__isnull=True)
+                | models.Q(
+                    journal_page_range_start__lte=models.F(
+                        "journal_page_range_end"
+                    )
+                ),
+                name="source_page_range_order",
+            ),
+            models.CheckConstraint(
+                check=~models.Q(type="BK")
+                | models.Q(
+                    source_journal__isnull=True, source_publisher__isnull=False
+                ),
+                name="source_book_links",
+            ),
+            models.CheckConstraint(
+                check=~models.Q(type="AR")
+                | models.Q(
+                    source_journal__isnull=False, source_publisher__isnull=True
+                ),
+                name="source_article_links",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["type", "year_of_publication"],
+                name="source_type_year",
+            )
+        ]
 
     def __str__(self) -> str:
         return "{} ({})".format(self.title, self.type)
 
+    def ancestors(
+        self,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None,
+        cached: bool = False,
+    ) -> List[Tuple[int, int]]:
+        """
+        Returns the (source_id, depth) pairs of the sources this source
+        transitively cites, ordered by depth. With 'cached', the query runs
+        on the in-memory citation matrix instead of the database.
+        """
+        from database import ancestry
+
+        return ancestry.relatives(
+            self.pk, ancestry.ANCESTORS, max_depth, limit, cached
+        )
+
+    def descendants(
+        self,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None,
+        cached: bool = False,
+    ) -> List[Tuple[int, int]]:
+        """
+        Returns the (source_id, depth) pairs of the sources transitively
+        citing this source, ordered by depth. With 'cached', the query runs
+        on the in-memory citation matrix instead of the database.
+        """
+        from database import ancestry
+
+        return ancestry.relatives(
+            self.pk, ancestry.DESCENDANTS, max_depth, limit, cached
+        )
+
     @property
     def get_publisher(self):
         """
@@ -149,6 +298,16 @@ class Source(CMBaseModel):
             return self.source_publisher
         return self.source_journal.journal_publisher
 
+    @classmethod
+    def validate_batch(cls, sources: List["Source"]) -> None:
+        """
+        Checks a batch of unsaved sources at once, before they are bulk
+        inserted (see database.validation).
+        """
+        from database.validation import validate_sources
+
+        validate_sources(sources)
+
     def save(self, *args, **kwargs):
         """
         Runs the following checks before saving:
@@ -157,60 +316,148 @@ class Source(CMBaseModel):
         - Verify that sources with type 'book' don't have journal set.
         - Verify that sources with type 'article' don't have a publisher set
         - Verify that sources with type 'article' are linked to a journal.
+
+        The database enforces the same rules with check constraints.
         """
-        # Page range check
-        if self.journal_page_range_start and self.journal_page_range_end:
-            if self.journal_page_range_start > self.journal_page_range_end:
-                raise ValueError(
-                    "Invalid page range! Start is placed after the end!"
-                )
-
-        # Book checks
-        if self.type == "BK":
-            if self.source_journal:
-                raise ValueError(
-                    "Source with type 'book' cannot be linked to a journal!"
-                )
-            if not self.source_publisher:
-                raise ValueError(
-                    "Source with type 'book' has no publisher set!"
-                )
-
-        # article checks
-        if self.type == "AR":
-            if not self.source_journal:
-                raise ValueError("Article is not linked to a journal!")
-            if self.source_publisher:
-                raise ValueError(
-                    "Source with type 'article' has a publisher set! "
-                    "(Should be done in the journal instead)"
-                )
+        self.validate_batch([self])
+
+        # Don't overwrite the counters, which are updated in the database
+        # while this instance may be in memory.
+        if (
+            not self._state.adding
+            and not args
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in self.COUNTER_FIELDS
+            ]
 
         super(Source, self).save(*args, **kwargs)
 
 
+class ReferenceQuerySet(models.QuerySet):
+    def delete(self) -> Tuple[int, Dict[str, int]]:
+        """
+        Deletes the references in a single query, and rebuilds the citation
+        counters of the sources they connected.
+        """
+        from database.citation_counts import references_deleted
+
+        with transaction.atomic():
+            source_ids: Set[int] = set()
+            for referrer_id, reference_id in self.values_list(
+                "referrer_id", "reference_id"
+            ):
+                source_ids.update((referrer_id, reference_id))
+            deleted = super().delete()
+            if source_ids:
+                references_deleted(source_ids)
+        return deleted
+
+    delete.alters_data = True  # type: ignore
+    delete.queryset_only = True  # type: ignore
+
+
 class Reference(CMBaseModel):
+    # The indexes of both foreign keys are covered by the composite indexes
+    # in Meta, which also answer the lookups from an index only.
     referrer = models.ForeignKey(
         Source,
         related_name="citations",
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name=_("The source making the reference ('FROM')"),
     )
     reference = models.ForeignKey(
         Source,
         related_name="cited",
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name=_("The source being referred to ('TO')"),
     )
 
+    objects = ReferenceQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["referrer", "reference"], name="reference_unique_pair"
+            ),
+            models.CheckConstraint(
+                check=~models.Q(referrer=models.F("reference")),
+                name="reference_no_self_citation",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["reference", "referrer"],
+                name="reference_reference_referrer",
+            )
+        ]
+
     def __str__(self) -> str:
         return "{} - {}".format(self.referrer, self.reference)
 
+    def delete(self, *args: Any, **kwargs: Any) -> Tuple[int, Dict[str, int]]:
+        from database.citation_counts import references_deleted
+
+        with transaction.atomic():
+            deleted = super().delete(*args, **kwargs)
+            references_deleted([self.referrer_id, self.reference_id])
+        return deleted
+
+    def clean(self) -> None:
+        """
+        Reports self-citations and duplicated references to forms, before
+        the constraints of the database reject them.
+        """
+        if self.referrer_id is None or self.reference_id is None:
+            return
+        if self.referrer_id == self.reference_id:
+            raise ValidationError(_("A source cannot cite itself."))
+        if (
+            Reference.objects.filter(
+                referrer_id=self.referrer_id, reference_id=self.reference_id
+            )
+            .exclude(pk=self.pk)
+            .exists()
+        ):
+            raise ValidationError(_("This reference already exists."))
+
+
+class PendingReference(models.Model):
+    """
+    A reference of an imported source to a citation key that hasn't been
+    imported yet. Resolved into a Reference once a source with that key
+    exists (see database.importer).
+    """
+
+    referrer = models.ForeignKey(
+        Source,
+        related_name="pending_references",
+        on_delete=models.CASCADE,
+        verbose_name=_("The source making the reference ('FROM')"),
+    )
+    reference_key = models.CharField(
+        max_length=200,
+        db_index=True,
+        verbose_name=_("Citation key of the source being referred to"),
+    )
+
+    def __str__(self) -> str:
+        return "{} - {}".format(self.referrer_id, self.reference_key)
+
 
 class Evaluation(CMBaseModel):
+    # Indexed by the (user, source) index in Meta.
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name=_("User making the evaluation"),
     )
     source = models.ForeignKey(
@@ -231,5 +478,326 @@ class Evaluation(CMBaseModel):
         ),
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "source"], name="evaluation_user_source"
+            )
+        ]
+
     def __str__(self) -> str:
         return "Evaluation for {} from {}".format(self.source, self.user)
+
+
+class SourceSimilarity(models.Model):
+    """
+    Strength of the relation between two sources, as computed by
+    database.similarity. Only the strongest neighbours of each source are
+    stored.
+    """
+
+    CO_CITATION: str = "CC"
+    BIBLIOGRAPHIC_COUPLING: str = "BC"
+    KIND_CHOICES: Tuple[Tuple[str, str], ...] = (
+        (CO_CITATION, "Co-citation"),
+        (BIBLIOGRAPHIC_COUPLING, "Bibliographic coupling"),
+    )
+
+    kind = models.CharField(
+        max_length=2,
+        choices=KIND_CHOICES,
+        verbose_name=_("Kind of similarity"),
+    )
+    source = models.ForeignKey(
+        Source,
+        related_name="similarities",
+        on_delete=models.CASCADE,
+        verbose_name=_("The source"),
+    )
+    neighbour = models.ForeignKey(
+        Source,
+        related_name="+",
+        on_delete=models.CASCADE,
+        verbose_name=_("The related source"),
+    )
+    strength = models.PositiveIntegerField(
+        verbose_name=_(
+            "Number of sources citing both sources (co-citation) or cited by "
+            "both sources (bibliographic coupling)"
+        )
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["kind", "source", "-strength"])]
+
+    def __str__(self) -> str:
+        return "{} - {} ({}: {})".format(
+            self.source_id, self.neighbour_id, self.kind, self.strength
+        )
+
+
+class SimilarityComputation(models.Model):
+    """ Bookkeeping of the last computation of each kind of similarity. """
+
+    kind = models.CharField(
+        max_length=2,
+        choices=SourceSimilarity.KIND_CHOICES,
+        unique=True,
+        verbose_name=_("Kind of similarity"),
+    )
+    top_k = models.PositiveIntegerField(
+        verbose_name=_("Number of neighbours stored per source")
+    )
+    max_shared_degree = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name=_("Degree above which shared sources were ignored"),
+    )
+    last_reference_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Highest Reference ID included in the computation"),
+    )
+    computed_at = models.DateTimeField(
+        default=timezone.now, verbose_name=_("Date of the computation")
+    )
+
+    def __str__(self) -> str:
+        return "{} computed at {}".format(self.kind, self.computed_at)
+
+
+class SourceInfluence(models.Model):
+    """
+    Influence scores of a source in the citation graph, as computed by
+    database.centrality.
+    """
+
+    source = models.OneToOneField(
+        Source,
+        primary_key=True,
+        related_name="influence",
+        on_delete=models.CASCADE,
+        verbose_name=_("The source"),
+    )
+    pagerank = models.FloatField(
+        db_index=True, verbose_name=_("PageRank of the source")
+    )
+    hub_score = models.FloatField(
+        db_index=True, verbose_name=_("HITS hub score of the source")
+    )
+    authority_score = models.FloatField(
+        db_index=True, verbose_name=_("HITS authority score of the source")
+    )
+    computed_at = models.DateTimeField(
+        default=timezone.now, verbose_name=_("Date of the computation")
+    )
+
+    def __str__(self) -> str:
+        return "Influence of {}".format(self.source_id)
+
+
+class TableVersion(models.Model):
+    """
+    Change counter of a table, increased whenever its rows change (see
+    database.versions). Cheap to read, to tell clients whether data derived
+    from the table is still current.
+    """
+
+    table = models.CharField(
+        max_length=100, primary_key=True, verbose_name=_("Name of the table")
+    )
+    version = models.BigIntegerField(
+        default=0, verbose_name=_("Number of changes made to the table")
+    )
+
+    def __str__(self) -> str:
+        return "{} (version {})".format(self.table, self.version)
+
+
+class YearCitationFlow(models.Model):
+    """
+    Number of citations made by sources published in one year to sources
+    published in another, as computed by database.temporal.
+    """
+
+    citing_year = models.IntegerField(
+        verbose_name=_("Year of publication of the citing sources")
+    )
+    cited_year = models.IntegerField(
+        verbose_name=_("Year of publication of the cited sources")
+    )
+    citations = models.PositiveIntegerField(
+        verbose_name=_("Number of citations")
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["citing_year", "cited_year"],
+                name="year_citation_flow_unique_years",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return "{} -> {}: {}".format(
+            self.citing_year, self.cited_year, self.citations
+        )
+
+
+class SourceYearCitations(models.Model):
+    """
+    Number of citations a source received from sources published in a year,
+    as computed by database.temporal.
+    """
+
+    source = models.ForeignKey(
+        Source,
+        related_name="citations_per_year",
+        on_delete=models.CASCADE,
+        verbose_name=_("The cited source"),
+    )
+    year = models.IntegerField(
+        db_index=True,
+        verbose_name=_("Year of publication of the citing sources"),
+    )
+    citations = models.PositiveIntegerField(
+        verbose_name=_("Number of citations")
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "year"],
+                name="source_year_citations_unique_year",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return "{} in {}: {}".format(self.source_id, self.year, self.citations)
+
+
+class JournalYearMetrics(models.Model):
+    """
+    Yearly citation metrics of a journal, as computed by database.temporal.
+    """
+
+    journal = models.ForeignKey(
+        Journal,
+        related_name="yearly_metrics",
+        on_delete=models.CASCADE,
+        verbose_name=_("The journal"),
+    )
+    year = models.IntegerField(db_index=True, verbose_name=_("The year"))
+    citable_items = models.PositiveIntegerField(
+        verbose_name=_("Number of sources published in the two prior years")
+    )
+    impact_citations = models.PositiveIntegerField(
+        verbose_name=_(
+            "Citations made in the year to sources of the two prior years"
+        )
+    )
+    impact_factor = models.FloatField(
+        blank=True, null=True, verbose_name=_("Two-year impact factor"),
+    )
+    cited_half_life = models.FloatField(
+        blank=True,
+        null=True,
+        verbose_name=_("Median age of its sources cited in the year"),
+    )
+    citing_half_life = models.FloatField(
+        blank=True,
+        null=True,
+        verbose_name=_(
+            "Median age of the sources cited by its sources of the year"
+        ),
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["journal", "year"],
+                name="journal_year_metrics_unique_year",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return "{} in {}".format(self.journal_id, self.year)
+
+
+class TemporalComputation(models.Model):
+    """ Bookkeeping of the last computation of database.temporal. """
+
+    last_reference_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Highest Reference ID included in the computation"),
+    )
+    last_source_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Highest Source ID included in the computation"),
+    )
+    computed_at = models.DateTimeField(
+        default=timezone.now, verbose_name=_("Date of the computation")
+    )
+
+    def __str__(self) -> str:
+        return "Temporal metrics computed at {}".format(self.computed_at)
+
+
+class CitationIndices(models.Model):
+    """
+    h-index and g-index of the sources of an author, journal or publisher,
+    as computed by database.citation_indices.
+    """
+
+    h_index = models.PositiveIntegerField(
+        db_index=True,
+        verbose_name=_("Largest h such that h sources are cited h times"),
+    )
+    g_index = models.PositiveIntegerField(
+        db_index=True,
+        verbose_name=_(
+            "Largest g such that the g most cited sources are cited g² times"
+        ),
+    )
+    sources = models.PositiveIntegerField(verbose_name=_("Number of sources"))
+    citations = models.PositiveIntegerField(
+        verbose_name=_("Number of citations of the sources")
+    )
+    computed_at = models.DateTimeField(
+        default=timezone.now, verbose_name=_("Date of the computation")
+    )
+
+    class Meta:
+        abstract = True
+
+    def __str__(self) -> str:
+        return "h-index {}, g-index {}".format(self.h_index, self.g_index)
+
+
+class AuthorIndices(CitationIndices):
+    author = models.OneToOneField(
+        Author,
+        primary_key=True,
+        related_name="indices",
+        on_delete=models.CASCADE,
+        verbose_name=_("The author"),
+    )
+
+
+class JournalIndices(CitationIndices):
+    journal = models.OneToOneField(
+        Journal,
+        primary_key=True,
+        related_name="indices",
+        on_delete=models.CASCADE,
+        verbose_name=_("The journal"),
+    )
+
+
+class PublisherIndices(CitationIndices):
+    publisher = models.OneToOneField(
+        Publisher,
+        primary_key=True,
+        related_name="indices",
+        on_delete=models.CASCADE,
+        verbose_name=_("The publisher"),
+    )
@@ -0,0 +1,173 @@
+"""
+Process-pool execution of CPU-bound computations over blocks of the citation
+matrix.
+
+The input arrays (typically the index arrays of sparse matrices) are copied
+once into a shared memory segment. Each worker process attaches to it when
+it starts, and sees the arrays as read-only views without copying or
+unpickling them: only the blocks (arrays of matrix indexes) and the results
+are sent between processes. Results are returned in the order of the
+blocks, so parallel runs give the same results as sequential ones.
+
+Workers are started with the 'spawn' method rather than forked, so they
+don't share the database connections of the parent process. They must not
+query the database. Shared memory needs Python 3.8, see is_supported().
+"""
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+from scipy import sparse
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+# Alignment of the arrays within the shared memory segment.
+ALIGNMENT: int = 64
+
+# (dtype, shape, offset) of every shared array by name.
+Layout = Dict[str, Tuple[str, Tuple[int, ...], int]]
+
+# The shared arrays of the current (worker) process.
+_arrays: Dict[str, np.ndarray] = {}
+_segment: Optional[Any] = None
+
+
+def is_supported() -> bool:
+    """ Whether computations can be spread over worker processes. """
+    return shared_memory is not None
+
+
+class SharedArrays:
+    """
+    Named arrays copied into a new shared memory segment, which is removed
+    when the context is exited.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.layout: Layout = {}
+        size: int = 0
+        for name, array in arrays.items():
+            self.layout[name] = (array.dtype.str, array.shape, size)
+            size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        self.segment = shared_memory.SharedMemory(create=True, size=size or 1)
+        for name, view in attach(self.segment, self.layout).items():
+            view[...] = arrays[name]
+
+    @property
+    def name(self) -> str:
+        return self.segment.name
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.segment.close()
+        self.segment.unlink()
+
+
+def attach(segment, layout: Layout) -> Dict[str, np.ndarray]:
+    """ Views of the arrays of 'layout' in a shared memory segment. """
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=offset)
+        for name, (dtype, shape, offset) in layout.items()
+    }
+
+
+def _initialize(segment_name: str, layout: Layout) -> None:
+    """ Attaches a new worker process to the shared arrays. """
+    import django
+
+    global _segment
+    django.setup()
+    _segment = shared_memory.SharedMemory(name=segment_name)
+    _arrays.update(attach(_segment, layout))
+    for array in _arrays.values():
+        array.flags.writeable = False
+
+
+def shared_arrays() -> Dict[str, np.ndarray]:
+    """ The shared arrays, for the functions run on the blocks. """
+    return _arrays
+
+
+def csr_arrays(
+    prefix: str, matrix: sparse.csr_matrix
+) -> Dict[str, np.ndarray]:
+    """ The arrays of a CSR matrix, to share them. """
+    return {
+        prefix + ".data": matrix.data,
+        prefix + ".indices": matrix.indices,
+        prefix + ".indptr": matrix.indptr,
+        prefix + ".shape": np.array(matrix.shape, dtype=np.int64),
+    }
+
+
+def shared_csr(prefix: str) -> sparse.csr_matrix:
+    """ The CSR matrix shared by csr_arrays(), without copying its arrays. """
+    arrays: Dict[str, np.ndarray] = shared_arrays()
+    return sparse.csr_matrix(
+        (
+            arrays[prefix + ".data"],
+            arrays[prefix + ".indices"],
+            arrays[prefix + ".indptr"],
+        ),
+        shape=tuple(arrays[prefix + ".shape"].tolist()),
+        copy=False,
+    )
+
+
+def map_blocks(
+    function: Callable[..., Any],
+    blocks: Iterable[np.ndarray],
+    arrays: Dict[str, np.ndarray],
+    workers: int = 1,
+    *args: Any
+) -> Iterator[Any]:
+    """
+    Yields function(block, *args) for every block, in order, with the given
+    arrays available through shared_arrays(). 'function' must be a module
+    level function. With a single worker, the blocks are run in this process
+    on the arrays themselves.
+    """
+    if workers <= 1:
+        previous: Dict[str, np.ndarray] = dict(_arrays)
+        _arrays.clear()
+        _arrays.update(arrays)
+        try:
+            for block in blocks:
+                yield function(block, *args)
+        finally:
+            _arrays.clear()
+            _arrays.update(previous)
+        return
+    if not is_supported():
+        raise RuntimeError("Parallel execution needs Python 3.8 or newer")
+    with SharedArrays(arrays) as shared, ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_initialize,
+        initargs=(shared.name, shared.layout),
+    ) as executor:
+        futures: Deque[Future] = deque(
+            executor.submit(function, block, *args) for block in blocks
+        )
+        try:
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
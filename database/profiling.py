@@ -0,0 +1,180 @@
+"""
+SQL query instrumentation.
+
+record_queries() records the statements run on the database connections
+within its block: their number, the total database time, the slowest
+statements and the statements repeated with different parameters (the N+1
+pattern). At the end of the block the summary is logged as JSON to the
+'database.profiling' logger, and kept for the query profile debug view.
+
+QueryProfilingMiddleware records every request, and the generate_dummy_data
+command records each of its phases. Both are opt-in with the QUERY_PROFILING
+setting.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# Number of slowest statements in a summary.
+DEFAULT_SLOWEST: int = 5
+
+# Number of summaries kept for the debug view.
+DEFAULT_HISTORY_SIZE: int = 50
+
+# Placeholder lists ('IN (%s, %s, ...)') and literals vary between otherwise
+# identical statements.
+_PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+recent_profiles: Deque[Dict[str, Any]] = deque(
+    maxlen=getattr(settings, "QUERY_PROFILING_HISTORY", DEFAULT_HISTORY_SIZE)
+)
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "QUERY_PROFILING", False)
+
+
+def normalize(sql: str) -> str:
+    """ The statement with its literals and placeholder lists collapsed. """
+    return _LITERAL.sub("?", _PLACEHOLDER_LIST.sub("%s...", sql))
+
+
+class RecordedQuery(NamedTuple):
+    sql: str
+    duration: float
+
+
+class QueryProfile:
+    """
+    Records the statements passing through it, as a database connection
+    execute wrapper.
+    """
+
+    def __init__(self, label: str) -> None:
+        self.label: str = label
+        self.queries: List[RecordedQuery] = []
+        self.elapsed: float = 0.0
+
+    def __call__(
+        self,
+        execute: Callable,
+        sql: str,
+        params: Any,
+        many: bool,
+        context: Dict[str, Any],
+    ) -> Any:
+        start: float = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                RecordedQuery(sql, time.perf_counter() - start)
+            )
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def db_time(self) -> float:
+        """ Total time spent in the database, in seconds. """
+        return sum(query.duration for query in self.queries)
+
+    def slowest(self, limit: int = DEFAULT_SLOWEST) -> List[RecordedQuery]:
+        return sorted(
+            self.queries, key=lambda query: query.duration, reverse=True
+        )[:limit]
+
+    def duplicates(self) -> List[Dict[str, Any]]:
+        """
+        The normalized statements that ran more than once, most frequent
+        first.
+        """
+        counts = Counter(normalize(query.sql) for query in self.queries)
+        return [
+            {"sql": sql, "count": count}
+            for sql, count in counts.most_common()
+            if count > 1
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        slowest: int = getattr(
+            settings, "QUERY_PROFILING_SLOWEST", DEFAULT_SLOWEST
+        )
+        return {
+            "label": self.label,
+            "queries": self.count,
+            "db_time_ms": round(self.db_time * 1000, 3),
+            "elapsed_ms": round(self.elapsed * 1000, 3),
+            "slowest": [
+                {"sql": query.sql, "time_ms": round(query.duration * 1000, 3)}
+                for query in self.slowest(slowest)
+            ],
+            "duplicates": self.duplicates(),
+        }
+
+
+@contextmanager
+def record_queries(label: str) -> Iterator[QueryProfile]:
+    """
+    Records the statements run on all database connections within the
+    block, and logs their summary when it ends.
+    """
+    profile = QueryProfile(label)
+    start: float = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            yield profile
+    finally:
+        profile.elapsed = time.perf_counter() - start
+        summary: Dict[str, Any] = profile.summary()
+        recent_profiles.append(summary)
+        logger.info(
+            json.dumps(summary, sort_keys=True),
+            extra={"query_profile": summary},
+        )
+
+
+@contextmanager
+def profile_phase(label: str) -> Iterator[None]:
+    """ record_queries(), when query profiling is enabled. """
+    if not is_enabled():
+        yield
+        return
+    with record_queries(label):
+        yield
+
+
+class QueryProfilingMiddleware:
+    """
+    Records the queries of each request, and reports them in a Server-Timing
+    header. Only active when the QUERY_PROFILING setting is on.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response: Callable = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        label: str = "{} {}".format(request.method, request.path)
+        with record_queries(label) as profile:
+            response: HttpResponse = self.get_response(request)
+        response["Server-Timing"] = 'db;dur={:.3f};desc="{} queries"'.format(
+            profile.db_time * 1000, profile.count
+        )
+        return response
@@ -0,0 +1,81 @@
+"""
+Removal of duplicated references and self-citations, which the constraints
+of Reference reject since migration 0011.
+
+Both the search and the removal are single set-based statements over the
+Reference table (a GROUP BY on the referrer and reference), so they stay
+usable on tables with tens of millions of rows. Of each duplicated pair,
+the reference with the lowest ID is kept. Only the citation counters of the
+sources involved are recomputed afterwards.
+"""
+from typing import NamedTuple, Set
+
+from django.db import connection, transaction
+
+from database import versions
+from database.bulk import MAX_IDS_PER_QUERY, chunked
+from database.citation_counts import recompute_citation_counts
+from database.models import Reference, Source
+
+
+_INVALID_PAIRS_SQL: str = """
+SELECT referrer_id, reference_id, COUNT(*)
+FROM {table}
+GROUP BY referrer_id, reference_id
+HAVING COUNT(*) > 1 OR referrer_id = reference_id
+"""
+
+# The derived table lets MySQL read the table it deletes from.
+_DELETE_SQL: str = """
+DELETE FROM {table}
+WHERE referrer_id = reference_id
+OR id NOT IN (
+    SELECT id FROM (
+        SELECT MIN(id) AS id FROM {table} GROUP BY referrer_id, reference_id
+    ) AS kept
+)
+"""
+
+
+class InvalidReferences(NamedTuple):
+    duplicates: int
+    self_citations: int
+    source_ids: Set[int]
+
+
+def find_invalid_references() -> InvalidReferences:
+    """
+    Counts the references that would be removed, and collects the IDs of
+    the sources whose counters would change.
+    """
+    duplicates: int = 0
+    self_citations: int = 0
+    source_ids: Set[int] = set()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _INVALID_PAIRS_SQL.format(table=Reference._meta.db_table)
+        )
+        for referrer_id, reference_id, count in cursor.fetchall():
+            if referrer_id == reference_id:
+                self_citations += count
+            else:
+                duplicates += count - 1
+            source_ids.update((referrer_id, reference_id))
+    return InvalidReferences(duplicates, self_citations, source_ids)
+
+
+def remove_invalid_references() -> InvalidReferences:
+    """
+    Deletes the duplicated references and self-citations, and updates the
+    counters of the sources involved. Returns what was removed.
+    """
+    with transaction.atomic():
+        invalid: InvalidReferences = find_invalid_references()
+        if not invalid.source_ids:
+            return invalid
+        with connection.cursor() as cursor:
+            cursor.execute(_DELETE_SQL.format(table=Reference._meta.db_table))
+        for chunk in chunked(invalid.source_ids, MAX_IDS_PER_QUERY):
+            recompute_citation_counts(Source.objects.filter(pk__in=chunk))
+        versions.bump(Reference)
+    return invalid
@@ -0,0 +1,146 @@
+"""
+Full-text search over the title, abstract and author names of sources.
+
+On SQLite the text is indexed in an FTS5 virtual table, keyed on the Source
+ID and ranked with bm25. The index is kept in sync by the signal receivers in
+database.signals, and can be rebuilt with the 'rebuild_search_index'
+command. Other database backends fall back to (unindexed) icontains lookups.
+"""
+import re
+from typing import Iterable, List, Optional, Union
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from database.bulk import MAX_IDS_PER_QUERY, chunked
+from database.models import Author, Source
+
+SEARCH_TABLE: str = "database_source_search"
+
+# Relative weight of the title, abstract and authors columns in the ranking.
+RANK_EXPRESSION: str = "bm25({}, 10.0, 1.0, 5.0)".format(SEARCH_TABLE)
+
+# Fills the index. Migration 0006 has a frozen copy of this statement.
+_INDEX_SQL: str = """
+INSERT INTO {search_table}(rowid, title, abstract, authors)
+SELECT
+    source.id,
+    source.title,
+    COALESCE(source.abstract, ''),
+    COALESCE(
+        (
+            SELECT group_concat(
+                COALESCE(author.first_name, '') || ' ' ||
+                COALESCE(author.middle_name, '') || ' ' ||
+                author.last_name,
+                ' '
+            )
+            FROM {authors_table} authorship
+            JOIN {author_table} author ON author.id = authorship.author_id
+            WHERE authorship.source_id = source.id
+        ),
+        ''
+    )
+FROM {source_table} source
+"""
+
+
+def is_supported() -> bool:
+    """ Whether the database backend has the FTS5 search index. """
+    return connection.vendor == "sqlite"
+
+
+def _index_sql() -> str:
+    return _INDEX_SQL.format(
+        search_table=SEARCH_TABLE,
+        authors_table=Source.authors.through._meta.db_table,
+        author_table=Author._meta.db_table,
+        source_table=Source._meta.db_table,
+    )
+
+
+def index_sources(source_ids: Iterable[int]) -> None:
+    """ (Re)indexes the given sources, and unindexes deleted ones. """
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        for chunk in chunked(set(source_ids), MAX_IDS_PER_QUERY):
+            placeholders: str = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                "DELETE FROM {} WHERE rowid IN ({})".format(
+                    SEARCH_TABLE, placeholders
+                ),
+                chunk,
+            )
+            cursor.execute(
+                _index_sql() + "WHERE source.id IN ({})".format(placeholders),
+                chunk,
+            )
+
+
+def rebuild_index() -> int:
+    """
+    Rebuilds the whole index with set-based SQL. Returns the number of
+    indexed sources.
+    """
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM {}".format(SEARCH_TABLE))
+        cursor.execute(_index_sql())
+        cursor.execute(
+            "INSERT INTO {0}({0}) VALUES ('optimize')".format(SEARCH_TABLE)
+        )
+        cursor.execute("SELECT COUNT(*) FROM {}".format(SEARCH_TABLE))
+        return cursor.fetchone()[0]
+
+
+def match_expression(terms: str) -> Optional[str]:
+    """
+    Turns user input into an FTS5 query matching sources that contain all
+    words, each as a prefix. Returns None when there is nothing to search.
+    """
+    words: List[str] = re.findall(r"\w+", terms)
+    if not words:
+        return None
+    return " ".join('"{}"*'.format(word) for word in words)
+
+
+def search(queryset: "QuerySet[Source]", terms: str) -> "QuerySet[Source]":
+    """
+    Filters the sources on the search terms, ordered by relevance. The
+    relevance is available as the 'search_rank' attribute (lower is better).
+    """
+    expression: Optional[str] = match_expression(terms)
+    if expression is None:
+        return queryset.none()
+    if not is_supported():
+        query = Q()
+        for word in re.findall(r"\w+", terms):
+            query &= Q(title__icontains=word) | Q(abstract__icontains=word)
+        return queryset.filter(query)
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            "{}.rowid = {}.id".format(SEARCH_TABLE, Source._meta.db_table),
+            "{} MATCH %s".format(SEARCH_TABLE),
+        ],
+        params=[expression],
+        select={"search_rank": RANK_EXPRESSION},
+        order_by=["search_rank"],
+    )
+
+
+def matching_source_ids(terms: str) -> Union[RawSQL, "QuerySet[Source]"]:
+    """
+    Subquery of the IDs of the sources matching the search terms, to filter
+    related models with '<source field>__in'.
+    """
+    expression: Optional[str] = match_expression(terms)
+    if expression is None or not is_supported():
+        return search(Source.objects.all(), terms).values("pk")
+    return RawSQL(
+        "SELECT rowid FROM {0} WHERE {0} MATCH %s".format(SEARCH_TABLE),
+        [expression],
+    )
@@ -0,0 +1,212 @@
+"""
+Signal receivers of the database app, connected in DatabaseConfig.ready().
+
+Reference has no delete receivers, so that deleting sources deletes their
+references with a single query: deletes of references update the citation
+counters in Reference.delete() and ReferenceQuerySet.delete(), and cascades
+from sources in the Source delete receivers below.
+"""
+import threading
+from typing import Any, Iterable, List, Optional, Set
+
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from database import citation_counts, citation_styles, search, versions
+from database.bulk import post_bulk_create
+from database.models import (
+    Author,
+    Evaluation,
+    Journal,
+    Publisher,
+    Reference,
+    Source,
+)
+
+
+@receiver(post_save, sender=Reference)
+@receiver(post_bulk_create, sender=Reference)
+@receiver(post_save, sender=Source)
+@receiver(post_delete, sender=Source)
+@receiver(post_bulk_create, sender=Source)
+@receiver(post_save, sender=Evaluation)
+@receiver(post_delete, sender=Evaluation)
+@receiver(post_bulk_create, sender=Evaluation)
+def bump_table_version(sender: Any, **kwargs: Any) -> None:
+    versions.bump(sender)
+
+
+@receiver(pre_save, sender=Reference)
+def remember_reference_endpoints(
+    sender: Any, instance: Reference, **kwargs: Any
+) -> None:
+    """ Stores the endpoints of an existing reference before it changes. """
+    instance._previous_endpoints = (
+        Reference.objects.filter(pk=instance.pk)
+        .values_list("referrer_id", "reference_id")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Reference)
+def count_saved_reference(
+    sender: Any, instance: Reference, created: bool, **kwargs: Any
+) -> None:
+    previous = getattr(instance, "_previous_endpoints", None)
+    current = (instance.referrer_id, instance.reference_id)
+    if previous == current:
+        return
+    if previous:
+        citation_counts.remove_references([previous[0]], [previous[1]])
+    citation_counts.add_references([current[0]], [current[1]])
+
+
+# Sources connected by the references of the sources being deleted, per
+# thread. Django sends pre_delete for all collected sources before deleting
+# anything, and post_delete after, so the counters are rebuilt once per
+# delete.
+_deleted_neighbours = threading.local()
+
+
+@receiver(pre_delete, sender=Source)
+def remember_neighbours_of_source(
+    sender: Any, instance: Source, **kwargs: Any
+) -> None:
+    neighbours: Set[int] = getattr(_deleted_neighbours, "source_ids", set())
+    for referrer_id, reference_id in Reference.objects.filter(
+        Q(referrer_id=instance.pk) | Q(reference_id=instance.pk)
+    ).values_list("referrer_id", "reference_id"):
+        neighbours.update((referrer_id, reference_id))
+    _deleted_neighbours.source_ids = neighbours
+
+
+@receiver(post_delete, sender=Source)
+def count_references_of_deleted_sources(
+    sender: Any, instance: Source, **kwargs: Any
+) -> None:
+    neighbours: Set[int] = getattr(_deleted_neighbours, "source_ids", set())
+    _deleted_neighbours.source_ids = set()
+    if neighbours:
+        citation_counts.references_deleted(neighbours)
+
+
+@receiver(post_bulk_create, sender=Reference)
+def count_bulk_created_references(
+    sender: Any, instances: List[Reference], **kwargs: Any
+) -> None:
+    citation_counts.add_references(
+        [instance.referrer_id for instance in instances],
+        [instance.reference_id for instance in instances],
+    )
+
+
+def sources_changed(source_ids: Iterable[int]) -> None:
+    """
+    Reindexes the given sources and replaces their cached bibliography
+    entries.
+    """
+    source_ids = list(source_ids)
+    search.index_sources(source_ids)
+    citation_styles.invalidate(source_ids)
+
+
+@receiver(post_save, sender=Source)
+@receiver(post_delete, sender=Source)
+def index_source(sender: Any, instance: Source, **kwargs: Any) -> None:
+    sources_changed([instance.pk])
+
+
+@receiver(post_bulk_create, sender=Source)
+def index_bulk_created_sources(
+    sender: Any, instances: List[Source], **kwargs: Any
+) -> None:
+    search.index_sources(instance.pk for instance in instances)
+
+
+@receiver(post_bulk_create, sender=Source.authors.through)
+def index_bulk_created_authorships(
+    sender: Any, instances: List[Any], **kwargs: Any
+) -> None:
+    sources_changed(instance.source_id for instance in instances)
+
+
+@receiver(m2m_changed, sender=Source.authors.through)
+def index_changed_authorships(
+    sender: Any,
+    instance: Any,
+    action: str,
+    reverse: bool,
+    pk_set: Optional[Set[int]],
+    **kwargs: Any
+) -> None:
+    """
+    Reindexes the sources whose authors changed. 'instance' is an Author
+    when the change was made through Author.sources ('reverse').
+    """
+    if action == "pre_clear" and reverse:
+        instance._cleared_source_ids = list(
+            instance.sources.values_list("pk", flat=True)
+        )
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if not reverse:
+            sources_changed([instance.pk])
+        elif action == "post_clear":
+            sources_changed(instance._cleared_source_ids)
+        else:
+            sources_changed(pk_set or [])
+
+
+@receiver(post_save, sender=Author)
+def index_sources_of_saved_author(
+    sender: Any, instance: Author, created: bool, **kwargs: Any
+) -> None:
+    if not created:
+        sources_changed(instance.sources.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Author)
+def remember_sources_of_author(
+    sender: Any, instance: Author, **kwargs: Any
+) -> None:
+    instance._source_ids = list(instance.sources.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Author)
+def index_sources_of_deleted_author(
+    sender: Any, instance: Author, **kwargs: Any
+) -> None:
+    sources_changed(getattr(instance, "_source_ids", []))
+
+
+@receiver(post_save, sender=Journal)
+def forget_entries_of_saved_journal(
+    sender: Any, instance: Journal, created: bool, **kwargs: Any
+) -> None:
+    if not created:
+        citation_styles.invalidate(
+            Source.objects.filter(source_journal=instance).values_list(
+                "pk", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=Publisher)
+def forget_entries_of_saved_publisher(
+    sender: Any, instance: Publisher, created: bool, **kwargs: Any
+) -> None:
+    if not created:
+        citation_styles.invalidate(
+            Source.objects.filter(
+                Q(source_publisher=instance)
+                | Q(source_journal__journal_publisher=instance)
+            ).values_list("pk", flat=True)
+        )
@@ -0,0 +1,275 @@
+"""
+Co-citation and bibliographic coupling strengths between sources.
+
+With A the (binary) citation matrix, the co-citation strength of two sources
+is the number of sources citing both (AᵀA), and their bibliographic coupling
+strength is the number of sources cited by both (AAᵀ). The products are
+computed in blocks of rows sized by their estimated number of entries, and
+only the strongest 'top_k' neighbours of each source are kept, so memory
+stays bounded on heavily cited hubs. The blocks can be spread over worker
+processes sharing the matrices, see database.parallel.
+"""
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max, QuerySet
+from django.utils import timezone
+from scipy import sparse
+
+from database.bulk import DEFAULT_BATCH_SIZE, MAX_IDS_PER_QUERY, chunked
+from database.matrix import CitationMatrix, read_edges
+from database.models import Reference, SimilarityComputation, SourceSimilarity
+from database.parallel import csr_arrays, map_blocks, shared_csr
+
+CO_CITATION: str = SourceSimilarity.CO_CITATION
+BIBLIOGRAPHIC_COUPLING: str = SourceSimilarity.BIBLIOGRAPHIC_COUPLING
+
+DEFAULT_TOP_K: int = 20
+DEFAULT_BLOCK_SIZE: int = 10000
+# Upper bound on the number of intermediate entries of a block product.
+MAX_BLOCK_ENTRIES: int = 5000000
+
+# (row indexes, column indexes, strengths)
+Triplets = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def binary_adjacency(
+    matrix: CitationMatrix, kind: str, max_shared_degree: Optional[int]
+) -> sparse.csr_matrix:
+    """
+    The citation matrix with duplicated references counted once. When
+    'max_shared_degree' is set, sources that would link more than that many
+    sources to each other are left out: for co-citation the sources citing
+    more than that many sources, for bibliographic coupling the sources cited
+    more than that many times.
+    """
+    adjacency: sparse.csr_matrix = matrix.csr.astype(np.int32)
+    adjacency.data[:] = 1
+    if max_shared_degree is None:
+        return adjacency
+    if kind == CO_CITATION:
+        keep: np.ndarray = matrix.out_degree() <= max_shared_degree
+        adjacency = sparse.diags(keep, dtype=np.int32) @ adjacency
+    else:
+        keep = matrix.in_degree() <= max_shared_degree
+        adjacency = adjacency @ sparse.diags(keep, dtype=np.int32)
+    adjacency = sparse.csr_matrix(adjacency)
+    adjacency.eliminate_zeros()
+    return adjacency
+
+
+def split_rows(
+    row_indexes: np.ndarray,
+    row_entries: np.ndarray,
+    block_size: int,
+    max_block_entries: int,
+) -> List[np.ndarray]:
+    """
+    Splits the row indexes into blocks of at most 'block_size' rows, and of
+    about 'max_block_entries' estimated product entries.
+    """
+    block_keys: np.ndarray = np.maximum(
+        np.cumsum(row_entries) // max_block_entries,
+        np.arange(len(row_indexes)) // block_size,
+    )
+    return np.split(row_indexes, np.flatnonzero(np.diff(block_keys)) + 1)
+
+
+def top_k(block: sparse.spmatrix, row_indexes: np.ndarray, k: int) -> Triplets:
+    """
+    Keeps the 'k' strongest entries of every row of 'block', which holds the
+    similarity rows of the sources at 'row_indexes'. The similarity of a
+    source with itself is dropped. Ties are broken on the lowest index.
+    """
+    block = sparse.csr_matrix(block)
+    block.sort_indices()
+    coo: sparse.coo_matrix = block.tocoo()
+    keep: np.ndarray = row_indexes[coo.row] != coo.col
+    local_rows, cols, data = coo.row[keep], coo.col[keep], coo.data[keep]
+    if len(data) == 0:
+        return local_rows, cols, data
+    # Sort on (row, descending strength); the stable sort keeps the columns
+    # of equally strong entries in ascending order.
+    sort_key: np.ndarray = local_rows.astype(np.int64) * (
+        int(data.max()) + 1
+    ) + (data.max() - data)
+    order: np.ndarray = np.argsort(sort_key, kind="stable")
+    local_rows, cols, data = local_rows[order], cols[order], data[order]
+    rank: np.ndarray = np.arange(len(local_rows)) - np.searchsorted(
+        local_rows, local_rows
+    )
+    keep = rank < k
+    return row_indexes[local_rows[keep]], cols[keep], data[keep]
+
+
+def similarity_rows(
+    matrix: CitationMatrix,
+    kind: str,
+    k: int = DEFAULT_TOP_K,
+    row_indexes: Optional[np.ndarray] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    max_shared_degree: Optional[int] = None,
+    workers: int = 1,
+) -> Iterator[Triplets]:
+    """
+    Yields the top-k similarity entries of the given matrix rows (all rows by
+    default), one block of rows at a time. The blocks are computed by
+    'workers' processes.
+    """
+    if kind not in (CO_CITATION, BIBLIOGRAPHIC_COUPLING):
+        raise ValueError("Unknown kind of similarity: {}".format(kind))
+    adjacency: sparse.csr_matrix = binary_adjacency(
+        matrix, kind, max_shared_degree
+    )
+    transposed: sparse.csr_matrix = adjacency.T.tocsr()
+    if kind == CO_CITATION:
+        left, right = transposed, adjacency
+    else:
+        left, right = adjacency, transposed
+    if row_indexes is None:
+        row_indexes = np.arange(matrix.shape[0])
+    row_entries: np.ndarray = (left @ np.diff(right.indptr))[row_indexes]
+    yield from map_blocks(
+        _block_top_k,
+        split_rows(row_indexes, row_entries, block_size, MAX_BLOCK_ENTRIES),
+        {**csr_arrays("left", left), **csr_arrays("right", right)},
+        workers,
+        k,
+    )
+
+
+def _block_top_k(block_indexes: np.ndarray, k: int) -> Triplets:
+    """ The top-k similarities of a block of rows, see map_blocks(). """
+    return top_k(
+        shared_csr("left")[block_indexes] @ shared_csr("right"),
+        block_indexes,
+        k,
+    )
+
+
+def touched_rows(
+    matrix: CitationMatrix, kind: str, edges: np.ndarray
+) -> np.ndarray:
+    """
+    Returns the matrix rows whose similarities may have changed because of
+    the given (new) references.
+    """
+    if len(edges) == 0:
+        return np.empty(0, dtype=np.int64)
+    referrers: np.ndarray = np.unique(matrix.index_of(edges[:, 0]))
+    references: np.ndarray = np.unique(matrix.index_of(edges[:, 1]))
+    if kind == CO_CITATION:
+        # The new reference pairs its target with everything else its
+        # referrer cites.
+        related: np.ndarray = matrix.csr[referrers].indices
+        return np.union1d(references, related)
+    # The new reference pairs its referrer with everything else citing its
+    # target.
+    related = matrix.csc[:, references].indices
+    return np.union1d(referrers, related)
+
+
+def store_similarities(
+    matrix: CitationMatrix,
+    kind: str,
+    triplets: Iterator[Triplets],
+    row_indexes: Optional[np.ndarray] = None,
+) -> int:
+    """
+    Replaces the stored similarities of the given rows (all rows by default)
+    with 'triplets'. Returns the number of stored rows.
+    """
+    existing: "QuerySet[SourceSimilarity]" = SourceSimilarity.objects.filter(
+        kind=kind
+    )
+    if row_indexes is None:
+        existing.delete()
+    else:
+        source_ids = matrix.ids_of(row_indexes).tolist()
+        for chunk in chunked(source_ids, MAX_IDS_PER_QUERY):
+            existing.filter(source_id__in=chunk).delete()
+    stored: int = 0
+    for rows, cols, data in triplets:
+        objects = (
+            SourceSimilarity(
+                kind=kind,
+                source_id=source_id,
+                neighbour_id=neighbour_id,
+                strength=strength,
+            )
+            for source_id, neighbour_id, strength in zip(
+                matrix.ids_of(rows).tolist(),
+                matrix.ids_of(cols).tolist(),
+                data.tolist(),
+            )
+        )
+        for batch in chunked(objects, DEFAULT_BATCH_SIZE):
+            SourceSimilarity.objects.bulk_create(batch)
+            stored += len(batch)
+    return stored
+
+
+def compute_similarities(
+    kind: str,
+    k: int = DEFAULT_TOP_K,
+    full: bool = False,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    max_shared_degree: Optional[int] = None,
+    workers: int = 1,
+) -> int:
+    """
+    Computes and stores the top-k similarities of the given kind, with
+    'workers' processes. Unless 'full' is set, and the previous computation
+    used the same settings, only the sources touched by references created
+    since that computation are refreshed. Deleted references are only
+    accounted for by a full run. Returns the number of stored rows.
+    """
+    last_reference_id: int = (
+        Reference.objects.aggregate(last=Max("pk"))["last"] or 0
+    )
+    previous: Optional[
+        SimilarityComputation
+    ] = SimilarityComputation.objects.filter(kind=kind).first()
+    matrix: CitationMatrix = CitationMatrix.from_database(
+        references=Reference.objects.filter(pk__lte=last_reference_id)
+    )
+    row_indexes: Optional[np.ndarray] = None
+    if (
+        previous
+        and previous.top_k == k
+        and previous.max_shared_degree == max_shared_degree
+        and not full
+    ):
+        new_edges: np.ndarray = read_edges(
+            Reference.objects.filter(
+                pk__gt=previous.last_reference_id, pk__lte=last_reference_id
+            )
+        )
+        row_indexes = touched_rows(matrix, kind, new_edges)
+
+    with transaction.atomic():
+        stored: int = store_similarities(
+            matrix,
+            kind,
+            similarity_rows(
+                matrix,
+                kind,
+                k,
+                row_indexes,
+                block_size,
+                max_shared_degree,
+                workers,
+            ),
+            row_indexes,
+        )
+        SimilarityComputation.objects.update_or_create(
+            kind=kind,
+            defaults={
+                "top_k": k,
+                "max_shared_degree": max_shared_degree,
+                "last_reference_id": last_reference_id,
+                "computed_at": timezone.now(),
+            },
+        )
+    return stored
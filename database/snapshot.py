@@ -0,0 +1,315 @@
+"""
+Binary snapshot of the citation graph, to be memory-mapped read-only.
+
+A snapshot file holds a small header followed by flat little-endian arrays,
+each aligned to ALIGNMENT bytes:
+
+- source_ids (int32): the sorted Source IDs, whose positions are the matrix
+  indexes used by the other arrays;
+- years (int16), types (int16, positions in the header's 'types') and
+  journal_ids (int32, -1 for books): the attributes of the sources;
+- indptr and indices (int32): the citations in CSR form, where source i
+  cites the sources indices[indptr[i]:indptr[i + 1]];
+- cited_indptr and cited_indices (int32): the same citations in CSC form,
+  where source i is cited by cited_indices[cited_indptr[i]:...].
+
+The header is MAGIC, the format version and the length of a JSON document
+with the layout of the arrays, and the state of the database the snapshot
+was taken at: its NAME, its generation and the versions of the Source and
+Reference tables (see database.versions). A snapshot is only current for
+the same database in the same state, not for a reset or different database
+whose versions happen to be equal.
+
+Loading a snapshot maps the file instead of reading it, so it takes
+milliseconds, and all processes loading the same file share its pages
+through the page cache. Snapshots are written to a temporary file that
+replaces the previous one, so processes that mapped the previous snapshot
+keep a consistent view.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from scipy import sparse
+
+from database.matrix import CitationMatrix, read_edges, read_source_ids
+from database.models import Reference, Source
+from database.versions import get_generation_and_versions
+
+MAGIC: bytes = b"CITGRAPH"
+FORMAT_VERSION: int = 1
+
+# Magic, format version and length of the JSON header.
+HEADER = struct.Struct("<8sII")
+
+# Alignment of the arrays within the file.
+ALIGNMENT: int = 64
+
+NO_JOURNAL: int = -1
+
+# Name and dtype of the arrays, in file order.
+ARRAYS: Tuple[Tuple[str, str], ...] = (
+    ("source_ids", "<i4"),
+    ("years", "<i2"),
+    ("types", "<i2"),
+    ("journal_ids", "<i4"),
+    ("indptr", "<i4"),
+    ("indices", "<i4"),
+    ("cited_indptr", "<i4"),
+    ("cited_indices", "<i4"),
+)
+
+Versions = Tuple[int, ...]
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def current_versions() -> Versions:
+    """
+    The generation of the database and the versions of the Source and
+    Reference tables.
+    """
+    generation, versions = get_generation_and_versions(Source, Reference)
+    return (generation,) + versions
+
+
+def database_name() -> str:
+    return str(connection.settings_dict["NAME"])
+
+
+def _checked(name: str, values: np.ndarray, dtype: str) -> np.ndarray:
+    """ The values converted to 'dtype', which must hold them all. """
+    limits = np.iinfo(np.dtype(dtype))
+    if len(values) and (
+        values.min() < limits.min or values.max() > limits.max
+    ):
+        raise SnapshotError(
+            "The {} don't fit in {} bits".format(name, limits.bits)
+        )
+    return values.astype(dtype)
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def read_arrays() -> Tuple[Dict[str, np.ndarray], List[str], Versions]:
+    """
+    Reads the arrays of a snapshot from the database, with the type codes
+    and the table versions they correspond to.
+    """
+    types: List[str] = [code for code, label in Source.TYPE_CHOICES]
+    with transaction.atomic():
+        versions: Versions = current_versions()
+        matrix: CitationMatrix = CitationMatrix(
+            read_source_ids(), read_edges()
+        )
+        attributes: List[Tuple[int, str, int]] = list(
+            Source.objects.order_by("pk")
+            .annotate(journal=Coalesce("source_journal_id", Value(NO_JOURNAL)))
+            .values_list("year_of_publication", "type", "journal")
+            .iterator()
+        )
+    years, type_codes, journal_ids = (
+        zip(*attributes) if attributes else ((), (), ())
+    )
+    arrays: Dict[str, np.ndarray] = {
+        "source_ids": matrix.source_ids,
+        "years": np.array(years, dtype=np.int64),
+        "types": np.array(
+            [types.index(code) for code in type_codes], dtype=np.int64
+        ),
+        "journal_ids": np.array(journal_ids, dtype=np.int64),
+        "indptr": matrix.csr.indptr,
+        "indices": matrix.csr.indices,
+        "cited_indptr": matrix.csc.indptr,
+        "cited_indices": matrix.csc.indices,
+    }
+    return (
+        {
+            name: _checked(name, np.asarray(arrays[name]), dtype)
+            for name, dtype in ARRAYS
+        },
+        types,
+        versions,
+    )
+
+
+def write_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Writes a snapshot of the current graph to 'path', replacing any
+    previous snapshot. Returns its header.
+    """
+    arrays, types, versions = read_arrays()
+    layout: Dict[str, List[Any]] = {}
+    offset: int = 0
+    for name, dtype in ARRAYS:
+        offset += _padding(offset)
+        layout[name] = [dtype, len(arrays[name]), offset]
+        offset += arrays[name].nbytes
+    header: Dict[str, Any] = {
+        "sources": len(arrays["source_ids"]),
+        "citations": len(arrays["indices"]),
+        "types": types,
+        "database": database_name(),
+        "versions": list(versions),
+        "arrays": layout,
+    }
+    encoded: bytes = json.dumps(header).encode("utf-8")
+    start: int = HEADER.size + len(encoded)
+    start += _padding(start)
+
+    directory: str = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+            file.write(encoded)
+            for name, dtype in ARRAYS:
+                file.seek(start + layout[name][2])
+                file.write(arrays[name].tobytes())
+            file.truncate(start + offset)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return header
+
+
+class GraphSnapshot:
+    """
+    A snapshot file mapped read-only. The arrays are views of the mapping,
+    see the module docstring.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        with open(path, "rb") as file:
+            self.mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mapping) < HEADER.size:
+            raise SnapshotError("{} is not a graph snapshot".format(path))
+        magic, version, length = HEADER.unpack_from(self.mapping)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise SnapshotError(
+                "{} is not a version {} graph snapshot".format(
+                    path, FORMAT_VERSION
+                )
+            )
+        self.mapping.seek(HEADER.size)
+        self.header: Dict[str, Any] = json.loads(self.mapping.read(length))
+        start: int = HEADER.size + length
+        start += _padding(start)
+        self.arrays: Dict[str, np.ndarray] = {
+            name: np.frombuffer(
+                self.mapping, dtype=dtype, count=count, offset=start + offset
+            )
+            for name, (dtype, count, offset) in self.header["arrays"].items()
+        }
+
+    @property
+    def versions(self) -> Versions:
+        """
+        The generation of the database and the versions of the Source and
+        Reference tables, see current_versions().
+        """
+        return tuple(self.header["versions"])
+
+    @property
+    def database(self) -> Optional[str]:
+        """ The NAME of the database the snapshot was taken from. """
+        return self.header.get("database")
+
+    @property
+    def types(self) -> np.ndarray:
+        """ The type code of each source. """
+        return np.array(self.header["types"])[self.arrays["types"]]
+
+    def index_of(self, source_id: int) -> int:
+        """ The matrix index of a source. Raises KeyError if unknown. """
+        source_ids: np.ndarray = self.arrays["source_ids"]
+        index: int = int(np.searchsorted(source_ids, source_id))
+        if index == len(source_ids) or source_ids[index] != source_id:
+            raise KeyError(source_id)
+        return index
+
+    def _neighbours(self, source_id: int, kind: str) -> np.ndarray:
+        index: int = self.index_of(source_id)
+        indptr: np.ndarray = self.arrays[kind + "indptr"]
+        start, end = indptr[index], indptr[index + 1]
+        return self.arrays["source_ids"][
+            self.arrays[kind + "indices"][start:end]
+        ]
+
+    def cites(self, source_id: int) -> np.ndarray:
+        """ The IDs of the sources cited by a source. """
+        return self._neighbours(source_id, "")
+
+    def cited_by(self, source_id: int) -> np.ndarray:
+        """ The IDs of the sources citing a source. """
+        return self._neighbours(source_id, "cited_")
+
+    def citation_matrix(self) -> CitationMatrix:
+        """
+        A CitationMatrix over the snapshot. Its index arrays are views of the
+        mapping, only the source IDs and the matrix values are copied.
+        """
+        size: int = len(self.arrays["source_ids"])
+        ones: np.ndarray = np.ones(len(self.arrays["indices"]), np.int32)
+        return CitationMatrix.from_compressed(
+            self.arrays["source_ids"].astype(np.int64),
+            sparse.csr_matrix(
+                (ones, self.arrays["indices"], self.arrays["indptr"]),
+                shape=(size, size),
+                copy=False,
+            ),
+            sparse.csc_matrix(
+                (
+                    ones,
+                    self.arrays["cited_indices"],
+                    self.arrays["cited_indptr"],
+                ),
+                shape=(size, size),
+                copy=False,
+            ),
+        )
+
+
+_loaded: Optional[Tuple[str, float, GraphSnapshot]] = None
+
+
+def load_snapshot(path: str) -> GraphSnapshot:
+    """
+    The snapshot at 'path', mapped again only when the file was replaced.
+    """
+    global _loaded
+    modified: float = os.stat(path).st_mtime
+    if _loaded is None or _loaded[:2] != (path, modified):
+        _loaded = (path, modified, GraphSnapshot(path))
+    return _loaded[2]
+
+
+def current_matrix(versions: Versions) -> Optional[CitationMatrix]:
+    """
+    The matrix of the snapshot of settings.GRAPH_SNAPSHOT_PATH, if it is
+    set and the snapshot was taken from this database at the given versions
+    (see current_versions()).
+    """
+    path: Optional[str] = settings.GRAPH_SNAPSHOT_PATH
+    if not path or not os.path.exists(path):
+        return None
+    snapshot: GraphSnapshot = load_snapshot(path)
+    if snapshot.database != database_name() or snapshot.versions != tuple(
+        versions
+    ):
+        return None
+    return snapshot.citation_matrix()
@@ -0,0 +1,251 @@
+"""
+Streamed downloads of large results: all citations, the citations between
+filtered sources, and the bibliography of filtered sources.
+
+An Export reads its rows in pages: each page is a short keyset query (rows
+after the last primary key of the previous page), so no cursor or
+transaction stays open between pages, and neither the rows nor the payload
+are ever held in memory as a whole.
+
+The exports are served two ways:
+
+- by the synchronous views of this module, through the WSGI entry point.
+  The server pulls the chunks, so slow clients slow down the reads, but the
+  worker is busy for the whole download;
+- by the async ASGI application of database.async_streaming, which runs
+  each page query in a thread pool and awaits the client in between, so a
+  download only occupies a thread while a page is read.
+
+When a client disconnects, the remaining pages are not read, and the
+cancellation is logged.
+"""
+import logging
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from django.db.models import QuerySet
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    QueryDict,
+    StreamingHttpResponse,
+)
+from django.views.decorators.http import require_safe
+
+from database import citation_styles
+from database.api import filter_sources
+from database.bulk import MAX_IDS_PER_QUERY
+from database.models import Reference, Source
+
+logger = logging.getLogger(__name__)
+
+# Size of the chunks handed to the server: large enough to keep the number
+# of writes low, small enough to fit the socket buffers.
+CHUNK_BYTES: int = 64 * 1024
+
+# Number of references read per page (about CHUNK_BYTES of CSV).
+PAGE_ROWS: int = 5000
+
+CSV_CONTENT_TYPE: str = "text/csv; charset=utf-8"
+TEXT_CONTENT_TYPE: str = "text/plain; charset=utf-8"
+
+# Reads the lines of the rows after a primary key. Returns the lines, and
+# the key to read the next page after (None after the last page).
+Page = Callable[[int], Tuple[List[str], Optional[int]]]
+
+
+class ExportError(ValueError):
+    pass
+
+
+class Export(NamedTuple):
+    """ A streamed download. """
+
+    name: str
+    content_type: str
+    header: List[str]
+    page: Page
+
+
+def encode_chunks(
+    lines: Iterable[str], chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[bytes]:
+    """ Joins the encoded lines into chunks of at least 'chunk_bytes'. """
+    buffer: List[bytes] = []
+    size: int = 0
+    for line in lines:
+        data: bytes = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= chunk_bytes:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def export_lines(export: Export) -> Iterator[str]:
+    """ All lines of an export, reading a page at a time. """
+    yield from export.header
+    after: Optional[int] = 0
+    while after is not None:
+        lines, after = export.page(after)
+        yield from lines
+
+
+def log_cancelled(export: Export, sent: int) -> None:
+    logger.info("Streaming of %s cancelled after %d bytes", export.name, sent)
+
+
+def _edge_page(references: QuerySet) -> Page:
+    def page(after: int) -> Tuple[List[str], Optional[int]]:
+        rows: List[Tuple[int, int, int]] = list(
+            references.filter(pk__gt=after)
+            .order_by("pk")
+            .values_list("pk", "referrer_id", "reference_id")[:PAGE_ROWS]
+        )
+        return (
+            [
+                "{},{}\n".format(referrer_id, reference_id)
+                for pk, referrer_id, reference_id in rows
+            ],
+            rows[-1][0] if len(rows) == PAGE_ROWS else None,
+        )
+
+    return page
+
+
+def _filtered_sources(params: QueryDict) -> QuerySet:
+    try:
+        return filter_sources(params)
+    except ValueError:
+        raise ExportError("Filters must be integers")
+
+
+def edges_export(params: QueryDict) -> Export:
+    """ All citations, as a CSV file of (referrer_id, reference_id). """
+    return Export(
+        "citations.csv",
+        CSV_CONTENT_TYPE,
+        ["referrer_id,reference_id\n"],
+        _edge_page(Reference.objects.all()),
+    )
+
+
+def matrix_export(params: QueryDict) -> Export:
+    """
+    The citations between the sources matching the filters of the query
+    string (see database.api.filter_sources), as a CSV file of
+    (referrer_id, reference_id). Unlike the sub-matrix API, the number of
+    sources isn't limited.
+    """
+    source_ids: QuerySet = _filtered_sources(params).values("pk")
+    return Export(
+        "sub_matrix.csv",
+        CSV_CONTENT_TYPE,
+        ["referrer_id,reference_id\n"],
+        _edge_page(
+            Reference.objects.filter(
+                referrer_id__in=source_ids, reference_id__in=source_ids
+            )
+        ),
+    )
+
+
+def bibliography_export(params: QueryDict) -> Export:
+    """
+    The bibliography of the sources matching the filters of the query
+    string, one entry per line, in the citation style given by 'style'
+    (APA by default).
+    """
+    style: str = params.get("style", citation_styles.APA)
+    if style not in citation_styles.STYLES:
+        raise ExportError("Unknown style '{}'".format(style))
+    sources: QuerySet = _filtered_sources(params)
+    page_size: int = MAX_IDS_PER_QUERY
+
+    def page(after: int) -> Tuple[List[str], Optional[int]]:
+        source_ids: List[int] = list(
+            sources.filter(pk__gt=after)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:page_size]
+        )
+        entries = citation_styles.render(
+            Source.objects.filter(pk__in=source_ids).order_by("pk"), style
+        )
+        return (
+            [
+                entries[source_id] + "\n"
+                for source_id in source_ids
+                if source_id in entries
+            ],
+            source_ids[-1] if len(source_ids) == page_size else None,
+        )
+
+    return Export("bibliography.txt", TEXT_CONTENT_TYPE, [], page)
+
+
+def stream_response(export: Export) -> StreamingHttpResponse:
+    """ Streams an export as an attachment. """
+
+    def content() -> Iterator[bytes]:
+        sent: int = 0
+        finished: bool = False
+        try:
+            for chunk in encode_chunks(export_lines(export), CHUNK_BYTES):
+                sent += len(chunk)
+                yield chunk
+            finished = True
+        finally:
+            if not finished:
+                log_cancelled(export, sent)
+
+    response = StreamingHttpResponse(
+        content(), content_type=export.content_type
+    )
+    response["Content-Disposition"] = 'attachment; filename="{}"'.format(
+        export.name
+    )
+    return response
+
+
+def _respond(
+    request: HttpRequest, export: Callable[[QueryDict], Export]
+) -> HttpResponse:
+    try:
+        return stream_response(export(request.GET))
+    except ExportError as error:
+        return HttpResponse(
+            str(error), status=400, content_type=TEXT_CONTENT_TYPE
+        )
+
+
+@require_safe
+def stream_edges(request: HttpRequest) -> HttpResponse:
+    return _respond(request, edges_export)
+
+
+@require_safe
+def stream_matrix(request: HttpRequest) -> HttpResponse:
+    return _respond(request, matrix_export)
+
+
+@require_safe
+def stream_bibliography(request: HttpRequest) -> HttpResponse:
+    return _respond(request, bibliography_export)
+
+
+# The export of each streaming view, by URL name.
+EXPORTS = {
+    "stream_edges": edges_export,
+    "stream_matrix": matrix_export,
+    "stream_bibliography": bibliography_export,
+}
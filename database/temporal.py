@@ -0,0 +1,327 @@
+"""
+Citation activity over time, by year of publication. A citation happens in
+the year its citing source was published, and its age is the difference
+with the year of the cited source. The results are stored in materialized
+tables:
+
+- YearCitationFlow: the year x year matrix of citation counts;
+- SourceYearCitations: the citations each source received per year;
+- JournalYearMetrics: the classic two-year impact factor (citations made in
+  a year to a journal's sources of the two prior years, divided by the
+  number of those sources) and the cited and citing half-life (median age
+  of the journal's sources cited in a year, and of the sources its sources
+  of that year cite).
+
+Everything is computed with vectorized passes over the edge list, mapped to
+arrays with the year and journal of every source, instead of aggregations
+per year. Unless a full run is requested, only the years touched since the
+previous computation are recomputed: the citing years of new references, and
+the two years after the publication of new sources (which change impact
+factor denominators). Deleted references and edited years are only
+accounted for by a full run.
+"""
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, NamedTuple, Optional, Set, Tuple, Type
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max, Model, QuerySet, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from database.bulk import DEFAULT_BATCH_SIZE, chunked
+from database.matrix import FETCH_CHUNK_SIZE, read_edges
+from database.models import (
+    JournalYearMetrics,
+    Reference,
+    Source,
+    SourceYearCitations,
+    TemporalComputation,
+    YearCitationFlow,
+)
+
+# Journal of the sources that are not published in a journal (books).
+NO_JOURNAL: int = -1
+
+# Ages of the citations counted by the impact factor.
+IMPACT_WINDOW: Tuple[int, ...] = (1, 2)
+
+# Number of touched years above which all years are recomputed: an
+# incremental run would then read most references anyway. Also keeps the
+# years within an 'IN (...)' clause.
+MAX_INCREMENTAL_YEARS: int = 200
+
+
+class SourceArrays(NamedTuple):
+    """ The sorted Source IDs with the year and journal of each source. """
+
+    ids: np.ndarray
+    years: np.ndarray
+    journals: np.ndarray
+
+
+class Citations(NamedTuple):
+    """ Citations as aligned arrays of source attributes. """
+
+    citing_years: np.ndarray
+    cited_years: np.ndarray
+    citing_journals: np.ndarray
+    cited_journals: np.ndarray
+    cited_ids: np.ndarray
+
+
+def read_sources() -> SourceArrays:
+    rows = (
+        Source.objects.order_by("pk")
+        .annotate(journal=Coalesce("source_journal_id", Value(NO_JOURNAL)))
+        .values_list("pk", "year_of_publication", "journal")
+    )
+    flat: np.ndarray = np.fromiter(
+        chain.from_iterable(rows.iterator(chunk_size=FETCH_CHUNK_SIZE)),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    return SourceArrays(flat[:, 0], flat[:, 1], flat[:, 2])
+
+
+def citations(sources: SourceArrays, edges: np.ndarray) -> Citations:
+    """
+    Maps the (referrer_id, reference_id) edges to source attributes, leaving
+    out the edges of sources missing from 'sources'.
+    """
+    edges = edges[
+        np.isin(edges[:, 0], sources.ids) & np.isin(edges[:, 1], sources.ids)
+    ]
+    citing: np.ndarray = np.searchsorted(sources.ids, edges[:, 0])
+    cited: np.ndarray = np.searchsorted(sources.ids, edges[:, 1])
+    return Citations(
+        citing_years=sources.years[citing],
+        cited_years=sources.years[cited],
+        citing_journals=sources.journals[citing],
+        cited_journals=sources.journals[cited],
+        cited_ids=sources.ids[cited],
+    )
+
+
+def count_pairs(
+    first: np.ndarray, second: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """ The distinct (first, second) pairs as an (n, 2) array, and counts. """
+    if not len(first):
+        return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.unique(
+        np.column_stack([first, second]), axis=0, return_counts=True
+    )
+
+
+def group_medians(
+    first: np.ndarray, second: np.ndarray, values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The distinct (first, second) pairs, and the median of the values of
+    each pair, with a single sort.
+    """
+    if not len(values):
+        return np.empty((0, 2), dtype=np.int64), np.empty(0)
+    order: np.ndarray = np.lexsort((values, second, first))
+    keys: np.ndarray = np.column_stack([first[order], second[order]])
+    values = values[order]
+    pairs, starts, counts = np.unique(
+        keys, axis=0, return_index=True, return_counts=True
+    )
+    medians: np.ndarray = (
+        values[starts + (counts - 1) // 2] + values[starts + counts // 2]
+    ) / 2
+    return pairs, medians
+
+
+def journal_metrics(
+    sources: SourceArrays, cited: Citations
+) -> Dict[Tuple[int, int], Dict[str, float]]:
+    """
+    The JournalYearMetrics fields by (journal ID, year), for the journals
+    and years with citable items or citations.
+    """
+    metrics: Dict[Tuple[int, int], Dict[str, float]] = {}
+
+    def merge(pairs: np.ndarray, values: np.ndarray, field: str) -> None:
+        for (journal, year), value in zip(pairs.tolist(), values.tolist()):
+            metrics.setdefault(
+                (journal, year), {"citable_items": 0, "impact_citations": 0},
+            )[field] = value
+
+    in_journal: np.ndarray = sources.journals != NO_JOURNAL
+    items, item_counts = count_pairs(
+        sources.journals[in_journal], sources.years[in_journal]
+    )
+    window: int = len(IMPACT_WINDOW)
+    citable, inverse = np.unique(
+        np.concatenate(
+            [items + np.array([0, offset]) for offset in IMPACT_WINDOW]
+        ),
+        axis=0,
+        return_inverse=True,
+    )
+    merge(
+        citable,
+        np.bincount(
+            inverse.ravel(),
+            weights=np.tile(item_counts, window),
+            minlength=len(citable),
+        ).astype(np.int64),
+        "citable_items",
+    )
+
+    ages: np.ndarray = cited.citing_years - cited.cited_years
+    to_journal: np.ndarray = cited.cited_journals != NO_JOURNAL
+    impact: np.ndarray = to_journal & np.isin(ages, IMPACT_WINDOW)
+    merge(
+        *count_pairs(cited.cited_journals[impact], cited.citing_years[impact]),
+        "impact_citations",
+    )
+    merge(
+        *group_medians(
+            cited.cited_journals[to_journal],
+            cited.citing_years[to_journal],
+            ages[to_journal],
+        ),
+        "cited_half_life",
+    )
+    from_journal: np.ndarray = cited.citing_journals != NO_JOURNAL
+    merge(
+        *group_medians(
+            cited.citing_journals[from_journal],
+            cited.citing_years[from_journal],
+            ages[from_journal],
+        ),
+        "citing_half_life",
+    )
+    for fields in metrics.values():
+        fields["impact_factor"] = (
+            fields["impact_citations"] / fields["citable_items"]
+            if fields["citable_items"]
+            else None
+        )
+    return metrics
+
+
+def touched_years(
+    sources: SourceArrays,
+    previous: TemporalComputation,
+    last_reference_id: int,
+) -> np.ndarray:
+    """
+    The years whose metrics may have changed since the previous
+    computation.
+    """
+    new_edges: np.ndarray = read_edges(
+        Reference.objects.filter(
+            pk__gt=previous.last_reference_id, pk__lte=last_reference_id
+        )
+    )
+    new_years: np.ndarray = sources.years[
+        sources.ids > previous.last_source_id
+    ]
+    return np.unique(
+        np.concatenate(
+            [citations(sources, new_edges).citing_years]
+            + [new_years + offset for offset in IMPACT_WINDOW]
+        )
+    )
+
+
+def _store(
+    model: Type[Model], existing: QuerySet, objects: Iterable[Model],
+) -> int:
+    existing.delete()
+    stored: int = 0
+    for batch in chunked(objects, DEFAULT_BATCH_SIZE):
+        model.objects.bulk_create(batch)
+        stored += len(batch)
+    return stored
+
+
+def compute_temporal_metrics(full: bool = False) -> Counter:
+    """
+    Computes and stores the temporal metrics of the touched years (of all
+    years when 'full' is set, or on the first run). Returns the number of
+    recomputed years and of stored rows per table.
+    """
+    stats: Counter = Counter()
+    with transaction.atomic():
+        last_reference_id: int = (
+            Reference.objects.aggregate(last=Max("pk"))["last"] or 0
+        )
+        sources: SourceArrays = read_sources()
+        previous: Optional[TemporalComputation] = (
+            TemporalComputation.objects.first()
+        )
+        references = Reference.objects.filter(pk__lte=last_reference_id)
+        years: Optional[np.ndarray] = None
+        if previous and not full:
+            years = touched_years(sources, previous, last_reference_id)
+            if len(years) > MAX_INCREMENTAL_YEARS:
+                years = None
+            else:
+                references = references.filter(
+                    referrer__year_of_publication__in=years.tolist()
+                )
+        cited: Citations = citations(sources, read_edges(references))
+        recomputed: Set[int] = (
+            set() if years is None else set(years.tolist())
+        )
+
+        def in_years(model: Type[Model], field: str) -> QuerySet:
+            if years is None:
+                return model.objects.all()
+            return model.objects.filter(**{field + "__in": years.tolist()})
+
+        flows, flow_counts = count_pairs(cited.citing_years, cited.cited_years)
+        stats["flows"] = _store(
+            YearCitationFlow,
+            in_years(YearCitationFlow, "citing_year"),
+            (
+                YearCitationFlow(
+                    citing_year=citing_year,
+                    cited_year=cited_year,
+                    citations=count,
+                )
+                for (citing_year, cited_year), count in zip(
+                    flows.tolist(), flow_counts.tolist()
+                )
+            ),
+        )
+        received, received_counts = count_pairs(
+            cited.cited_ids, cited.citing_years
+        )
+        stats["sources"] = _store(
+            SourceYearCitations,
+            in_years(SourceYearCitations, "year"),
+            (
+                SourceYearCitations(
+                    source_id=source_id, year=year, citations=count
+                )
+                for (source_id, year), count in zip(
+                    received.tolist(), received_counts.tolist()
+                )
+            ),
+        )
+        metrics = journal_metrics(sources, cited)
+        stats["journals"] = _store(
+            JournalYearMetrics,
+            in_years(JournalYearMetrics, "year"),
+            (
+                JournalYearMetrics(journal_id=journal_id, year=year, **fields)
+                for (journal_id, year), fields in sorted(metrics.items())
+                if years is None or year in recomputed
+            ),
+        )
+        computation: TemporalComputation = previous or TemporalComputation()
+        computation.last_reference_id = last_reference_id
+        computation.last_source_id = int(sources.ids.max(initial=0))
+        computation.computed_at = timezone.now()
+        computation.save()
+    stats["years"] = (
+        len(recomputed) if years is not None else len(np.unique(sources.years))
+    )
+    return stats
@@ -0,0 +1,85 @@
+from typing import List
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from database.factories import (
+    AuthorFactory,
+    EvaluationFactory,
+    JournalFactory,
+    PublisherFactory,
+    ReferenceFactory,
+    SourceFactory,
+    UserFactory,
+)
+from database.models import Source, User
+
+CHANGELISTS: List[str] = [
+    "admin:database_author_changelist",
+    "admin:database_publisher_changelist",
+    "admin:database_journal_changelist",
+    "admin:database_source_changelist",
+    "admin:database_reference_changelist",
+    "admin:database_evaluation_changelist",
+]
+
+
+class TestAdminChangelists(TestCase):
+    def setUp(self) -> None:
+        self.superuser: User = UserFactory(is_super=True)
+        self.client.force_login(self.superuser)
+
+    def create_rows(self, amount: int) -> None:
+        for x in range(amount):
+            author = AuthorFactory()
+            book: Source = SourceFactory(book=True, authors=[author])
+            article: Source = SourceFactory(
+                article=True,
+                authors=[author],
+                source_journal=JournalFactory(
+                    journal_publisher=PublisherFactory()
+                ),
+            )
+            ReferenceFactory(referrer=article, reference=book)
+            EvaluationFactory(source=article, user=self.superuser)
+
+    def count_queries(self, url_name: str, **params: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_constant_number_of_queries(self) -> None:
+        """
+        Verify that the number of queries of each changelist doesn't depend
+        on the number of rows.
+        """
+        self.create_rows(2)
+        few_rows = {name: self.count_queries(name) for name in CHANGELISTS}
+        self.create_rows(10)
+        for name in CHANGELISTS:
+            self.assertEqual(self.count_queries(name), few_rows[name], name)
+
+    def test_input_filters(self) -> None:
+        author = AuthorFactory(last_name="Banks")
+        source: Source = SourceFactory(authors=[author])
+        SourceFactory()
+        url: str = reverse("admin:database_source_changelist")
+        for params in (
+            {"author": "bAnK"},
+            {"author": str(author.pk)},
+            {"journal": str(source.source_journal_id)},
+            {"journal": source.source_journal.name[:4]},
+            {"publisher": str(source.source_journal.journal_publisher_id)},
+        ):
+            response = self.client.get(url, params)
+            if "publisher" in params:
+                # Articles have no publisher of their own
+                self.assertEqual(response.context["cl"].result_count, 0)
+                continue
+            self.assertIn(source, response.context["cl"].result_list, params)
+        response = self.client.get(url, {"author": "Banks"})
+        self.assertEqual(list(response.context["cl"].result_list), [source])
+        self.assertContains(response, 'name="author" value="Banks"')
@@ -0,0 +1,95 @@
+from typing import List
+
+from django.test import TestCase
+
+from database.ancestry import (
+    ANCESTORS,
+    DESCENDANTS,
+    query_relatives,
+    traverse_relatives,
+)
+from database.factories import ReferenceFactory, SourceFactory
+from database.matrix import (
+    CitationMatrix,
+    clear_cached_matrix,
+    get_cached_matrix,
+)
+from database.models import Source
+
+
+class TestAncestry(TestCase):
+    def setUp(self) -> None:
+        self.sources: List[Source] = [SourceFactory() for x in range(5)]
+        a, b, c, d, e = self.sources
+        # d cites c, c cites b, b cites a, d also cites a directly, e is
+        # not connected
+        for referrer, reference in ((b, a), (c, b), (d, c), (d, a)):
+            ReferenceFactory(referrer=referrer, reference=reference)
+        clear_cached_matrix()
+
+    def test_descendants(self) -> None:
+        a, b, c, d, e = self.sources
+        self.assertEqual(a.descendants(), [(b.pk, 1), (d.pk, 1), (c.pk, 2)])
+        self.assertEqual(a.descendants(max_depth=1), [(b.pk, 1), (d.pk, 1)])
+        self.assertEqual(a.descendants(limit=1), [(b.pk, 1)])
+        self.assertEqual(e.descendants(), [])
+
+    def test_ancestors(self) -> None:
+        a, b, c, d, e = self.sources
+        self.assertEqual(d.ancestors(), [(a.pk, 1), (c.pk, 1), (b.pk, 2)])
+        self.assertEqual(a.ancestors(), [])
+
+    def test_cached_matches_query(self) -> None:
+        matrix: CitationMatrix = CitationMatrix.from_database()
+        for source in self.sources:
+            for direction in (ANCESTORS, DESCENDANTS):
+                for max_depth, limit in ((25, None), (1, None), (25, 2)):
+                    self.assertEqual(
+                        traverse_relatives(
+                            matrix, source.pk, direction, max_depth, limit
+                        ),
+                        query_relatives(
+                            source.pk, direction, max_depth, limit
+                        ),
+                    )
+        a, b, c, d, e = self.sources
+        self.assertEqual(
+            a.descendants(cached=True), [(b.pk, 1), (d.pk, 1), (c.pk, 2)]
+        )
+
+    def test_cycles(self) -> None:
+        """ Verify that citation cycles don't cause endless traversals. """
+        a, b, c, d, e = self.sources
+        ReferenceFactory(referrer=a, reference=d)
+        self.assertEqual(
+            [source_id for source_id, depth in a.descendants()],
+            [b.pk, d.pk, c.pk],
+        )
+        self.assertEqual(
+            a.descendants(),
+            traverse_relatives(
+                CitationMatrix.from_database(), a.pk, DESCENDANTS
+            ),
+        )
+
+    def test_queries(self) -> None:
+        """
+        Verify that each level is read once, and that the traversal stops
+        once enough sources were found.
+        """
+        a, b, c, d, e = self.sources
+        with self.assertNumQueries(3):
+            self.assertEqual(len(a.descendants()), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(a.descendants(limit=2), [(b.pk, 1), (d.pk, 1)])
+
+    def test_cached_new_source(self) -> None:
+        """
+        Verify that sources created after the cached matrix are read from
+        the database.
+        """
+        a, b, c, d, e = self.sources
+        get_cached_matrix()
+        source: Source = SourceFactory()
+        ReferenceFactory(referrer=source, reference=a)
+        self.assertEqual(source.ancestors(cached=True), [(a.pk, 1)])
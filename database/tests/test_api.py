@@ -0,0 +1,125 @@
+import gzip
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from database import api
+from database.factories import JournalFactory, ReferenceFactory, SourceFactory
+from database.models import Journal, Reference, Source
+from database.versions import get_versions
+
+
+class TestVersions(TestCase):
+    def test_bumped_on_changes(self) -> None:
+        before = get_versions(Source, Reference)
+        reference: Reference = ReferenceFactory()
+        after_create = get_versions(Source, Reference)
+        self.assertGreater(after_create[0], before[0])
+        self.assertGreater(after_create[1], before[1])
+        reference.delete()
+        self.assertGreater(get_versions(Reference)[0], after_create[1])
+
+
+class TestApi(TestCase):
+    def setUp(self) -> None:
+        # Versions are rolled back with the data of each test.
+        api.clear_matrix()
+        self.journal: Journal = JournalFactory()
+        self.first: Source = SourceFactory(source_journal=self.journal)
+        self.second: Source = SourceFactory(source_journal=self.journal)
+        self.third: Source = SourceFactory()
+        ReferenceFactory(referrer=self.first, reference=self.second)
+        ReferenceFactory(referrer=self.third, reference=self.second)
+
+    def get_json(self, url: str, **headers):
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response, json.loads(response.content)
+
+    def test_source_endpoints(self) -> None:
+        response, data = self.get_json(
+            reverse("api_source_references", args=[self.first.pk])
+        )
+        self.assertEqual(data["references"], [self.second.pk])
+        response, data = self.get_json(
+            reverse("api_source_citations", args=[self.second.pk])
+        )
+        self.assertEqual(data["citations"], [self.first.pk, self.third.pk])
+        response = self.client.get(
+            reverse("api_source_citations", args=[self.third.pk + 1])
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(
+            reverse("api_source_citations", args=[self.third.pk])
+        )
+        self.assertEqual(response.status_code, 405)
+
+    def test_degrees(self) -> None:
+        response, data = self.get_json(reverse("api_degrees") + "?top=1")
+        self.assertEqual(data["sources"], 3)
+        self.assertEqual(data["pairs"], 2)
+        self.assertEqual(data["in_degree"]["top"], [[self.second.pk, 2]])
+        self.assertEqual(data["out_degree"]["zero"], 1)
+        response = self.client.get(reverse("api_degrees") + "?top=x")
+        self.assertEqual(response.status_code, 400)
+
+    def test_sub_matrix(self) -> None:
+        response, data = self.get_json(
+            reverse("api_matrix") + "?journal={}".format(self.journal.pk)
+        )
+        self.assertEqual(
+            data,
+            {
+                "source_ids": [self.first.pk, self.second.pk],
+                "indptr": [0, 1, 1],
+                "indices": [1],
+                "data": [1],
+            },
+        )
+        response = self.client.get(reverse("api_matrix"))
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get(self) -> None:
+        """
+        Verify that a matching If-None-Match is answered with a 304 after
+        reading the versions only, and that changes give a new ETag.
+        """
+        url: str = reverse("api_degrees")
+        response, data = self.get_json(url)
+        etag: str = response["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        ReferenceFactory(referrer=self.second, reference=self.third)
+        response, data = self.get_json(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(data["pairs"], 3)
+
+    def test_gzip(self) -> None:
+        url: str = reverse("api_degrees") + "?top=3"
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data["sources"], 3)
+        self.assertTrue(response["ETag"].endswith('-gzip"'))
+
+        plain = self.client.get(url)
+        self.assertNotEqual(plain["ETag"], response["ETag"])
+        response = self.client.get(
+            url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_matrix_reused(self) -> None:
+        versions = api.current_versions()
+        self.assertIs(
+            api.current_matrix(versions), api.current_matrix(versions)
+        )
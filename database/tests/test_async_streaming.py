@@ -0,0 +1,156 @@
+import asyncio
+from typing import Any, Dict, List
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from database import async_streaming, streaming
+from database.factories import JournalFactory, ReferenceFactory, SourceFactory
+from database.models import Journal, Source
+
+
+class Client:
+    """ The ASGI server side of a request. """
+
+    def __init__(self, disconnect_after: int = -1):
+        self.messages: List[Dict[str, Any]] = []
+        self.disconnect_after: int = disconnect_after
+        self.disconnected = asyncio.Event()
+
+    async def receive(self) -> Dict[str, Any]:
+        if not self.messages:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        self.messages.append(message)
+        bodies: int = len(self.messages) - 1
+        if bodies == self.disconnect_after:
+            self.disconnected.set()
+            # Lets the server notice the disconnection.
+            await asyncio.sleep(0.01)
+
+    @property
+    def status(self) -> int:
+        return self.messages[0]["status"]
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(message["body"] for message in self.messages[1:])
+
+
+def request(
+    path: str,
+    method: str = "GET",
+    query: str = "",
+    host: bytes = b"testserver",
+    **kwargs
+) -> Client:
+    client: Client = Client(**kwargs)
+    scope: Dict[str, Any] = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(b"host", host)],
+    }
+    application = async_streaming.streaming_application()
+    asyncio.run(application(scope, client.receive, client.send))
+    return client
+
+
+class TestAsyncStreaming(TransactionTestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.journal: Journal = JournalFactory()
+        self.first: Source = SourceFactory(source_journal=self.journal)
+        self.second: Source = SourceFactory(source_journal=self.journal)
+        self.third: Source = SourceFactory()
+        ReferenceFactory(referrer=self.first, reference=self.second)
+        ReferenceFactory(referrer=self.third, reference=self.second)
+
+    def test_edges(self) -> None:
+        with mock.patch.object(streaming, "PAGE_ROWS", 1):
+            client: Client = request(reverse("stream_edges"))
+        self.assertEqual(client.status, 200)
+        self.assertIn(
+            (b"content-disposition", b'attachment; filename="citations.csv"'),
+            client.messages[0]["headers"],
+        )
+        self.assertEqual(
+            client.body.decode().splitlines(),
+            [
+                "referrer_id,reference_id",
+                "{},{}".format(self.first.pk, self.second.pk),
+                "{},{}".format(self.third.pk, self.second.pk),
+            ],
+        )
+        self.assertFalse(client.messages[-1].get("more_body", False))
+
+    def test_matrix(self) -> None:
+        client: Client = request(
+            reverse("stream_matrix"),
+            query="journal={}".format(self.journal.pk),
+        )
+        self.assertEqual(
+            client.body.decode().splitlines(),
+            [
+                "referrer_id,reference_id",
+                "{},{}".format(self.first.pk, self.second.pk),
+            ],
+        )
+
+    def test_errors(self) -> None:
+        client: Client = request(reverse("stream_matrix"), query="journal=x")
+        self.assertEqual(client.status, 400)
+        self.assertEqual(request(reverse("stream_edges"), "POST").status, 405)
+        self.assertEqual(request("/admin/").status, 404)
+
+    def test_disallowed_host(self) -> None:
+        """ Verify that the Host is validated, as by the middleware. """
+        with self.settings(ALLOWED_HOSTS=["testserver"]):
+            client: Client = request(
+                reverse("stream_edges"), host=b"evil.example.com"
+            )
+            self.assertEqual(client.messages[0]["status"], 400)
+            client = request(reverse("stream_edges"))
+            self.assertEqual(client.messages[0]["status"], 200)
+
+    def test_head(self) -> None:
+        client: Client = request(reverse("stream_edges"), "HEAD")
+        self.assertEqual(client.status, 200)
+        self.assertEqual(client.body, b"")
+
+    def test_cancelled(self) -> None:
+        """
+        Verify that a disconnection stops reading pages, and is logged.
+        """
+        page = mock.Mock(return_value=(["1,2\n"], 1))
+        export = streaming.Export("test.csv", "text/csv", ["a,b\n"], page)
+        client: Client = Client(disconnect_after=1)
+        with mock.patch.object(
+            async_streaming, "CHUNK_BYTES", 1
+        ), self.assertLogs("database.streaming", "INFO") as logs:
+            sent: int = asyncio.run(
+                async_streaming.stream_export(
+                    export, client.receive, client.send
+                )
+            )
+        self.assertEqual(sent, -1)
+        self.assertIn("cancelled after", logs.output[0])
+        self.assertLess(page.call_count, 3)
+
+    def test_fallback(self) -> None:
+        """ Verify that other requests are passed to the fallback. """
+        calls: List[Any] = []
+
+        async def fallback(*args) -> None:
+            calls.append(args)
+
+        application = async_streaming.streaming_application(fallback)
+        scope: Dict[str, Any] = {"type": "lifespan"}
+        asyncio.run(application(scope, None, None))
+        self.assertEqual(calls, [(scope, None, None)])
@@ -0,0 +1,64 @@
+from typing import List
+
+from django.test import TestCase
+
+from database.authorship import AuthorGraph, UnknownAuthorError
+from database.factories import AuthorFactory, ReferenceFactory, SourceFactory
+from database.models import Author, Source
+
+
+class TestAuthorGraph(TestCase):
+    def setUp(self) -> None:
+        self.authors: List[Author] = [AuthorFactory() for x in range(4)]
+        a, b, c, d = self.authors
+        self.source_ab_1: Source = SourceFactory(authors=[a, b])
+        self.source_ab_2: Source = SourceFactory(authors=[a, b])
+        self.source_ac: Source = SourceFactory(authors=[a, c])
+        self.source_d: Source = SourceFactory(authors=[d])
+        # d cites the sources of a twice, and c once
+        ReferenceFactory(referrer=self.source_d, reference=self.source_ab_1)
+        ReferenceFactory(referrer=self.source_d, reference=self.source_ac)
+        # a cites itself
+        ReferenceFactory(referrer=self.source_ab_2, reference=self.source_ab_1)
+        self.graph: AuthorGraph = AuthorGraph.from_database()
+
+    def test_top_collaborators(self) -> None:
+        a, b, c, d = self.authors
+        self.assertEqual(
+            self.graph.top_collaborators(a.pk), [(b.pk, 2), (c.pk, 1)]
+        )
+        self.assertEqual(
+            self.graph.top_collaborators(a.pk, limit=1), [(b.pk, 2)]
+        )
+        self.assertEqual(self.graph.top_collaborators(d.pk), [])
+
+    def test_most_cited_by(self) -> None:
+        a, b, c, d = self.authors
+        # b also cites a, through source_ab_2
+        self.assertEqual(
+            self.graph.most_cited_by(a.pk), [(d.pk, 2), (b.pk, 1)]
+        )
+        self.assertEqual(self.graph.most_cited_by(c.pk), [(d.pk, 1)])
+
+    def test_most_cited(self) -> None:
+        a, b, c, d = self.authors
+        self.assertEqual(
+            self.graph.most_cited(d.pk), [(a.pk, 2), (b.pk, 1), (c.pk, 1)]
+        )
+
+    def test_unknown_author(self) -> None:
+        with self.assertRaises(UnknownAuthorError):
+            self.graph.top_collaborators(max(a.pk for a in self.authors) + 1)
+
+    def test_sources_after_matrix(self) -> None:
+        """
+        Verify that authorships of sources missing from the citation matrix
+        are left out, instead of failing the build.
+        """
+        a, b, c, d = self.authors
+        SourceFactory(authors=[a, d])
+        graph: AuthorGraph = AuthorGraph.from_database(self.graph.matrix)
+        self.assertEqual(graph.top_collaborators(d.pk), [])
+        self.assertEqual(
+            AuthorGraph.from_database().top_collaborators(d.pk), [(a.pk, 1)]
+        )
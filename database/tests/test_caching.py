@@ -0,0 +1,136 @@
+import json
+import tempfile
+from typing import List
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+
+from database import derived, versions
+from database.caching import VersionedCache, derived_cache
+from database.factories import ReferenceFactory, SourceFactory, UserFactory
+from database.models import Evaluation, Reference, Source, TableVersion, User
+
+
+class IsolatedCacheTestCase(TestCase):
+    """ Tests using a derived cache in a temporary directory. """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = self.settings(
+            CACHES=dict(
+                settings.CACHES,
+                derived=dict(
+                    settings.CACHES["derived"], LOCATION=directory.name
+                ),
+            )
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+
+class TestVersionedCache(IsolatedCacheTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.cache: VersionedCache = VersionedCache(max_entries=2)
+        self.cache.clear()
+        self.computed: List[str] = []
+
+    def compute(self, value: str):
+        return lambda: self.computed.append(value) or value
+
+    def test_versions(self) -> None:
+        for attempt in range(2):
+            self.assertEqual(
+                self.cache.get_or_compute(
+                    "key", (Reference,), self.compute("a")
+                ),
+                "a",
+            )
+        self.assertEqual(self.computed, ["a"])
+        ReferenceFactory()
+        self.assertEqual(
+            self.cache.get_or_compute("key", (Reference,), self.compute("b")),
+            "b",
+        )
+        self.assertEqual(
+            self.cache.get_or_compute("key", (Evaluation,), self.compute("c")),
+            "c",
+        )
+        statistics = self.cache.statistics()
+        self.assertEqual(statistics["hits"], 1)
+        self.assertEqual(statistics["misses"], 3)
+        self.assertEqual(statistics["entries"], 1)
+
+    def test_lru(self) -> None:
+        for key in ("a", "b", "a", "c"):
+            self.cache.get_or_compute(key, (Source,), self.compute(key))
+        self.assertEqual(list(self.cache.entries), ["a", "c"])
+        self.assertEqual(self.cache.statistics()["evictions"], 1)
+
+        # Evicted entries are still found in the shared cache.
+        self.cache.get_or_compute("b", (Source,), self.compute("b"))
+        self.assertEqual(self.computed, ["a", "b", "c"])
+        self.assertEqual(self.cache.statistics()["shared_hits"], 1)
+
+    def test_database_reset(self) -> None:
+        """
+        Verify that the versions of a reset database, or of another database
+        sharing the cache, don't find the entries of this one.
+        """
+        self.cache.get_or_compute("key", (Source,), self.compute("a"))
+        TableVersion.objects.all().delete()
+        self.cache.entries.clear()
+        self.assertEqual(
+            self.cache.get_or_compute("key", (Source,), self.compute("b")),
+            "b",
+        )
+        self.assertEqual(self.cache.statistics()["shared_hits"], 0)
+
+
+class TestDerived(IsolatedCacheTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        derived_cache.clear()
+        # The generation of the database is created on first use.
+        versions.get_generation_and_versions()
+        self.first: Source = SourceFactory()
+        self.second: Source = SourceFactory()
+        ReferenceFactory(referrer=self.first, reference=self.second)
+
+    def test_results(self) -> None:
+        source_ids, in_degree, out_degree = derived.degree_vectors()
+        self.assertEqual(source_ids.tolist(), [self.first.pk, self.second.pk])
+        self.assertEqual(in_degree.tolist(), [0, 1])
+        self.assertEqual(derived.top_cited(1), [(self.second.pk, 1)])
+        self.assertEqual(
+            derived.neighbours(self.first.pk),
+            {"references": [self.second.pk], "citations": []},
+        )
+        user: User = UserFactory()
+        Evaluation.objects.create(user=user, source=self.first, favorited=True)
+        self.assertEqual(derived.most_favorited(), [(self.first.pk, 1)])
+
+    def test_invalidation(self) -> None:
+        with self.assertNumQueries(2):
+            derived.top_cited(5)
+        with self.assertNumQueries(1):
+            derived.top_cited(5)
+        ReferenceFactory(referrer=self.second, reference=self.first)
+        self.assertEqual(
+            derived.top_cited(5), [(self.first.pk, 1), (self.second.pk, 1)]
+        )
+        self.assertEqual(
+            derived.neighbours(self.first.pk)["citations"], [self.second.pk]
+        )
+
+    def test_statistics_view(self) -> None:
+        derived.top_cited(5)
+        derived.top_cited(5)
+        self.client.force_login(UserFactory(is_staff=True))
+        response = self.client.get(reverse("cache_statistics"))
+        statistics = json.loads(response.content)
+        self.assertEqual(statistics["hits"], 1)
+        self.assertEqual(statistics["misses"], 1)
+        self.assertEqual(statistics["hit_rate"], 0.5)
@@ -0,0 +1,78 @@
+from io import StringIO
+from typing import List
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+
+from database.centrality import compute_influence, hits, pagerank
+from database.factories import ReferenceFactory, SourceFactory
+from database.matrix import CitationMatrix
+from database.models import Source, SourceInfluence
+
+
+class TestCentrality(TestCase):
+    def setUp(self) -> None:
+        self.sources: List[Source] = [SourceFactory() for x in range(4)]
+        a, b, c, d = self.sources
+        # Everybody cites a, b also cites c
+        for referrer, reference in ((b, a), (c, a), (d, a), (b, c)):
+            ReferenceFactory(referrer=referrer, reference=reference)
+        self.matrix: CitationMatrix = CitationMatrix.from_database()
+
+    def scores_by_source(self, scores: np.ndarray) -> np.ndarray:
+        return scores[self.matrix.index_of([s.pk for s in self.sources])]
+
+    def test_pagerank(self) -> None:
+        ranks, iterations = pagerank(self.matrix)
+        a, b, c, d = self.scores_by_source(ranks)
+        self.assertAlmostEqual(ranks.sum(), 1.0)
+        self.assertGreater(a, c)
+        self.assertGreater(c, b)
+        self.assertAlmostEqual(b, d)
+        self.assertLess(iterations, 100)
+
+    def test_pagerank_batched_dampings(self) -> None:
+        ranks, iterations = pagerank(self.matrix, np.array([0.5, 0.85]))
+        self.assertEqual(ranks.shape, (4, 2))
+        single, iterations = pagerank(self.matrix, 0.5)
+        self.assertTrue(np.allclose(ranks[:, 0], single))
+
+    def test_pagerank_empty(self) -> None:
+        Source.objects.all().delete()
+        empty: CitationMatrix = CitationMatrix.from_database()
+        with np.errstate(all="raise"):
+            ranks, iterations = pagerank(empty)
+            batched, iterations = pagerank(empty, np.array([0.5, 0.85]))
+        self.assertEqual((ranks.shape, batched.shape), ((0,), (0, 2)))
+        self.assertEqual(iterations, 0)
+
+    def test_warm_start(self) -> None:
+        ranks, cold_iterations = pagerank(self.matrix)
+        warm_ranks, warm_iterations = pagerank(self.matrix, start=ranks)
+        self.assertTrue(np.allclose(ranks, warm_ranks))
+        self.assertLess(warm_iterations, cold_iterations)
+
+    def test_hits(self) -> None:
+        hubs, authorities, iterations = hits(self.matrix)
+        a, b, c, d = self.scores_by_source(authorities)
+        self.assertGreater(a, c)
+        self.assertEqual(b, 0)
+        a, b, c, d = self.scores_by_source(hubs)
+        self.assertGreater(b, d)
+        self.assertEqual(a, 0)
+
+    def test_compute_influence(self) -> None:
+        compute_influence()
+        a, b, c, d = self.sources
+        self.assertEqual(SourceInfluence.objects.count(), 4)
+        self.assertEqual(
+            Source.objects.order_by("-influence__pagerank").first(), a
+        )
+        scores = compute_influence()
+        # Warm started from the stored scores
+        self.assertEqual(scores.pagerank_iterations, 1)
+
+    def test_command(self) -> None:
+        call_command("compute_influence", cold_start=True, stdout=StringIO())
+        self.assertEqual(SourceInfluence.objects.count(), 4)
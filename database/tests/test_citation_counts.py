@@ -0,0 +1,143 @@
+from io import StringIO
+from typing import List
+
+from django.contrib.admin.sites import AdminSite
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.deletion import Collector
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from database import versions
+from database.admin import SourceAdmin, TimesCitedListFilter
+from database.bulk import bulk_insert
+from database.citation_counts import recompute_citation_counts
+from database.factories import ReferenceFactory, SourceFactory
+from database.models import Reference, Source
+
+
+class TestCitationCounts(TestCase):
+    def setUp(self) -> None:
+        self.source_1: Source = SourceFactory()
+        self.source_2: Source = SourceFactory()
+        self.source_3: Source = SourceFactory()
+
+    def assertCounts(
+        self, source: Source, times_cited: int, references_made: int
+    ) -> None:
+        source.refresh_from_db()
+        self.assertEqual(source.times_cited, times_cited)
+        self.assertEqual(source.references_made, references_made)
+
+    def test_create_and_delete(self) -> None:
+        reference: Reference = ReferenceFactory(
+            referrer=self.source_1, reference=self.source_2
+        )
+        ReferenceFactory(referrer=self.source_3, reference=self.source_2)
+        self.assertCounts(self.source_1, 0, 1)
+        self.assertCounts(self.source_2, 2, 0)
+        reference.delete()
+        self.assertCounts(self.source_1, 0, 0)
+        self.assertCounts(self.source_2, 1, 0)
+
+    def test_change_reference(self) -> None:
+        reference: Reference = ReferenceFactory(
+            referrer=self.source_1, reference=self.source_2
+        )
+        reference.reference = self.source_3
+        reference.save()
+        self.assertCounts(self.source_2, 0, 0)
+        self.assertCounts(self.source_3, 1, 0)
+        reference.save()
+        self.assertCounts(self.source_3, 1, 0)
+
+    def test_cascade_delete(self) -> None:
+        ReferenceFactory(referrer=self.source_1, reference=self.source_2)
+        reference_version: int = versions.get_versions(Reference)[0]
+        self.source_1.delete()
+        self.assertCounts(self.source_2, 0, 0)
+        self.assertNotEqual(
+            versions.get_versions(Reference)[0], reference_version
+        )
+
+    def test_cascade_delete_is_set_based(self) -> None:
+        """
+        Verify that the references of deleted sources are deleted with one
+        query, whatever their number, and the counters rebuilt once.
+        """
+        self.assertTrue(
+            Collector(using="default").can_fast_delete(Reference.objects.all())
+        )
+        sources: List[Source] = SourceFactory.create_batch(4)
+        for source in sources[1:]:
+            ReferenceFactory(referrer=sources[0], reference=source)
+            ReferenceFactory(referrer=source, reference=self.source_1)
+        ReferenceFactory(referrer=self.source_2, reference=self.source_3)
+
+        with CaptureQueriesContext(connection) as single:
+            self.source_2.delete()
+        with CaptureQueriesContext(connection) as several:
+            sources[0].delete()
+        self.assertEqual(len(several), len(single))
+        self.assertCounts(self.source_3, 0, 0)
+        self.assertCounts(sources[1], 0, 1)
+
+        Source.objects.filter(pk__in=[s.pk for s in sources[1:3]]).delete()
+        self.assertCounts(self.source_1, 1, 0)
+        self.assertCounts(sources[3], 0, 1)
+
+    def test_queryset_delete(self) -> None:
+        ReferenceFactory(referrer=self.source_1, reference=self.source_2)
+        ReferenceFactory(referrer=self.source_1, reference=self.source_3)
+        ReferenceFactory(referrer=self.source_3, reference=self.source_2)
+        Reference.objects.filter(referrer=self.source_1).delete()
+        self.assertCounts(self.source_1, 0, 0)
+        self.assertCounts(self.source_2, 1, 0)
+        self.assertCounts(self.source_3, 0, 1)
+
+    def test_bulk_insert(self) -> None:
+        bulk_insert(
+            Reference,
+            [
+                Reference(referrer=self.source_1, reference=self.source_3),
+                Reference(referrer=self.source_2, reference=self.source_3),
+                Reference(referrer=self.source_2, reference=self.source_1),
+            ],
+        )
+        self.assertCounts(self.source_1, 1, 1)
+        self.assertCounts(self.source_2, 0, 2)
+        self.assertCounts(self.source_3, 2, 0)
+
+    def test_saving_stale_source_keeps_counts(self) -> None:
+        ReferenceFactory(referrer=self.source_1, reference=self.source_2)
+        self.source_2.title = "Changed"
+        self.source_2.save()
+        self.assertCounts(self.source_2, 1, 0)
+
+    def test_recompute(self) -> None:
+        ReferenceFactory(referrer=self.source_1, reference=self.source_2)
+        Source.objects.update(times_cited=10, references_made=10)
+        self.assertEqual(recompute_citation_counts(), 3)
+        self.assertCounts(self.source_1, 0, 1)
+        self.assertCounts(self.source_2, 1, 0)
+        self.assertCounts(self.source_3, 0, 0)
+
+    def test_recompute_command(self) -> None:
+        ReferenceFactory(referrer=self.source_1, reference=self.source_2)
+        Source.objects.update(times_cited=10)
+        call_command("recompute_citation_counts", stdout=StringIO())
+        self.assertCounts(self.source_2, 1, 0)
+
+    def test_admin_filter(self) -> None:
+        ReferenceFactory(referrer=self.source_1, reference=self.source_2)
+        request = RequestFactory().get("/", {"times_cited": "1-9"})
+        list_filter = TimesCitedListFilter(
+            request,
+            {"times_cited": "1-9"},
+            Source,
+            SourceAdmin(Source, AdminSite()),
+        )
+        self.assertEqual(
+            list(list_filter.queryset(request, Source.objects.all())),
+            [self.source_2],
+        )
@@ -0,0 +1,117 @@
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from database import citation_indices
+from database.citation_indices import compute_citation_indices, compute_indices
+from database.factories import (
+    AuthorFactory,
+    JournalFactory,
+    SourceFactory,
+    UserFactory,
+)
+from database.models import (
+    Author,
+    AuthorIndices,
+    Journal,
+    JournalIndices,
+    PublisherIndices,
+    Source,
+)
+
+
+class TestComputeIndices(TestCase):
+    def test_indices(self) -> None:
+        indices = compute_indices(
+            np.array([1, 2, 3, 4]),
+            np.array([2, 1, 2, 1, 1, 2, 1, 1]),
+            np.array([10, 3, 0, 5, 0, 1, 3, 1]),
+        )
+        self.assertEqual(indices.h_index.tolist(), [3, 1, 0, 0])
+        self.assertEqual(indices.g_index.tolist(), [3, 3, 0, 0])
+        self.assertEqual(indices.sources.tolist(), [5, 3, 0, 0])
+        self.assertEqual(indices.citations.tolist(), [12, 11, 0, 0])
+
+
+class TestCitationIndices(TestCase):
+    def setUp(self) -> None:
+        self.author: Author = AuthorFactory()
+        self.journal: Journal = JournalFactory()
+        for times_cited in (5, 3, 3, 1, 0):
+            SourceFactory(
+                authors=[self.author],
+                source_journal=self.journal,
+                times_cited=times_cited,
+            )
+        self.book = SourceFactory(
+            book=True, authors=[self.author], times_cited=9
+        )
+        self.unpublished: Author = AuthorFactory()
+
+    def test_compute(self) -> None:
+        stats = compute_citation_indices()
+        self.assertEqual(stats["authors"], 2)
+        indices: AuthorIndices = self.author.indices
+        self.assertEqual((indices.h_index, indices.g_index), (3, 4))
+        self.assertEqual((indices.sources, indices.citations), (6, 21))
+        self.assertEqual(
+            (self.journal.indices.h_index, self.journal.indices.g_index),
+            (3, 3),
+        )
+        self.assertEqual(
+            PublisherIndices.objects.get(
+                publisher=self.book.source_publisher
+            ).h_index,
+            1,
+        )
+        self.assertEqual(
+            AuthorIndices.objects.get(author=self.unpublished).g_index, 0
+        )
+
+        # Every run replaces the stored indices.
+        Source.objects.filter(source_journal=self.journal).update(
+            times_cited=0
+        )
+        compute_citation_indices()
+        self.assertEqual(
+            JournalIndices.objects.get(journal=self.journal).h_index, 0
+        )
+
+    def test_concurrent_source(self) -> None:
+        """
+        Verify that authorships of a source created after the sources were
+        read are skipped, instead of being matched to another source.
+        """
+        read = citation_indices._read
+
+        def read_then_create(queryset, columns):
+            rows = read(queryset, columns)
+            if queryset.model is Source:
+                SourceFactory(authors=[self.unpublished], times_cited=100)
+            return rows
+
+        with mock.patch.object(
+            citation_indices, "_read", side_effect=read_then_create
+        ):
+            compute_citation_indices()
+        self.assertEqual(
+            AuthorIndices.objects.get(author=self.unpublished).sources, 0
+        )
+        self.assertEqual(self.author.indices.sources, 6)
+
+    def test_command_and_admin(self) -> None:
+        output = StringIO()
+        call_command("compute_citation_indices", stdout=output)
+        self.assertIn("Computed the indices of 2 authors", output.getvalue())
+        self.client.force_login(UserFactory(is_super=True))
+        response = self.client.get(
+            reverse("admin:database_author_changelist"), {"o": "-4"}
+        )
+        self.assertEqual(
+            list(response.context["cl"].result_list),
+            [self.author, self.unpublished],
+        )
@@ -0,0 +1,208 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from database.citation_styles import (
+    APA,
+    CHICAGO,
+    MLA,
+    Entry,
+    format_apa,
+    format_chicago,
+    format_mla,
+    invalidate,
+)
+from database.factories import (
+    AuthorFactory,
+    JournalFactory,
+    PublisherFactory,
+    SourceFactory,
+)
+from database.models import Author, Journal, Publisher, Source
+
+ARTICLE: Entry = Entry(
+    title="Computing machinery and intelligence",
+    type="AR",
+    year=1950,
+    authors=[("Alan", "Mathison", "Turing"), ("Jean-Paul", None, "Sartre")],
+    journal="Mind",
+    publisher="Oxford University Press",
+    page_start=433,
+    page_end=460,
+)
+
+BOOK: Entry = Entry(
+    title="What is life?",
+    type="BK",
+    year=1944,
+    authors=[("Erwin", "", "Schrödinger")],
+    publisher="Cambridge University Press",
+    city="Cambridge",
+)
+
+
+class TestStyles(SimpleTestCase):
+    def test_apa(self) -> None:
+        self.assertEqual(
+            format_apa(ARTICLE),
+            "Turing, A. M., & Sartre, J.-P. (1950). Computing machinery and "
+            "intelligence. Mind, 433–460.",
+        )
+        self.assertEqual(
+            format_apa(BOOK),
+            "Schrödinger, E. (1944). What is life? Cambridge University "
+            "Press.",
+        )
+        self.assertEqual(
+            format_apa(BOOK._replace(authors=[])),
+            "What is life? (1944). Cambridge University Press.",
+        )
+
+    def test_mla(self) -> None:
+        self.assertEqual(
+            format_mla(ARTICLE),
+            'Turing, Alan Mathison, and Jean-Paul Sartre. "Computing '
+            'machinery and intelligence." Mind, 1950, pp. 433-460.',
+        )
+        self.assertEqual(
+            format_mla(BOOK._replace(authors=BOOK.authors * 3)),
+            "Schrödinger, Erwin, et al. What is life? Cambridge University "
+            "Press, 1944.",
+        )
+
+    def test_chicago(self) -> None:
+        self.assertEqual(
+            format_chicago(ARTICLE),
+            'Turing, Alan Mathison, and Jean-Paul Sartre. "Computing '
+            'machinery and intelligence." Mind (1950): 433–460.',
+        )
+        self.assertEqual(
+            format_chicago(BOOK),
+            "Schrödinger, Erwin. What is life? Cambridge: Cambridge "
+            "University Press, 1944.",
+        )
+
+
+class TestRender(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.author: Author = AuthorFactory(
+            first_name="Grace", middle_name="Murray", last_name="Hopper"
+        )
+        self.journal: Journal = JournalFactory(name="Mind")
+        self.article: Source = SourceFactory(
+            title="An article",
+            year_of_publication=1952,
+            source_journal=self.journal,
+            journal_page_range_start=1,
+            journal_page_range_end=5,
+            authors=[self.author],
+        )
+        self.publisher: Publisher = PublisherFactory(name="Wiley", city="")
+        self.book: Source = SourceFactory(
+            book=True,
+            title="A book",
+            year_of_publication=1960,
+            source_publisher=self.publisher,
+        )
+
+    def test_constant_queries(self) -> None:
+        for index in range(20):
+            SourceFactory(
+                source_journal=JournalFactory(),
+                authors=AuthorFactory.create_batch(3),
+            )
+        with self.assertNumQueries(3):
+            entries = Source.objects.order_by("pk").bibliography(MLA)
+        self.assertEqual(len(entries), 22)
+        self.assertEqual(
+            entries[:2],
+            [
+                'Hopper, Grace Murray. "An article." Mind, 1952, pp. 1-5.',
+                "A book. Wiley, 1960.",
+            ],
+        )
+        with self.assertNumQueries(1):
+            Source.objects.bibliography(MLA)
+
+    def test_invalidation(self) -> None:
+        sources = Source.objects.filter(pk=self.article.pk)
+        self.assertEqual(
+            sources.bibliography(CHICAGO),
+            ['Hopper, Grace Murray. "An article." Mind (1952): 1–5.'],
+        )
+        self.assertEqual(
+            sources.bibliography(APA),
+            ["Hopper, G. M. (1952). An article. Mind, 1–5."],
+        )
+
+        self.author.first_name = "G."
+        self.author.middle_name = None
+        self.author.save()
+        self.journal.name = "Nature"
+        self.journal.save()
+        self.assertEqual(
+            sources.bibliography(APA),
+            ["Hopper, G. (1952). An article. Nature, 1–5."],
+        )
+
+        self.article.authors.add(
+            AuthorFactory(first_name="Ada", middle_name=None, last_name="L")
+        )
+        self.article.title = "A better article"
+        self.article.save()
+        self.assertEqual(
+            sources.bibliography(APA),
+            ["Hopper, G., & L, A. (1952). A better article. Nature, 1–5."],
+        )
+
+        books = Source.objects.filter(pk=self.book.pk)
+        self.assertEqual(books.bibliography(APA), ["A book. (1960). Wiley."])
+        self.publisher.name = "Springer"
+        self.publisher.save()
+        self.assertEqual(
+            books.bibliography(APA), ["A book. (1960). Springer."]
+        )
+
+    def test_other_process(self) -> None:
+        """
+        Verify that invalidating sources, which only replaces their stamps in
+        the database, replaces their cached entries and no others.
+        """
+        sources = Source.objects.filter(
+            pk__in=[self.article.pk, self.book.pk]
+        ).order_by("pk")
+        self.assertEqual(
+            sources.bibliography(APA),
+            [
+                "Hopper, G. M. (1952). An article. Mind, 1–5.",
+                "A book. (1960). Wiley.",
+            ],
+        )
+        sources.update(year_of_publication=1961)
+        invalidate([])
+        invalidate(Source.objects.filter(pk=self.book.pk).values("pk"))
+        self.assertEqual(
+            sources.bibliography(APA),
+            [
+                "Hopper, G. M. (1952). An article. Mind, 1–5.",
+                "A book. (1961). Wiley.",
+            ],
+        )
+        invalidate([self.article.pk])
+        self.assertEqual(
+            sources.bibliography(APA)[0],
+            "Hopper, G. M. (1961). An article. Mind, 1–5.",
+        )
+
+    def test_related_changes(self) -> None:
+        """ Verify that saving a journal only invalidates its sources. """
+        stamps = dict(Source.objects.values_list("pk", "bibliography_stamp"))
+        self.journal.save()
+        self.assertNotEqual(
+            Source.objects.get(pk=self.article.pk).bibliography_stamp,
+            stamps[self.article.pk],
+        )
+        self.assertEqual(
+            Source.objects.get(pk=self.book.pk).bibliography_stamp,
+            stamps[self.book.pk],
+        )
@@ -1,7 +1,13 @@
+import json
+from io import StringIO
+from typing import List, Tuple
+
 from django.core.management import call_command
-from django.db.models import Count
+from django.db.models import Count, F, QuerySet
 from django.test import TestCase
 
+from database.factories import SourceFactory
+from database.management.commands import generate_dummy_data
 from database.models import (
     Author,
     Evaluation,
@@ -65,6 +71,13 @@ class TestGenerateDummyDataCommand(TestCase):
         Verify that the references have been created.
         """
         self.assertEqual(Reference.objects.all().count(), 400)
+        self.assertFalse(
+            Reference.objects.filter(
+                referrer__year_of_publication__lte=F(
+                    "reference__year_of_publication"
+                )
+            ).exists()
+        )
 
     def verify_superuser(self) -> None:
         """ Verify that the superuser has ben created. """
@@ -89,3 +102,129 @@ class TestGenerateDummyDataCommand(TestCase):
         self.verify_references()
         self.verify_superuser()
         self.verify_evaluations()
+
+    def test_references_without_older_sources(self) -> None:
+        """
+        Verify that references stop once every pair of sources from
+        different years is used.
+        """
+        SourceFactory.create_batch(3, year_of_publication=2000)
+        command = generate_dummy_data.Command(stdout=StringIO())
+        command.generate_references()
+        self.assertFalse(Reference.objects.exists())
+        SourceFactory(year_of_publication=2001)
+        command.generate_references()
+        self.assertEqual(Reference.objects.count(), 3)
+
+
+class TestGenerateDummyDataCommandBulk(TestCase):
+    def test_command_with_scale(self) -> None:
+        """ Verify that the bulk mode creates 'scale' times the data. """
+        call_command("generate_dummy_data", scale=2, batch_size=7, seed=0)
+        self.assertEqual(User.objects.filter(is_superuser=False).count(), 10)
+        self.assertEqual(Publisher.objects.all().count(), 10)
+        self.assertEqual(Journal.objects.all().count(), 30)
+        self.assertEqual(Author.objects.all().count(), 40)
+        self.assertEqual(Source.objects.filter(type="BK").count(), 80)
+        sources_with_authors: QuerySet[Source] = Source.objects.annotate(
+            num_authors=Count("authors")
+        ).filter(type="AR")
+        self.assertEqual(
+            sources_with_authors.filter(num_authors=1).count(), 120
+        )
+        self.assertEqual(
+            sources_with_authors.filter(num_authors=2).count(), 20
+        )
+        # About 400 references per scale, fewer after dropping duplicates
+        # and the citations of the oldest sources.
+        self.assertGreaterEqual(Reference.objects.count(), 480)
+        self.assertLessEqual(Reference.objects.count(), 880)
+        self.assertFalse(
+            Reference.objects.filter(
+                referrer__year_of_publication__lte=F(
+                    "reference__year_of_publication"
+                )
+            ).exists()
+        )
+        self.assertEqual(Evaluation.objects.all().count(), 80)
+        # The citation counters were maintained through the bulk inserts
+        self.assertEqual(
+            sum(Source.objects.values_list("times_cited", flat=True)),
+            Reference.objects.count(),
+        )
+        self.assertFalse(
+            Source.objects.filter(
+                type="BK", source_publisher__isnull=True
+            ).exists()
+        )
+        self.assertFalse(
+            Source.objects.filter(
+                type="AR", source_journal__isnull=True
+            ).exists()
+        )
+
+    def test_command_with_seed(self) -> None:
+        """ Verify that the same seed generates the same data set. """
+
+        def generate() -> List[Tuple[str, str]]:
+            call_command("generate_dummy_data", scale=1, seed=42)
+            references: List[Tuple[str, str]] = sorted(
+                Reference.objects.values_list(
+                    "referrer__title", "reference__title"
+                )
+            )
+            for model in (Source, Author, Publisher, User):
+                model.objects.all().delete()
+            return references
+
+        self.assertEqual(generate(), generate())
+
+
+class TestBenchmarkCommand(TestCase):
+    def test_command(self) -> None:
+        """
+        Verify that the benchmark reports every timing as JSON, and leaves
+        no data behind.
+        """
+        output = StringIO()
+        call_command(
+            "benchmark", sizes=[100], samples=10, in_place=True, stdout=output
+        )
+        report = json.loads(output.getvalue())
+        self.assertEqual(report["database"], "sqlite")
+        [result] = report["results"]
+        self.assertEqual(result["counts"]["sources"], 110)
+        timings = result["timings"]
+        for name in (
+            "generate",
+            "source_save",
+            "reference_bulk_insert",
+            "degree_aggregation",
+            "degree_counters",
+            "degree_matrix",
+            "admin_changelist:source",
+            "admin_changelist:evaluation",
+            "cascade_delete",
+        ):
+            self.assertGreater(timings[name]["queries"], 0, name)
+        self.assertEqual(timings["source_save"]["items"], 10)
+        self.assertFalse(Source.objects.exists())
+
+    def test_colliding_reference_samples(self) -> None:
+        """
+        Verify that the inserted references avoid the stored pairs and
+        self-citations, with more samples than 110 sources make collisions
+        certain for.
+        """
+        output = StringIO()
+        call_command(
+            "benchmark",
+            sizes=[100],
+            samples=3000,
+            in_place=True,
+            stdout=output,
+        )
+        [result] = json.loads(output.getvalue())["results"]
+        self.assertEqual(
+            result["timings"]["reference_bulk_insert"]["items"], 3000
+        )
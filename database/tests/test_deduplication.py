@@ -0,0 +1,117 @@
+from io import StringIO
+from typing import List
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from database.bulk import bulk_insert
+from database.deduplication import (
+    blocking_key,
+    cluster_block,
+    find_duplicates,
+    given_names,
+    merge_clusters,
+)
+from database.factories import AuthorFactory, SourceFactory
+from database.models import Author, AuthorIndices, Source
+
+
+class TestBlocking(SimpleTestCase):
+    def test_blocking_key(self) -> None:
+        self.assertEqual(blocking_key("Jóhn", "P.", "Smith"), "smith:j")
+        self.assertEqual(
+            blocking_key("J.-P.", None, "van der Berg"), ("vanderberg:j")
+        )
+        self.assertEqual(blocking_key(None, None, "Plato"), "plato:")
+
+    def test_cluster_block(self) -> None:
+        variants = [
+            (1, given_names("J.", "P.")),
+            (2, given_names("John", "Paul")),
+            (3, given_names("John", None)),
+            (4, given_names("Jane", None)),
+        ]
+        self.assertEqual(cluster_block(variants), [[2, 1, 3]])
+
+    def test_ambiguous_variant(self) -> None:
+        """
+        Verify that an initial matching two different names is not merged
+        into either of them.
+        """
+        variants = [
+            (1, given_names("J.", None)),
+            (2, given_names("John", None)),
+            (3, given_names("James", None)),
+        ]
+        self.assertEqual(cluster_block(variants), [])
+
+
+class TestMerge(TestCase):
+    def setUp(self) -> None:
+        self.full: Author = AuthorFactory(
+            first_name="John", middle_name="Paul", last_name="Smith"
+        )
+        self.initials: Author = AuthorFactory(
+            first_name="J.", middle_name="P.", last_name="Smíth"
+        )
+        self.other: Author = AuthorFactory(
+            first_name="Jane", middle_name="", last_name="Smith"
+        )
+
+    def test_find_duplicates(self) -> None:
+        Author.objects.filter(pk=self.initials.pk).update(blocking_key="")
+        self.assertEqual(
+            list(find_duplicates()), [[self.full.pk, self.initials.pk]]
+        )
+
+    def test_merge(self) -> None:
+        both: Source = SourceFactory()
+        both.authors.set([self.full, self.initials])
+        single: Source = SourceFactory()
+        single.authors.set([self.initials, self.other])
+        self.assertEqual(merge_clusters(list(find_duplicates())), 1)
+        self.assertFalse(Author.objects.filter(pk=self.initials.pk).exists())
+        self.assertEqual(list(both.authors.all()), [self.full])
+        self.assertCountEqual(single.authors.all(), [self.full, self.other])
+
+    def test_merge_is_set_based(self) -> None:
+        """
+        Verify that the number of queries doesn't grow with the number of
+        merged authors.
+        """
+        AuthorIndices.objects.create(
+            author=self.initials, h_index=0, g_index=0, sources=0, citations=0
+        )
+        with CaptureQueriesContext(connection) as single:
+            merge_clusters([[self.full.pk, self.initials.pk]])
+        duplicates: List[Author] = AuthorFactory.create_batch(
+            3, first_name="J.", middle_name="", last_name="Smith"
+        )
+        with CaptureQueriesContext(connection) as several:
+            merge_clusters([[self.full.pk] + [a.pk for a in duplicates]])
+        self.assertEqual(len(several), len(single))
+        self.assertEqual(
+            list(Author.objects.order_by("pk")), [self.full, self.other]
+        )
+        self.assertFalse(AuthorIndices.objects.exists())
+
+    def test_bulk_inserted_keys(self) -> None:
+        """ Verify that bulk inserted factory authors have a key. """
+        pk: int = bulk_insert(
+            Author, [AuthorFactory.build(first_name="Ada", last_name="King")]
+        )[0]
+        self.assertEqual(Author.objects.get(pk=pk).blocking_key, "king:a")
+
+    def test_command(self) -> None:
+        output = StringIO()
+        call_command("merge_duplicate_authors", "--dry-run", stdout=output)
+        self.assertIn("Found 1 clusters", output.getvalue())
+        self.assertEqual(Author.objects.count(), 3)
+        call_command("merge_duplicate_authors", stdout=output)
+        self.assertIn("Merged 1 duplicated authors", output.getvalue())
+        remaining: List[int] = list(
+            Author.objects.values_list("pk", flat=True)
+        )
+        self.assertCountEqual(remaining, [self.full.pk, self.other.pk])
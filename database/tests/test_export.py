@@ -0,0 +1,107 @@
+import csv
+import os
+import tempfile
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+from scipy import io, sparse
+
+from database.export import (
+    SOURCE_INDEX_SUFFIX,
+    export_columnar,
+    export_matrix_market,
+    export_npz,
+)
+from database.factories import ReferenceFactory, SourceFactory
+from database.matrix import CitationMatrix
+from database.models import Source
+
+
+class TestExport(TestCase):
+    def setUp(self) -> None:
+        self.book: Source = SourceFactory(book=True)
+        self.article: Source = SourceFactory(article=True)
+        self.other: Source = SourceFactory(article=True)
+        ReferenceFactory(referrer=self.article, reference=self.book)
+        ReferenceFactory(referrer=self.other, reference=self.book)
+        ReferenceFactory(referrer=self.other, reference=self.article)
+        self.matrix: CitationMatrix = CitationMatrix.from_database()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def column(self, name: str) -> list:
+        return np.load(
+            self.path(os.path.join("columns", name + ".npy"))
+        ).tolist()
+
+    def test_npz(self) -> None:
+        self.assertEqual(export_npz(self.path("matrix.npz")), 3)
+        loaded = sparse.load_npz(self.path("matrix.npz"))
+        self.assertEqual((loaded != self.matrix.csr).nnz, 0)
+        source_ids = np.load(self.path("matrix.npz"))["source_ids"]
+        self.assertEqual(source_ids.tolist(), self.matrix.source_ids.tolist())
+
+        with open(self.path("matrix.npz") + SOURCE_INDEX_SUFFIX) as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(
+            [row["source_id"] for row in rows], [str(pk) for pk in source_ids],
+        )
+        self.assertEqual(rows[0]["type"], "BK")
+        self.assertEqual(rows[0]["journal"], "")
+        self.assertEqual(rows[1]["journal"], self.article.source_journal.name)
+
+    def test_npz_extension(self) -> None:
+        """
+        Verify that the source index is named after the archive NumPy
+        writes when the path has no '.npz' extension.
+        """
+        export_npz(self.path("matrix"))
+        self.assertEqual(
+            sorted(os.listdir(self.directory.name)),
+            ["matrix.npz", "matrix.npz" + SOURCE_INDEX_SUFFIX],
+        )
+
+    def test_matrix_market(self) -> None:
+        self.assertEqual(export_matrix_market(self.path("matrix.mtx")), 3)
+        loaded = sparse.csr_matrix(io.mmread(self.path("matrix.mtx")))
+        self.assertEqual((loaded != self.matrix.csr).nnz, 0)
+
+    def test_columnar(self) -> None:
+        self.assertEqual(export_columnar(self.path("columns")), 3)
+        self.assertEqual(
+            sorted(zip(self.column("referrer"), self.column("reference"))),
+            [
+                (self.article.pk, self.book.pk),
+                (self.other.pk, self.book.pk),
+                (self.other.pk, self.article.pk),
+            ],
+        )
+        self.assertEqual(
+            self.column("source_id"),
+            [self.book.pk, self.article.pk, self.other.pk],
+        )
+        self.assertEqual(self.column("type"), [b"BK", b"AR", b"AR"])
+        self.assertEqual(
+            self.column("journal_id"),
+            [-1, self.article.source_journal_id, self.other.source_journal_id],
+        )
+        self.assertEqual(
+            self.column("year_of_publication")[0],
+            self.book.year_of_publication,
+        )
+
+    def test_command(self) -> None:
+        output = StringIO()
+        call_command(
+            "export_matrix",
+            self.path("matrix.mtx"),
+            format="mtx",
+            stdout=output,
+        )
+        self.assertIn("Exported 3 references", output.getvalue())
+        self.assertTrue(os.path.exists(self.path("matrix.mtx")))
@@ -0,0 +1,44 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from database.graph_generator import generate_citation_edges
+
+
+class TestGenerateCitationEdges(SimpleTestCase):
+    def setUp(self) -> None:
+        rng: np.random.Generator = np.random.default_rng(0)
+        self.source_ids: np.ndarray = np.arange(1, 2001)
+        self.years: np.ndarray = rng.integers(1950, 2021, len(self.source_ids))
+
+    def generate(self, seed: int) -> np.ndarray:
+        return generate_citation_edges(
+            self.source_ids, self.years, 20000, np.random.default_rng(seed)
+        )
+
+    def test_reproducible(self) -> None:
+        """ Verify that the same seed results in the same edges. """
+        self.assertTrue(np.array_equal(self.generate(1), self.generate(1)))
+        self.assertFalse(np.array_equal(self.generate(1), self.generate(2)))
+
+    def test_citations_point_backwards(self) -> None:
+        """ Verify that sources only cite sources from an earlier year. """
+        edges: np.ndarray = self.generate(1)
+        year_of: np.ndarray = np.zeros(self.source_ids.max() + 1, dtype=int)
+        year_of[self.source_ids] = self.years
+        self.assertTrue(np.all(year_of[edges[:, 0]] > year_of[edges[:, 1]]))
+
+    def test_no_duplicates(self) -> None:
+        edges: np.ndarray = self.generate(1)
+        self.assertEqual(len(np.unique(edges, axis=0)), len(edges))
+
+    def test_skewed_in_degree(self) -> None:
+        """ Verify that preferential attachment creates highly cited hubs """
+        edges: np.ndarray = self.generate(1)
+        in_degree: np.ndarray = np.bincount(edges[:, 1])
+        self.assertGreater(in_degree.max(), 10 * in_degree.mean())
+
+    def test_empty(self) -> None:
+        edges: np.ndarray = generate_citation_edges(
+            [], [], 10, np.random.default_rng(0)
+        )
+        self.assertEqual(edges.shape, (0, 2))
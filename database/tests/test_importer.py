@@ -0,0 +1,231 @@
+import os
+import tempfile
+from io import StringIO
+from typing import List
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from database.bibliography import Record, parse, parse_name
+from database.factories import AuthorFactory, JournalFactory
+from database.importer import UNKNOWN_PUBLISHER, BibliographyImporter
+from database.models import (
+    Author,
+    Journal,
+    PendingReference,
+    Publisher,
+    Reference,
+    Source,
+)
+
+
+BIBTEX: str = """
+% A comment line
+@article{turing1950,
+  author = {Turing, Alan Mathison},
+  title = {Computing Machinery and {Intelligence}},
+  journal = "Mind",
+  publisher = {Oxford University Press},
+  year = 1950,
+  pages = {433--460},
+  cites = {shannon1948}
+}
+
+@book{shannon1948,
+  author = {Claude E. Shannon and Warren Weaver},
+  title = {The Mathematical Theory of Communication},
+  publisher = {University of Illinois Press},
+  address = {Urbana},
+  year = {1949}
+}
+"""
+
+RIS: str = """TY  - JOUR
+ID  - hopper1952
+AU  - Hopper, Grace Murray
+TI  - The education of a computer
+T2  - Mind
+PY  - 1952/01/01
+SP  - 243
+EP  - 249
+CR  - turing1950
+CR  - missing1900
+ER  -
+"""
+
+CSV: str = """key,title,year,authors,journal,publisher,pages,cites
+lovelace1843,Sketch of the analytical engine,1843,"Lovelace, Ada",,Taylor,,
+babbage1864,Passages from the life of a philosopher,1864,Charles Babbage,,Longman,,lovelace1843;turing1950
+"""
+
+
+class TestParsers(SimpleTestCase):
+    def test_parse_name(self) -> None:
+        self.assertEqual(
+            parse_name("Turing, Alan Mathison"), ("Alan", "Mathison", "Turing")
+        )
+        self.assertEqual(
+            parse_name("Claude E. Shannon"), ("Claude", "E.", "Shannon")
+        )
+        self.assertEqual(parse_name("Plato"), (None, None, "Plato"))
+        self.assertIsNone(parse_name("  "))
+
+    def test_bibtex(self) -> None:
+        turing, shannon = parse(StringIO(BIBTEX), "bibtex")
+        self.assertEqual(
+            turing,
+            Record(
+                key="turing1950",
+                title="Computing Machinery and Intelligence",
+                year=1950,
+                authors=[("Alan", "Mathison", "Turing")],
+                journal="Mind",
+                publisher="Oxford University Press",
+                pages=(433, 460),
+                cites=["shannon1948"],
+            ),
+        )
+        self.assertEqual(
+            shannon.authors,
+            [("Claude", "E.", "Shannon"), ("Warren", None, "Weaver")],
+        )
+        self.assertEqual(shannon.city, "Urbana")
+        self.assertEqual(shannon.year, 1949)
+
+    def test_ris(self) -> None:
+        [hopper] = parse(StringIO(RIS), "ris")
+        self.assertEqual(hopper.key, "hopper1952")
+        self.assertEqual(hopper.authors, [("Grace", "Murray", "Hopper")])
+        self.assertEqual(hopper.year, 1952)
+        self.assertEqual(hopper.journal, "Mind")
+        self.assertEqual(hopper.pages, (243, 249))
+        self.assertEqual(hopper.cites, ["turing1950", "missing1900"])
+
+    def test_csv(self) -> None:
+        lovelace, babbage = parse(StringIO(CSV), "csv")
+        self.assertEqual(lovelace.authors, [("Ada", None, "Lovelace")])
+        self.assertIsNone(lovelace.journal)
+        self.assertEqual(babbage.cites, ["lovelace1843", "turing1950"])
+
+    def test_missing_key(self) -> None:
+        [first] = parse(StringIO("title,year\nUntitled,2000\n"), "csv")
+        [second] = parse(StringIO("title,year\nUntitled,2000\n"), "csv")
+        self.assertTrue(first.key.startswith("sha1:"))
+        self.assertEqual(first.key, second.key)
+
+
+class TestImporter(TestCase):
+    def import_text(self, text: str, format: str, batch_size: int = 2):
+        return BibliographyImporter(batch_size).import_records(
+            parse(StringIO(text), format)
+        )
+
+    def references(self) -> List[tuple]:
+        return sorted(
+            Reference.objects.values_list(
+                "referrer__citation_key", "reference__citation_key"
+            )
+        )
+
+    def test_import(self) -> None:
+        journal: Journal = JournalFactory(name="MIND")
+        author: Author = AuthorFactory(
+            first_name="alan", middle_name="mathison", last_name="turing"
+        )
+        stats = self.import_text(BIBTEX + RIS, "bibtex")
+        self.assertEqual(stats["sources"], 2)
+        self.import_text(RIS, "ris")
+        self.import_text(CSV, "csv")
+
+        turing: Source = Source.objects.get(citation_key="turing1950")
+        self.assertEqual(turing.type, "AR")
+        self.assertEqual(turing.source_journal, journal)
+        self.assertEqual(list(turing.authors.all()), [author])
+        shannon: Source = Source.objects.get(citation_key="shannon1948")
+        self.assertEqual(shannon.type, "BK")
+        self.assertEqual(shannon.source_publisher.city, "Urbana")
+        self.assertEqual(shannon.authors.count(), 2)
+        self.assertEqual(
+            list(shannon.authors.values_list("blocking_key", flat=True)),
+            ["shannon:c", "weaver:w"],
+        )
+        self.assertTrue(
+            Publisher.objects.filter(name="Taylor").exists()
+            and Publisher.objects.filter(name="Longman").exists()
+        )
+
+        self.assertEqual(
+            self.references(),
+            [
+                ("babbage1864", "lovelace1843"),
+                ("babbage1864", "turing1950"),
+                ("hopper1952", "turing1950"),
+                ("turing1950", "shannon1948"),
+            ],
+        )
+        self.assertEqual(
+            list(PendingReference.objects.values_list("reference_key")),
+            [("missing1900",)],
+        )
+        self.assertEqual(Source.objects.get(pk=turing.pk).times_cited, 2)
+
+    def test_resume(self) -> None:
+        """
+        Verify that importing the same file again only adds the records
+        that are missing.
+        """
+        self.import_text(CSV, "csv")
+        Source.objects.filter(citation_key="babbage1864").delete()
+        stats = self.import_text(CSV, "csv")
+        self.assertEqual(stats["existing"], 1)
+        self.assertEqual(stats["sources"], 1)
+        self.assertEqual(stats["authors"], 0)
+        self.assertEqual(Source.objects.count(), 2)
+        self.assertEqual(self.references(), [("babbage1864", "lovelace1843")])
+
+    def test_long_keys(self) -> None:
+        """
+        Verify that keys longer than the stored ones are recognized once
+        imported, and that references truncated to the citing key, or to
+        existing references, are not inserted.
+        """
+        long_key: str = "k" * 250
+        records: List[Record] = [
+            Record(long_key, "First", 2000, [], cites=[long_key + "x"]),
+            Record("other", "Second", 2001, [], cites=[long_key]),
+        ]
+        BibliographyImporter().import_records(records)
+        self.assertEqual(Reference.objects.count(), 1)
+        PendingReference.objects.create(
+            referrer=Source.objects.get(citation_key="other"),
+            reference_key=long_key[:200],
+        )
+        stats = BibliographyImporter().import_records(records)
+        self.assertEqual(stats["existing"], 2)
+        self.assertEqual(stats["references"], 0)
+        self.assertEqual(Reference.objects.count(), 1)
+
+    def test_invalid_records(self) -> None:
+        stats = self.import_text(
+            "title,year,journal,pages\n"
+            ",2000,,\n"
+            "No year,,,\n"
+            "Backwards pages,2000,Some journal,20-10\n",
+            "csv",
+        )
+        self.assertEqual(stats["skipped"], 2)
+        source: Source = Source.objects.get()
+        self.assertIsNone(source.journal_page_range_start)
+        self.assertEqual(
+            source.source_journal.journal_publisher.name, UNKNOWN_PUBLISHER
+        )
+
+    def test_command(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, "sources.bib")
+            with open(path, "w") as file:
+                file.write(BIBTEX)
+            output = StringIO()
+            call_command("import_bibliography", path, stdout=output)
+        self.assertIn("2 sources", output.getvalue())
+        self.assertEqual(self.references(), [("turing1950", "shannon1948")])
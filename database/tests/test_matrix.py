@@ -0,0 +1,60 @@
+from typing import List
+
+from django.test import TestCase
+
+from database.factories import ReferenceFactory, SourceFactory
+from database.matrix import CitationMatrix, UnknownSourceError
+from database.models import Source
+
+
+class TestCitationMatrix(TestCase):
+    def setUp(self) -> None:
+        self.sources: List[Source] = [SourceFactory() for x in range(4)]
+        a, b, c, d = self.sources
+        # a cites b and c, b cites c, d is not connected
+        ReferenceFactory(referrer=a, reference=b)
+        ReferenceFactory(referrer=a, reference=c)
+        ReferenceFactory(referrer=b, reference=c)
+
+    def test_from_database(self) -> None:
+        matrix: CitationMatrix = CitationMatrix.from_database()
+        self.assertEqual(matrix.shape, (4, 4))
+        self.assertEqual(matrix.nnz, 3)
+        self.assertEqual(
+            matrix.source_ids.tolist(),
+            sorted(source.pk for source in self.sources),
+        )
+
+    def test_index_mapping(self) -> None:
+        matrix: CitationMatrix = CitationMatrix.from_database()
+        ids: List[int] = [source.pk for source in self.sources]
+        self.assertEqual(matrix.ids_of(matrix.index_of(ids)).tolist(), ids)
+        with self.assertRaises(UnknownSourceError):
+            matrix.index_of([max(ids) + 1])
+
+    def test_row_and_column_slices(self) -> None:
+        a, b, c, d = self.sources
+        matrix: CitationMatrix = CitationMatrix.from_database()
+        self.assertEqual(sorted(matrix.cites(a.pk)), sorted([b.pk, c.pk]))
+        self.assertEqual(matrix.cites(c.pk).tolist(), [])
+        self.assertEqual(sorted(matrix.cited_by(c.pk)), sorted([a.pk, b.pk]))
+        self.assertEqual(matrix.cited_by(d.pk).tolist(), [])
+        self.assertEqual(
+            matrix.csr[matrix.index_of([b.pk])[0], matrix.index_of([c.pk])[0]],
+            1,
+        )
+
+    def test_degrees(self) -> None:
+        a, b, c, d = self.sources
+        matrix: CitationMatrix = CitationMatrix.from_database()
+        indexes = matrix.index_of([a.pk, b.pk, c.pk, d.pk])
+        self.assertEqual(matrix.out_degree()[indexes].tolist(), [2, 1, 0, 0])
+        self.assertEqual(matrix.in_degree()[indexes].tolist(), [0, 1, 2, 0])
+
+    def test_restricted_to_sources(self) -> None:
+        a, b, c, d = self.sources
+        matrix: CitationMatrix = CitationMatrix.from_database(
+            sources=Source.objects.filter(pk__in=[a.pk, b.pk])
+        )
+        self.assertEqual(matrix.shape, (2, 2))
+        self.assertEqual(matrix.cites(a.pk).tolist(), [b.pk])
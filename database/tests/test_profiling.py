@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from database import profiling
+from database.factories import SourceFactory, UserFactory
+from database.models import Source, User
+from database.profiling import QueryProfilingMiddleware, record_queries
+
+
+class TestRecordQueries(TestCase):
+    def setUp(self) -> None:
+        profiling.recent_profiles.clear()
+
+    def test_counts_and_duplicates(self) -> None:
+        sources = [SourceFactory() for x in range(3)]
+        with self.assertLogs("database.profiling") as logs:
+            with record_queries("n+1") as profile:
+                for source in Source.objects.order_by("pk"):
+                    source.source_journal.name
+                list(Source.objects.filter(pk__in=[s.pk for s in sources]))
+        self.assertEqual(profile.count, 5)
+        duplicates = profile.duplicates()
+        self.assertEqual(len(duplicates), 1)
+        self.assertEqual(duplicates[0]["count"], 3)
+        self.assertIn("database_journal", duplicates[0]["sql"])
+        self.assertEqual(len(profile.slowest(2)), 2)
+
+        summary = profiling.recent_profiles[-1]
+        self.assertEqual(summary["label"], "n+1")
+        self.assertEqual(summary["queries"], 5)
+        self.assertIn('"queries": 5', logs.output[0])
+
+    def test_normalize(self) -> None:
+        self.assertEqual(
+            profiling.normalize(
+                "SELECT 1 FROM t WHERE a IN (%s, %s, %s) AND b = 'x'"
+            ),
+            "SELECT ? FROM t WHERE a IN (%s...) AND b = ?",
+        )
+
+    @override_settings(QUERY_PROFILING=True)
+    def test_command_phases(self) -> None:
+        with self.assertLogs("database.profiling"):
+            call_command(
+                "generate_dummy_data",
+                scale=1,
+                batch_size=50,
+                stdout=StringIO(),
+            )
+        labels = [summary["label"] for summary in profiling.recent_profiles]
+        self.assertIn("generate_dummy_data: references", labels)
+
+
+class TestQueryProfilingMiddleware(TestCase):
+    def setUp(self) -> None:
+        profiling.recent_profiles.clear()
+        self.superuser: User = UserFactory(is_super=True)
+        self.client.force_login(self.superuser)
+
+    def test_disabled_by_default(self) -> None:
+        with self.assertRaises(profiling.MiddlewareNotUsed):
+            QueryProfilingMiddleware(lambda request: None)
+        response = self.client.get(reverse("query_profile"))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(QUERY_PROFILING=True)
+    def test_records_requests(self) -> None:
+        with self.assertLogs("database.profiling"):
+            response = self.client.get(
+                reverse("admin:database_source_changelist")
+            )
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertEqual(
+            profiling.recent_profiles[-1]["label"],
+            "GET " + reverse("admin:database_source_changelist"),
+        )
+        with self.assertLogs("database.profiling"):
+            response = self.client.get(reverse("query_profile"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "GET /admin/database/source/")
@@ -0,0 +1,92 @@
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase
+
+from database.factories import ReferenceFactory, SourceFactory
+from database.models import Reference, Source
+from database.reference_cleanup import (
+    find_invalid_references,
+    remove_invalid_references,
+)
+
+
+class TestReferenceConstraints(TestCase):
+    def setUp(self) -> None:
+        self.referrer: Source = SourceFactory()
+        self.reference: Source = SourceFactory()
+        ReferenceFactory(referrer=self.referrer, reference=self.reference)
+
+    def test_database_constraints(self) -> None:
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ReferenceFactory(referrer=self.referrer, reference=self.reference)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ReferenceFactory(referrer=self.referrer, reference=self.referrer)
+
+    def test_clean(self) -> None:
+        with self.assertRaisesMessage(ValidationError, "already exists"):
+            Reference(referrer=self.referrer, reference=self.reference).clean()
+        with self.assertRaisesMessage(ValidationError, "cite itself"):
+            Reference(referrer=self.referrer, reference=self.referrer).clean()
+        Reference(referrer=self.reference, reference=self.referrer).clean()
+
+
+@skipUnless(connection.vendor == "sqlite", "Rebuilds the SQLite table")
+class TestRemoveInvalidReferences(TransactionTestCase):
+    """
+    Runs on a Reference table rebuilt without its constraints, like the
+    tables the migration adding them has to clean up.
+    """
+
+    def rebuild_table(self, constraints) -> None:
+        with mock.patch.object(
+            Reference._meta, "constraints", constraints
+        ), connection.schema_editor() as editor:
+            editor._remake_table(Reference)
+
+    def setUp(self) -> None:
+        self.rebuild_table([])
+        self.addCleanup(self.rebuild_table, Reference._meta.constraints)
+        self.first: Source = SourceFactory()
+        self.second: Source = SourceFactory()
+        self.kept: Reference = ReferenceFactory(
+            referrer=self.first, reference=self.second
+        )
+        ReferenceFactory(referrer=self.first, reference=self.second)
+        ReferenceFactory(referrer=self.first, reference=self.second)
+        ReferenceFactory(referrer=self.second, reference=self.second)
+        ReferenceFactory(referrer=self.second, reference=self.first)
+
+    def test_remove(self) -> None:
+        invalid = find_invalid_references()
+        self.assertEqual(invalid.duplicates, 2)
+        self.assertEqual(invalid.self_citations, 1)
+        self.assertEqual(invalid.source_ids, {self.first.pk, self.second.pk})
+        self.assertEqual(Source.objects.get(pk=self.second.pk).times_cited, 4)
+
+        self.assertEqual(remove_invalid_references(), invalid)
+        self.assertCountEqual(
+            Reference.objects.values_list("pk", "referrer", "reference"),
+            [
+                (self.kept.pk, self.first.pk, self.second.pk),
+                (self.kept.pk + 4, self.second.pk, self.first.pk),
+            ],
+        )
+        second: Source = Source.objects.get(pk=self.second.pk)
+        self.assertEqual((second.times_cited, second.references_made), (1, 1))
+        self.assertEqual(find_invalid_references().source_ids, set())
+
+    def test_command(self) -> None:
+        output = StringIO()
+        call_command("deduplicate_references", "--dry-run", stdout=output)
+        self.assertIn("Found 2 duplicated references", output.getvalue())
+        self.assertEqual(Reference.objects.count(), 5)
+        call_command("deduplicate_references", stdout=output)
+        self.assertIn(
+            "Removed 2 duplicated references and 1 self-citations",
+            output.getvalue(),
+        )
+        self.assertEqual(Reference.objects.count(), 2)
@@ -0,0 +1,126 @@
+from io import StringIO
+from typing import List
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from database import search
+from database.bulk import bulk_insert
+from database.factories import (
+    AuthorFactory,
+    EvaluationFactory,
+    SourceFactory,
+    UserFactory,
+)
+from database.models import Author, Source, User
+
+
+def indexed_ids() -> List[int]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid FROM {} ORDER BY rowid".format(search.SEARCH_TABLE)
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def found(terms: str) -> List[Source]:
+    return list(Source.objects.search(terms))
+
+
+class TestSearch(TestCase):
+    def setUp(self) -> None:
+        self.author: Author = AuthorFactory(
+            first_name="Ada", middle_name=None, last_name="Lovelace"
+        )
+        self.engine: Source = SourceFactory(
+            title="Sketch of the analytical engine",
+            abstract="Notes on a calculating machine",
+            authors=[self.author],
+        )
+        self.tables: Source = SourceFactory(
+            title="Tables of logarithms",
+            abstract="An analytical treatment of logarithms and engines",
+            authors=[],
+        )
+
+    def test_ranks_title_matches_first(self) -> None:
+        self.assertEqual(
+            found("engine analytical"), [self.engine, self.tables]
+        )
+
+    def test_matches_prefixes_and_authors(self) -> None:
+        self.assertEqual(found("calc"), [self.engine])
+        self.assertEqual(found("lovelace"), [self.engine])
+        self.assertEqual(found('"*!'), [])
+
+    def test_index_follows_changes(self) -> None:
+        self.tables.title = "Difference engine"
+        self.tables.save()
+        self.assertEqual(found("difference"), [self.tables])
+
+        self.tables.authors.add(self.author)
+        self.assertCountEqual(found("lovelace"), [self.engine, self.tables])
+        self.author.sources.remove(self.engine)
+        self.assertEqual(found("lovelace"), [self.tables])
+
+        self.author.last_name = "Byron"
+        self.author.save()
+        self.assertEqual(found("byron"), [self.tables])
+        self.author.delete()
+        self.assertEqual(found("byron"), [])
+
+        self.engine.delete()
+        self.assertEqual(indexed_ids(), [self.tables.pk])
+
+    def test_reverse_clear(self) -> None:
+        self.author.sources.clear()
+        self.assertEqual(found("lovelace"), [])
+
+    def test_bulk_insert(self) -> None:
+        source: Source = SourceFactory.build(
+            title="Bulk inserted", source_journal=self.engine.source_journal
+        )
+        bulk_insert(Source, [source])
+        bulk_insert(
+            Source.authors.through,
+            [Source.authors.through(source=source, author=self.author)],
+        )
+        self.assertEqual(found("bulk lovelace"), [source])
+
+    def test_rebuild_index(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM {}".format(search.SEARCH_TABLE))
+        self.assertEqual(found("engine"), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(indexed_ids(), [self.engine.pk, self.tables.pk])
+        self.assertEqual(found("engine"), [self.engine, self.tables])
+
+
+class TestAdminSearch(TestCase):
+    def setUp(self) -> None:
+        self.superuser: User = UserFactory(is_super=True)
+        self.client.force_login(self.superuser)
+
+    def test_source_changelist(self) -> None:
+        engine: Source = SourceFactory(title="Analytical engine")
+        SourceFactory(title="Something else", abstract="Unrelated")
+        response = self.client.get(
+            reverse("admin:database_source_changelist"), {"q": "analytical"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["cl"].result_list), [engine])
+
+    def test_evaluation_changelist(self) -> None:
+        author: Author = AuthorFactory(last_name="Lovelace")
+        source: Source = SourceFactory(authors=[author])
+        evaluation = EvaluationFactory(source=source)
+        EvaluationFactory()
+        response = self.client.get(
+            reverse("admin:database_evaluation_changelist"), {"q": "lovelace"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context["cl"].result_list), [evaluation]
+        )
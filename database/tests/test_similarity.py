@@ -0,0 +1,118 @@
+from io import StringIO
+from typing import Dict, List, Tuple
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from database import parallel
+from database.factories import ReferenceFactory, SourceFactory
+from database.models import SimilarityComputation, Source, SourceSimilarity
+from database.similarity import (
+    BIBLIOGRAPHIC_COUPLING,
+    CO_CITATION,
+    compute_similarities,
+)
+
+
+class TestSimilarities(TestCase):
+    def setUp(self) -> None:
+        self.sources: List[Source] = [SourceFactory() for x in range(5)]
+        a, b, c, d, e = self.sources
+        # a and b both cite c and d, e only cites c
+        for referrer, reference in ((a, c), (a, d), (b, c), (b, d), (e, c)):
+            ReferenceFactory(referrer=referrer, reference=reference)
+
+    def stored(self, kind: str) -> Dict[Tuple[int, int], int]:
+        return {
+            (
+                similarity.source_id,
+                similarity.neighbour_id,
+            ): similarity.strength
+            for similarity in SourceSimilarity.objects.filter(kind=kind)
+        }
+
+    def test_co_citation(self) -> None:
+        a, b, c, d, e = self.sources
+        compute_similarities(CO_CITATION)
+        # c and d are both cited by a and b
+        self.assertEqual(
+            self.stored(CO_CITATION), {(c.pk, d.pk): 2, (d.pk, c.pk): 2}
+        )
+
+    def test_bibliographic_coupling(self) -> None:
+        a, b, c, d, e = self.sources
+        compute_similarities(BIBLIOGRAPHIC_COUPLING)
+        self.assertEqual(
+            self.stored(BIBLIOGRAPHIC_COUPLING),
+            {
+                (a.pk, b.pk): 2,
+                (b.pk, a.pk): 2,
+                (a.pk, e.pk): 1,
+                (e.pk, a.pk): 1,
+                (b.pk, e.pk): 1,
+                (e.pk, b.pk): 1,
+            },
+        )
+
+    def test_top_k(self) -> None:
+        a, b, c, d, e = self.sources
+        compute_similarities(BIBLIOGRAPHIC_COUPLING, k=1)
+        # The strongest neighbour is kept
+        self.assertEqual(
+            self.stored(BIBLIOGRAPHIC_COUPLING),
+            {(a.pk, b.pk): 2, (b.pk, a.pk): 2, (e.pk, a.pk): 1},
+        )
+
+    def test_incremental_refresh(self) -> None:
+        """
+        Verify that refreshing after new references gives the same result
+        as a full computation, and only touches the affected sources.
+        """
+        a, b, c, d, e = self.sources
+        for kind in (CO_CITATION, BIBLIOGRAPHIC_COUPLING):
+            compute_similarities(kind)
+        ReferenceFactory(referrer=e, reference=d)
+        ReferenceFactory(referrer=d, reference=c)
+        self.assertEqual(compute_similarities(CO_CITATION), 2)
+        self.assertEqual(compute_similarities(BIBLIOGRAPHIC_COUPLING), 12)
+        incremental = {
+            kind: self.stored(kind)
+            for kind in (CO_CITATION, BIBLIOGRAPHIC_COUPLING)
+        }
+        for kind in (CO_CITATION, BIBLIOGRAPHIC_COUPLING):
+            compute_similarities(kind, full=True)
+            self.assertEqual(incremental[kind], self.stored(kind))
+        self.assertEqual(
+            SimilarityComputation.objects.get(kind=CO_CITATION).top_k, 20
+        )
+
+    def test_command(self) -> None:
+        call_command("compute_similarities", top_k=5, stdout=StringIO())
+        self.assertTrue(
+            SourceSimilarity.objects.filter(kind=CO_CITATION).exists()
+        )
+        self.assertTrue(
+            SourceSimilarity.objects.filter(
+                kind=BIBLIOGRAPHIC_COUPLING
+            ).exists()
+        )
+
+    def test_max_shared_degree(self) -> None:
+        """ Verify that hubs are ignored as shared sources. """
+        a, b, c, d, e = self.sources
+        # c is cited 3 times, so only d links a and b
+        compute_similarities(BIBLIOGRAPHIC_COUPLING, max_shared_degree=2)
+        self.assertEqual(
+            self.stored(BIBLIOGRAPHIC_COUPLING),
+            {(a.pk, b.pk): 1, (b.pk, a.pk): 1},
+        )
+
+    @skipUnless(parallel.is_supported(), "Needs shared memory")
+    def test_workers(self) -> None:
+        """ Verify that blocks computed by worker processes are merged. """
+        for kind in (CO_CITATION, BIBLIOGRAPHIC_COUPLING):
+            compute_similarities(kind, block_size=2)
+            sequential = self.stored(kind)
+            compute_similarities(kind, full=True, block_size=2, workers=2)
+            self.assertEqual(self.stored(kind), sequential)
@@ -0,0 +1,121 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from database import api
+from database.factories import ReferenceFactory, SourceFactory
+from database.matrix import CitationMatrix
+from database.models import Source, TableVersion
+from database.snapshot import (
+    GraphSnapshot,
+    SnapshotError,
+    current_matrix,
+    load_snapshot,
+    write_snapshot,
+)
+from database.versions import GENERATION
+
+
+class TestSnapshot(TestCase):
+    def setUp(self) -> None:
+        api.clear_matrix()
+        self.book: Source = SourceFactory(book=True, year_of_publication=1990)
+        self.article: Source = SourceFactory(
+            article=True, year_of_publication=2000
+        )
+        self.other: Source = SourceFactory(article=True)
+        ReferenceFactory(referrer=self.article, reference=self.book)
+        ReferenceFactory(referrer=self.other, reference=self.book)
+        ReferenceFactory(referrer=self.other, reference=self.article)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path: str = os.path.join(self.directory.name, "graph.bin")
+
+    def test_round_trip(self) -> None:
+        header = write_snapshot(self.path)
+        self.assertEqual((header["sources"], header["citations"]), (3, 3))
+        snapshot: GraphSnapshot = GraphSnapshot(self.path)
+        self.assertEqual(
+            snapshot.arrays["source_ids"].tolist(),
+            [self.book.pk, self.article.pk, self.other.pk],
+        )
+        self.assertEqual(snapshot.arrays["years"].tolist()[:2], [1990, 2000])
+        self.assertEqual(snapshot.types.tolist(), ["BK", "AR", "AR"])
+        self.assertEqual(
+            snapshot.arrays["journal_ids"].tolist(),
+            [-1, self.article.source_journal_id, self.other.source_journal_id],
+        )
+        self.assertFalse(snapshot.arrays["indices"].flags.writeable)
+        self.assertEqual(
+            snapshot.cites(self.other.pk).tolist(),
+            [self.book.pk, self.article.pk],
+        )
+        self.assertEqual(
+            snapshot.cited_by(self.book.pk).tolist(),
+            [self.article.pk, self.other.pk],
+        )
+        with self.assertRaises(KeyError):
+            snapshot.cites(self.other.pk + 1)
+
+        expected: CitationMatrix = CitationMatrix.from_database()
+        matrix: CitationMatrix = snapshot.citation_matrix()
+        self.assertEqual((matrix.csr != expected.csr).nnz, 0)
+        self.assertEqual(
+            matrix.in_degree().tolist(), expected.in_degree().tolist()
+        )
+
+    def test_invalid_file(self) -> None:
+        with open(self.path, "wb") as file:
+            file.write(b"not a snapshot at all")
+        with self.assertRaises(SnapshotError):
+            GraphSnapshot(self.path)
+
+    def test_reloaded_when_replaced(self) -> None:
+        write_snapshot(self.path)
+        first: GraphSnapshot = load_snapshot(self.path)
+        self.assertIs(load_snapshot(self.path), first)
+        ReferenceFactory(referrer=self.article, reference=self.other)
+        write_snapshot(self.path)
+        os.utime(self.path, (0, 0))
+        second: GraphSnapshot = load_snapshot(self.path)
+        self.assertEqual(second.header["citations"], 4)
+        # The previous mapping is still readable.
+        self.assertEqual(len(first.arrays["indices"]), 3)
+
+    def test_used_by_api_when_current(self) -> None:
+        with self.settings(GRAPH_SNAPSHOT_PATH=self.path):
+            call_command("snapshot_graph", stdout=StringIO())
+            versions = api.current_versions()
+            with self.assertNumQueries(0):
+                matrix: CitationMatrix = api.current_matrix(versions)
+            self.assertEqual(matrix.nnz, 3)
+
+            ReferenceFactory(referrer=self.article, reference=self.other)
+            api.clear_matrix()
+            matrix = api.current_matrix(api.current_versions())
+            self.assertEqual(matrix.nnz, 4)
+
+    def test_not_current_for_other_database(self) -> None:
+        with self.settings(GRAPH_SNAPSHOT_PATH=self.path):
+            call_command("snapshot_graph", stdout=StringIO())
+            versions = api.current_versions()
+            self.assertIsNotNone(current_matrix(versions))
+
+            # A reset database starts a new generation, even if its table
+            # versions happen to be equal.
+            TableVersion.objects.filter(table=GENERATION).delete()
+            self.assertIsNone(current_matrix(api.current_versions()))
+            with mock.patch.dict(
+                connection.settings_dict, {"NAME": "other.sqlite3"}
+            ):
+                self.assertIsNone(current_matrix(versions))
+
+    def test_command(self) -> None:
+        output = StringIO()
+        call_command("snapshot_graph", self.path, stdout=output)
+        self.assertIn("Wrote 3 sources and 3 citations", output.getvalue())
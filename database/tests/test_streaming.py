@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from database import citation_styles, streaming
+from database.factories import JournalFactory, ReferenceFactory, SourceFactory
+from database.models import Journal, Source
+
+
+class TestStreaming(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.journal: Journal = JournalFactory()
+        self.first: Source = SourceFactory(source_journal=self.journal)
+        self.second: Source = SourceFactory(source_journal=self.journal)
+        self.third: Source = SourceFactory()
+        ReferenceFactory(referrer=self.first, reference=self.second)
+        ReferenceFactory(referrer=self.third, reference=self.second)
+
+    def get_lines(self, url: str):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_encode_chunks(self) -> None:
+        chunks = list(streaming.encode_chunks(["ab", "cd", "e"], 3))
+        self.assertEqual(chunks, [b"abcd", b"e"])
+        self.assertEqual(list(streaming.encode_chunks([], 3)), [])
+
+    def test_edges(self) -> None:
+        self.assertEqual(
+            self.get_lines(reverse("stream_edges")),
+            [
+                "referrer_id,reference_id",
+                "{},{}".format(self.first.pk, self.second.pk),
+                "{},{}".format(self.third.pk, self.second.pk),
+            ],
+        )
+
+    def test_matrix(self) -> None:
+        url: str = reverse("stream_matrix")
+        self.assertEqual(
+            self.get_lines(url + "?journal={}".format(self.journal.pk)),
+            [
+                "referrer_id,reference_id",
+                "{},{}".format(self.first.pk, self.second.pk),
+            ],
+        )
+        response = self.client.get(url + "?journal=x")
+        self.assertEqual(response.status_code, 400)
+
+    def test_bibliography(self) -> None:
+        url: str = reverse("stream_bibliography")
+        expected = citation_styles.render(
+            Source.objects.filter(source_journal=self.journal).order_by("pk"),
+            citation_styles.MLA,
+        )
+        self.assertEqual(
+            self.get_lines(
+                url + "?style=mla&journal={}".format(self.journal.pk)
+            ),
+            [expected[self.first.pk], expected[self.second.pk]],
+        )
+        response = self.client.get(url + "?style=unknown")
+        self.assertEqual(response.status_code, 400)
+
+    def test_cancelled(self) -> None:
+        """
+        Verify that closing the response before the end, as the server does
+        when the client disconnects, closes the rows and is logged.
+        """
+        with mock.patch.object(streaming, "CHUNK_BYTES", 1):
+            response = self.client.get(reverse("stream_edges"))
+            content = iter(response.streaming_content)
+            self.assertEqual(next(content), b"referrer_id,reference_id\n")
+            with self.assertLogs("database.streaming", "INFO") as logs:
+                response.close()
+        self.assertIn("cancelled after 25 bytes", logs.output[0])
+        self.assertEqual(list(content), [])
+
+    def test_pages(self) -> None:
+        """ Verify that pages are chained when they are full. """
+        with mock.patch.object(streaming, "PAGE_ROWS", 1):
+            self.assertEqual(len(self.get_lines(reverse("stream_edges"))), 3)
+        with mock.patch.object(streaming, "MAX_IDS_PER_QUERY", 1):
+            self.assertEqual(
+                len(self.get_lines(reverse("stream_bibliography"))), 3
+            )
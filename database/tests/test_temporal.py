@@ -0,0 +1,130 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from database import temporal
+from database.factories import JournalFactory, ReferenceFactory, SourceFactory
+from database.models import (
+    Journal,
+    JournalYearMetrics,
+    Reference,
+    Source,
+    SourceYearCitations,
+    YearCitationFlow,
+)
+from database.temporal import compute_temporal_metrics
+
+
+class TestTemporalMetrics(TestCase):
+    def setUp(self) -> None:
+        self.journal: Journal = JournalFactory()
+        self.old: Source = SourceFactory(
+            source_journal=self.journal, year_of_publication=2000
+        )
+        self.recent: Source = SourceFactory(
+            source_journal=self.journal, year_of_publication=2001
+        )
+        self.book: Source = SourceFactory(book=True, year_of_publication=2002)
+        self.citing: Source = SourceFactory(
+            source_journal=self.journal, year_of_publication=2002
+        )
+        ReferenceFactory(referrer=self.recent, reference=self.old)
+        ReferenceFactory(referrer=self.book, reference=self.old)
+        ReferenceFactory(referrer=self.book, reference=self.recent)
+        ReferenceFactory(referrer=self.citing, reference=self.old)
+
+    def flows(self):
+        return set(
+            YearCitationFlow.objects.values_list(
+                "citing_year", "cited_year", "citations"
+            )
+        )
+
+    def metrics(self, year: int) -> JournalYearMetrics:
+        return JournalYearMetrics.objects.get(journal=self.journal, year=year)
+
+    def test_full(self) -> None:
+        stats = compute_temporal_metrics()
+        self.assertEqual(stats["years"], 3)
+        self.assertEqual(
+            self.flows(), {(2001, 2000, 1), (2002, 2000, 2), (2002, 2001, 1)}
+        )
+        self.assertEqual(
+            set(
+                SourceYearCitations.objects.values_list(
+                    "source", "year", "citations"
+                )
+            ),
+            {
+                (self.old.pk, 2001, 1),
+                (self.old.pk, 2002, 2),
+                (self.recent.pk, 2002, 1),
+            },
+        )
+        metrics: JournalYearMetrics = self.metrics(2002)
+        self.assertEqual(metrics.citable_items, 2)
+        self.assertEqual(metrics.impact_citations, 3)
+        self.assertEqual(metrics.impact_factor, 1.5)
+        self.assertEqual(metrics.cited_half_life, 2)
+        self.assertEqual(metrics.citing_half_life, 2)
+        self.assertEqual(self.metrics(2001).cited_half_life, 1)
+        self.assertEqual(self.metrics(2001).impact_factor, 1)
+        self.assertFalse(
+            JournalYearMetrics.objects.filter(year__lt=2001).exists()
+        )
+        self.assertEqual(self.metrics(2003).citable_items, 2)
+
+    def test_incremental(self) -> None:
+        compute_temporal_metrics()
+        late: Source = SourceFactory(
+            source_journal=self.journal, year_of_publication=2003
+        )
+        ReferenceFactory(referrer=late, reference=self.recent)
+        stats = compute_temporal_metrics()
+        self.assertEqual(stats["years"], 3)
+        self.assertEqual(stats["flows"], 1)
+        self.assertIn((2003, 2001, 1), self.flows())
+        self.assertEqual(len(self.flows()), 4)
+        self.assertEqual(self.metrics(2003).impact_factor, 0.5)
+        self.assertEqual(self.metrics(2004).citable_items, 2)
+        self.assertEqual(self.metrics(2002).impact_factor, 1.5)
+
+        # Nothing changed since the last computation.
+        self.assertEqual(compute_temporal_metrics()["years"], 0)
+        self.assertEqual(len(self.flows()), 4)
+
+    def test_unread_sources(self) -> None:
+        """
+        Verify that references to sources missing from the read sources
+        (committed concurrently, with a lower ID than the last read one) are
+        left out, instead of being mapped to other sources.
+        """
+        read_sources = temporal.read_sources
+        reference: Reference = Reference.objects.get(referrer=self.citing)
+
+        def read_then_cite():
+            sources = read_sources()
+            reference.referrer = SourceFactory(year_of_publication=1990)
+            reference.save()
+            return sources
+
+        with mock.patch.object(
+            temporal, "read_sources", side_effect=read_then_cite
+        ):
+            compute_temporal_metrics()
+        self.assertEqual(
+            self.flows(), {(2001, 2000, 1), (2002, 2000, 1), (2002, 2001, 1)}
+        )
+
+    def test_command(self) -> None:
+        output = StringIO()
+        call_command("compute_temporal_metrics", "--full", stdout=output)
+        self.assertIn(
+            "Recomputed 3 years: stored 3 year flows", output.getvalue()
+        )
+
+    def test_empty(self) -> None:
+        Source.objects.all().delete()
+        self.assertEqual(compute_temporal_metrics()["journals"], 0)
@@ -0,0 +1,99 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from database.bulk import bulk_insert
+from database.factories import JournalFactory, PublisherFactory, SourceFactory
+from database.models import Journal, Publisher, Source
+from database.validation import (
+    ARTICLE_JOURNAL,
+    BOOK_JOURNAL,
+    BOOK_PUBLISHER,
+    PAGE_RANGE,
+    SourceValidationError,
+    validate_sources,
+)
+
+
+class TestValidateSources(TestCase):
+    def setUp(self) -> None:
+        self.journal: Journal = JournalFactory()
+        self.publisher: Publisher = PublisherFactory()
+
+    def build(self, **kwargs) -> Source:
+        fields = {
+            "source_journal": self.journal,
+            "journal_page_range_start": None,
+            "journal_page_range_end": None,
+            **kwargs,
+        }
+        return SourceFactory.build(**fields)
+
+    def test_valid_batch(self) -> None:
+        validate_sources(
+            [
+                self.build(),
+                self.build(
+                    journal_page_range_start=3, journal_page_range_end=3
+                ),
+                self.build(
+                    book=True,
+                    source_journal=None,
+                    source_publisher=self.publisher,
+                ),
+            ]
+        )
+        validate_sources([])
+
+    def test_invalid_batch(self) -> None:
+        sources = [
+            self.build(),
+            self.build(journal_page_range_start=5, journal_page_range_end=3),
+            self.build(book=True, source_publisher=None),
+            self.build(source_journal=None),
+        ]
+        with self.assertRaises(SourceValidationError) as context:
+            validate_sources(sources)
+        self.assertEqual(
+            context.exception.errors,
+            {
+                1: [PAGE_RANGE],
+                2: [BOOK_JOURNAL, BOOK_PUBLISHER],
+                3: [ARTICLE_JOURNAL],
+            },
+        )
+        self.assertIn("3 invalid sources", str(context.exception))
+
+    def test_bulk_insert(self) -> None:
+        with self.assertRaises(SourceValidationError):
+            bulk_insert(
+                Source, [self.build(), self.build(source_journal=None)]
+            )
+        self.assertFalse(Source.objects.exists())
+
+
+class TestSourceConstraints(TestCase):
+    def test_update_is_rejected(self) -> None:
+        """
+        Verify that the database rejects invalid rows that bypass save().
+        """
+        book: Source = SourceFactory(book=True)
+        article: Source = SourceFactory(
+            article=True, journal_page_range_start=1, journal_page_range_end=5
+        )
+        for queryset, values in (
+            (Source.objects.filter(pk=book.pk), {"source_publisher": None}),
+            (
+                Source.objects.filter(pk=book.pk),
+                {"source_journal": article.source_journal},
+            ),
+            (
+                Source.objects.filter(pk=article.pk),
+                {"source_publisher": book.source_publisher},
+            ),
+            (
+                Source.objects.filter(pk=article.pk),
+                {"journal_page_range_start": 10},
+            ),
+        ):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                queryset.update(**values)
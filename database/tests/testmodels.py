@@ -65,6 +65,8 @@ class TestAuthorModel(TestCase):
             first_name="Jan Peter", middle_name="Fred Arnold"
         )
         self.assertEqual(author.initials_of_first_and_middle_names, "J P F A")
+        author.middle_name = None
+        self.assertEqual(author.initials_of_first_and_middle_names, "J P")
 
 
 class TestPublisherModel(TestCase):
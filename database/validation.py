@@ -0,0 +1,106 @@
+"""
+Vectorized validation of the Source rules for batches of unsaved instances,
+so bulk inserts can be checked before bulk_create. Source.save() checks
+single instances with the same rules, and the database enforces them with
+the CheckConstraints of Source.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+PAGE_RANGE: str = "Invalid page range! Start is placed after the end!"
+BOOK_JOURNAL: str = "Source with type 'book' cannot be linked to a journal!"
+BOOK_PUBLISHER: str = "Source with type 'book' has no publisher set!"
+ARTICLE_JOURNAL: str = "Article is not linked to a journal!"
+ARTICLE_PUBLISHER: str = (
+    "Source with type 'article' has a publisher set! "
+    "(Should be done in the journal instead)"
+)
+
+# Number of invalid sources listed in the message of a validation error.
+MAX_REPORTED_ERRORS: int = 10
+
+
+class SourceValidationError(ValueError):
+    """
+    Raised for a batch with invalid sources. 'errors' maps the position of
+    each invalid source in the batch to its error messages.
+    """
+
+    def __init__(self, errors: Dict[int, List[str]]) -> None:
+        self.errors: Dict[int, List[str]] = errors
+        if len(errors) == 1:
+            message: str = " ".join(next(iter(errors.values())))
+        else:
+            message = "{} invalid sources: {}".format(
+                len(errors),
+                "; ".join(
+                    "#{}: {}".format(position, " ".join(messages))
+                    for position, messages in list(errors.items())[
+                        :MAX_REPORTED_ERRORS
+                    ]
+                ),
+            )
+        super().__init__(message)
+
+
+def _optional(values: Sequence) -> np.ndarray:
+    """ Float array of optional integers, with NaN for None. """
+    return np.array(
+        [np.nan if value is None else value for value in values],
+        dtype=np.float64,
+    )
+
+
+def source_violations(sources: Sequence) -> List[Tuple[str, np.ndarray]]:
+    """
+    Checks all rules at once, and returns (message, positions) for each
+    violated rule, where positions are the indexes of the violating
+    sources in the batch.
+    """
+    types: np.ndarray = np.array([source.type for source in sources])
+    has_journal: np.ndarray = np.array(
+        [source.source_journal_id is not None for source in sources],
+        dtype=bool,
+    )
+    has_publisher: np.ndarray = np.array(
+        [source.source_publisher_id is not None for source in sources],
+        dtype=bool,
+    )
+    start: np.ndarray = _optional(
+        [source.journal_page_range_start for source in sources]
+    )
+    end: np.ndarray = _optional(
+        [source.journal_page_range_end for source in sources]
+    )
+    is_book: np.ndarray = types == "BK"
+    is_article: np.ndarray = types == "AR"
+    with np.errstate(invalid="ignore"):
+        backwards: np.ndarray = start > end
+    rules: List[Tuple[str, np.ndarray]] = [
+        (PAGE_RANGE, backwards),
+        (BOOK_JOURNAL, is_book & has_journal),
+        (BOOK_PUBLISHER, is_book & ~has_publisher),
+        (ARTICLE_JOURNAL, is_article & ~has_journal),
+        (ARTICLE_PUBLISHER, is_article & has_publisher),
+    ]
+    return [
+        (message, np.flatnonzero(violated))
+        for message, violated in rules
+        if violated.any()
+    ]
+
+
+def validate_sources(sources: Sequence) -> None:
+    """
+    Raises SourceValidationError when any of the given (unsaved) sources
+    breaks a Source rule.
+    """
+    if not len(sources):
+        return
+    errors: Dict[int, List[str]] = {}
+    for message, positions in source_violations(sources):
+        for position in positions.tolist():
+            errors.setdefault(position, []).append(message)
+    if errors:
+        raise SourceValidationError(dict(sorted(errors.items())))
@@ -0,0 +1,85 @@
+"""
+Version counters of tables (TableVersion), increased by the signal receivers
+in database.signals whenever rows are saved, deleted or bulk inserted.
+Code changing rows without signals (QuerySet.update(), raw SQL) calls bump()
+itself.
+
+A version changes with (and in the same transaction as) the rows it
+describes, so data derived from a table can be reused as long as the
+version is the same, like the ETags of the API views in database.api and
+the entries of database.caching.
+
+Versions restart from 0 when the database is reset, and different
+databases have the same versions. Data shared beyond a database (like the
+entries of the shared cache of database.caching) is also keyed on the
+generation of the database: a random number stored with the versions,
+which is replaced when the database is reset.
+"""
+from typing import Dict, Tuple, Type
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+from database.models import TableVersion, random_stamp
+
+# Name the generation of the database is stored under.
+GENERATION: str = "__generation__"
+
+
+def bump(model: Type[models.Model]) -> None:
+    """ Increases the version of the table of the given model. """
+    table: str = model._meta.db_table
+    if TableVersion.objects.filter(table=table).update(
+        version=F("version") + 1
+    ):
+        return
+    try:
+        with transaction.atomic():
+            TableVersion.objects.create(table=table, version=1)
+    except IntegrityError:
+        # Created concurrently.
+        TableVersion.objects.filter(table=table).update(
+            version=F("version") + 1
+        )
+
+
+def get_versions(*models: Type[models.Model]) -> Tuple[int, ...]:
+    """
+    The current versions of the tables of the given models, with a single
+    query. Tables that never changed have version 0.
+    """
+    return get_table_versions(*(model._meta.db_table for model in models))
+
+
+def get_table_versions(*tables: str) -> Tuple[int, ...]:
+    """ The current versions stored under the given names. """
+    versions: Dict[str, int] = dict(
+        TableVersion.objects.filter(table__in=tables).values_list(
+            "table", "version"
+        )
+    )
+    return tuple(versions.get(table, 0) for table in tables)
+
+
+def _create_generation() -> int:
+    try:
+        with transaction.atomic():
+            return TableVersion.objects.create(
+                table=GENERATION, version=random_stamp()
+            ).version
+    except IntegrityError:
+        # Created concurrently.
+        return TableVersion.objects.get(table=GENERATION).version
+
+
+def get_generation_and_versions(
+    *models: Type[models.Model],
+) -> Tuple[int, Tuple[int, ...]]:
+    """
+    The generation of the database and the versions of the tables of the
+    given models, with a single query once the generation exists.
+    """
+    generation, *versions = get_table_versions(
+        GENERATION, *(model._meta.db_table for model in models)
+    )
+    return generation or _create_generation(), tuple(versions)
@@ -0,0 +1,26 @@
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import render
+
+from database import profiling
+from database.caching import derived_cache
+
+
+@staff_member_required
+def query_profile(request: HttpRequest) -> HttpResponse:
+    """ Table of the query summaries of the most recent requests. """
+    if not profiling.is_enabled():
+        raise Http404("Query profiling is disabled")
+    context = {
+        **admin.site.each_context(request),
+        "title": "Query profile",
+        "profiles": list(reversed(profiling.recent_profiles)),
+    }
+    return render(request, "database/query_profile.html", context)
+
+
+@staff_member_required
+def cache_statistics(request: HttpRequest) -> JsonResponse:
+    """ Hit and miss counters of the derived cache of this process. """
+    return JsonResponse(derived_cache.statistics())